@@ -4,7 +4,9 @@ API router for all endpoints.
 
 from fastapi import APIRouter
 
-from app.api.endpoints import auth, content, chat, rag, resume
+from app.api.endpoints import analytics, auth, content, chat, rag, resume
+from app.api.middleware.rate_limit import RateLimit, rate_limit_registry
+from app.core.config import settings
 
 api_router = APIRouter()
 
@@ -13,4 +15,18 @@ api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(content.router, prefix="/content", tags=["Content"])
 api_router.include_router(chat.router, prefix="/chat", tags=["Chat"])
 api_router.include_router(rag.router, prefix="/rag", tags=["RAG"])
-api_router.include_router(resume.router, prefix="/resume", tags=["Resume"]) 
\ No newline at end of file
+api_router.include_router(resume.router, prefix="/resume", tags=["Resume"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+
+# Rate limits per router: auth is limited per IP to slow down credential
+# stuffing, AI-backed routers share a per-user and per-IP budget
+ai_limits = [
+    RateLimit.parse(settings.RATE_LIMIT_AI_USER, scope="user"),
+    RateLimit.parse(settings.RATE_LIMIT_AI_IP, scope="ip"),
+]
+rate_limit_registry.register("", "default", [RateLimit.parse(settings.RATE_LIMIT_DEFAULT_IP, scope="ip")])
+rate_limit_registry.register("/auth", "auth", [RateLimit.parse(settings.RATE_LIMIT_AUTH_IP, scope="ip")])
+rate_limit_registry.register("/content", "ai", ai_limits)
+rate_limit_registry.register("/chat", "ai", ai_limits)
+rate_limit_registry.register("/rag", "ai", ai_limits)
+rate_limit_registry.register("/resume", "ai", ai_limits)
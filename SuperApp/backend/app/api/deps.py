@@ -9,6 +9,7 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 
+from app.core.cache import LocalCache, cache_registry
 from app.core.config import settings
 from app.core.security import verify_token
 from app.db.mongodb.models import User
@@ -18,6 +19,13 @@ logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Authenticated users by ID; only used while cross-worker invalidation runs
+user_cache = cache_registry.register_cache(
+    LocalCache("users", ttl_seconds=settings.USER_CACHE_TTL_SECONDS),
+    "users",
+    lambda event: event.doc_id,
+)
+
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """
@@ -45,12 +53,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         if user_id is None:
             raise credentials_exception
             
-        # Get user from database
-        user = await User.find_one({"_id": user_id})
+        # Get user from cache or database
+        user = user_cache.get(user_id) if cache_registry.live else None
         if user is None:
-            raise credentials_exception
-            
-        return user
+            user = await User.find_one({"_id": user_id})
+            if user is None:
+                raise credentials_exception
+            if cache_registry.live:
+                user_cache.set(user_id, user)
+        
+        # Endpoints may modify the user, so never hand out the cached object
+        return user.copy(deep=True)
     except JWTError:
         raise credentials_exception
 
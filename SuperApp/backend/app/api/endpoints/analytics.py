@@ -0,0 +1,209 @@
+"""
+Engagement and content analytics endpoints.
+
+Queries read precomputed hourly/daily rollups, never raw snapshots, and
+content aggregates maintained from PostgreSQL posts, never the posts.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.mongodb.models import (
+    EngagementMeta,
+    EngagementMetrics,
+    EngagementSnapshot,
+    LinkedInPost,
+    User,
+)
+from app.db.postgres.session import get_read_session
+from app.services.analytics.content import (
+    METRICS as CONTENT_METRICS,
+    PERIODS as CONTENT_PERIODS,
+    get_content_stats,
+    get_refreshed_through,
+    get_tag_stats,
+)
+from app.services.analytics.engagement import (
+    PERIODS,
+    get_post_engagement,
+    get_user_engagement,
+    ingest_snapshots,
+    naive_utc,
+)
+from app.api.deps import get_current_active_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Longest range served per request, in buckets of each period
+MAX_BUCKETS = {"hour": 24 * 14, "day": 366}
+
+# Longest content analytics range, in days
+MAX_CONTENT_DAYS = 366 * 3
+
+
+class SnapshotIn(BaseModel):
+    """Engagement totals of one post at one time."""
+
+    post_id: str
+    timestamp: Optional[datetime] = None
+    metrics: EngagementMetrics
+
+
+def _resolve_range(period: str, start: Optional[datetime], end: Optional[datetime]):
+    """Default and validate a query range, in naive UTC."""
+    start = naive_utc(start) if start else None
+    end = naive_utc(end) if end else None
+    step = timedelta(hours=1) if period == "hour" else timedelta(days=1)
+    end = end or datetime.utcnow()
+    start = start or end - step * (48 if period == "hour" else 30)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+    if (end - start) / step > MAX_BUCKETS[period]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too long: at most {MAX_BUCKETS[period]} {period} buckets",
+        )
+    return start, end
+
+
+@router.post(
+    "/engagement/snapshots",
+    status_code=status.HTTP_201_CREATED,
+    summary="Record engagement snapshots",
+    description="Store engagement totals of the current user's posts and update their current stats.",
+)
+async def record_snapshots(
+    snapshots: List[SnapshotIn] = Body(..., max_items=settings.ENGAGEMENT_INGEST_BATCH_SIZE),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Record a batch of engagement snapshots."""
+    post_ids = {s.post_id for s in snapshots}
+    owned = await LinkedInPost.get_motor_collection().distinct(
+        "_id", {"_id": {"$in": list(post_ids)}, "user_id": current_user.id}
+    )
+    if len(owned) != len(post_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+
+    try:
+        now = datetime.utcnow()
+        stored = await ingest_snapshots([
+            EngagementSnapshot(
+                timestamp=naive_utc(s.timestamp) if s.timestamp else now,
+                meta=EngagementMeta(post_id=s.post_id, user_id=current_user.id),
+                metrics=s.metrics,
+            )
+            for s in snapshots
+        ])
+        return {"stored": stored}
+    except Exception as e:
+        logger.error(f"Error recording engagement snapshots: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to record engagement snapshots: {str(e)}",
+        )
+
+
+@router.get(
+    "/engagement",
+    response_class=ORJSONResponse,
+    summary="Get engagement of the user's posts",
+    description="Summed engagement totals of the current user's posts per hour or day.",
+)
+async def user_engagement(
+    current_user: User = Depends(get_current_active_user),
+    period: str = Query("day", enum=list(PERIODS)),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+):
+    """Get engagement per bucket across all of the user's posts."""
+    start, end = _resolve_range(period, start, end)
+    series = await get_user_engagement(current_user.id, period, start, end)
+    return ORJSONResponse({"period": period, "start": start, "end": end, "data": series})
+
+
+@router.get(
+    "/posts/{post_id}/engagement",
+    response_class=ORJSONResponse,
+    summary="Get engagement history of a post",
+    description="Engagement totals and gains of one post per hour or day.",
+)
+async def post_engagement(
+    post_id: str,
+    current_user: User = Depends(get_current_active_user),
+    period: str = Query("day", enum=list(PERIODS)),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+):
+    """Get the engagement series of one post."""
+    start, end = _resolve_range(period, start, end)
+    owned = await LinkedInPost.get_motor_collection().count_documents(
+        {"_id": post_id, "user_id": current_user.id}, limit=1
+    )
+    if not owned:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+
+    series = await get_post_engagement(post_id, period, start, end)
+    return ORJSONResponse({"post_id": post_id, "period": period, "start": start, "end": end, "data": series})
+
+
+@router.get(
+    "/content",
+    response_class=ORJSONResponse,
+    summary="Get content statistics",
+    description="Posts, AI-generated share and engagement of the current user's posts per day, week or month.",
+)
+async def content_stats(
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_read_session),
+    period: str = Query("week", enum=list(CONTENT_PERIODS)),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+):
+    """Get content statistics from the precomputed daily aggregates."""
+    end = end or datetime.utcnow().date() + timedelta(days=1)
+    start = start or end - timedelta(days=90)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+    if (end - start).days > MAX_CONTENT_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too long: at most {MAX_CONTENT_DAYS} days",
+        )
+    stats = await get_content_stats(session, current_user.id, period, start, end)
+    return ORJSONResponse({
+        "period": period,
+        "start": start,
+        "end": end,
+        "refreshed_through": await get_refreshed_through(session),
+        **stats,
+    })
+
+
+@router.get(
+    "/content/tags",
+    response_class=ORJSONResponse,
+    summary="Get engagement by tag",
+    description="Post counts and summed engagement of the current user's posts per tag.",
+)
+async def content_tags(
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_read_session),
+    sort: str = Query("impressions", enum=["posts", *CONTENT_METRICS]),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Get the user's top tags from the precomputed tag aggregates."""
+    tags = await get_tag_stats(session, current_user.id, sort, limit)
+    return ORJSONResponse({
+        "sort": sort,
+        "refreshed_through": await get_refreshed_through(session),
+        "data": tags,
+    })
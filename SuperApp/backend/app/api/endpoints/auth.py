@@ -18,7 +18,9 @@ from app.core.security import (
     verify_password,
     verify_token,
 )
+from app.db.mongodb.change_events import publish_change
 from app.db.mongodb.models import User, UserSettings
+from app.db.mongodb.outbox import write_with_outbox
 
 logger = logging.getLogger(__name__)
 
@@ -105,8 +107,8 @@ async def register_user(user_in: UserCreate) -> Any:
         settings=UserSettings(),
     )
     
-    # Save user to database
-    await user.save()
+    # Save user to database, queueing it for replication
+    await write_with_outbox(lambda session: user.save(session=session), "users", [user.id])
     
     # Return user data (without password)
     return {
@@ -184,6 +186,7 @@ async def login(
     # Update last login
     user.last_login = datetime.utcnow()
     await user.save()
+    await publish_change("users", user.id, "update", user.id)
     
     return {
         "access_token": access_token,
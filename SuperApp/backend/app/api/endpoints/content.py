@@ -6,9 +6,16 @@ import logging
 from typing import List, Optional, Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
+from app.core.cache import cache_registry
 from app.db.mongodb.models import User, LinkedInPost, LinkedInProfile
+from app.db.mongodb.read_models import LinkedInPostListItem, find_projected
+from app.db.mongodb.pagination import KEYSET_SORT, CountCache, apply_cursor, encode_cursor
+from app.db.mongodb.change_events import publish_change
+from app.db.mongodb.outbox import write_with_outbox
+from app.db.mongodb.writer import deferred_writer, insert_documents
 from app.services.ai.gemini_service import GeminiService
 from app.api.deps import get_current_active_user, get_user_gemini_service
 
@@ -16,6 +23,20 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Totals are only counted on request and cached briefly per user and filter,
+# while cross-worker invalidation is live
+post_count_cache = CountCache(ttl_seconds=30)
+cache_registry.register(
+    "linkedin_posts",
+    lambda event: post_count_cache.invalidate(
+        (lambda key: key[0] == event.user_id) if event.user_id else None
+    ),
+    post_count_cache.invalidate,
+)
+
+# Estimated totals stop counting here and report a lower bound
+ESTIMATED_COUNT_CAP = 1000
+
 
 class ContentGenerationRequest(BaseModel):
     """Request model for content generation."""
@@ -45,6 +66,10 @@ class ContentGenerationRequest(BaseModel):
         ge=1,
         le=5
     )
+    defer_save: bool = Field(
+        False,
+        description="Return as soon as generation finishes and save the posts in the background"
+    )
 
 
 class AiEngagementPrediction(BaseModel):
@@ -131,23 +156,35 @@ async def generate_linkedin_post(
             count=request.count,
         )
         
-        # Save generated posts to database
-        for variation in variations:
-            post = LinkedInPost(
+        # Save generated posts to database in one round trip
+        generation_params = {
+            "topic": request.topic,
+            "tone": request.tone,
+            "length": request.length,
+            "keywords": request.keywords,
+            "audience": request.audience,
+        }
+        posts = [
+            LinkedInPost(
                 user_id=current_user.id,
                 content=variation["content"],
                 ai_generated=True,
                 ai_engagement_prediction=variation["ai_engagement_prediction"],
-                generation_params={
-                    "topic": request.topic,
-                    "tone": request.tone,
-                    "length": request.length,
-                    "keywords": request.keywords,
-                    "audience": request.audience,
-                },
+                generation_params=generation_params,
                 tags=request.keywords or [],
             )
-            await post.save()
+            for variation in variations
+        ]
+        if request.defer_save:
+            await deferred_writer.submit(posts)
+        else:
+            await write_with_outbox(
+                lambda session: insert_documents(LinkedInPost, posts, session=session),
+                "linkedin_posts",
+                [post.id for post in posts],
+            )
+        post_count_cache.invalidate(lambda key: key[0] == current_user.id)
+        await publish_change("linkedin_posts", posts[0].id if posts else None, "insert", current_user.id)
         
         return {"variations": variations}
     except Exception as e:
@@ -220,39 +257,89 @@ async def optimize_linkedin_profile(
 @router.get(
     "/linkedin/posts",
     status_code=status.HTTP_200_OK,
+    response_class=ORJSONResponse,
     summary="Get user's LinkedIn posts",
-    description="Get all LinkedIn posts for the current user",
+    description=(
+        "Get LinkedIn posts for the current user, newest first. Pass the returned "
+        "next_cursor to fetch the following page. The total is only computed when "
+        "requested, either exactly (cached briefly) or as a capped estimate."
+    ),
 )
 async def get_linkedin_posts(
     current_user: User = Depends(get_current_active_user),
     limit: int = Query(10, ge=1, le=100),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    skip: int = Query(0, ge=0, description="Deprecated offset, ignored when a cursor is given"),
     ai_generated: Optional[bool] = Query(None),
     is_published: Optional[bool] = Query(None),
+    total: Optional[str] = Query(
+        None,
+        description="Include the total count: exact or estimated",
+        enum=["exact", "estimated"],
+    ),
 ):
-    """Get all LinkedIn posts for the current user."""
+    """Get a page of LinkedIn posts for the current user."""
     logger.info("Getting LinkedIn posts")
     
-    try:
-        # Build query
-        query = {"user_id": current_user.id}
+    # Build query
+    query = {"user_id": current_user.id}
+    
+    if ai_generated is not None:
+        query["ai_generated"] = ai_generated
         
-        if ai_generated is not None:
-            query["ai_generated"] = ai_generated
-            
-        if is_published is not None:
-            query["is_published"] = is_published
+    if is_published is not None:
+        query["is_published"] = is_published
+    
+    try:
+        page_query = apply_cursor(query, cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    
+    try:
+        # Fetch only list-view fields as raw documents, plus one extra post
+        # to know whether another page exists
+        collection = LinkedInPost.get_motor_collection()
+        posts = await find_projected(
+            collection,
+            LinkedInPostListItem,
+            page_query,
+            sort=KEYSET_SORT,
+            skip=skip if not cursor else 0,
+            limit=limit + 1,
+        )
         
-        # Get posts
-        posts = await LinkedInPost.find(query).sort(-LinkedInPost.created_at).skip(skip).limit(limit).to_list()
-        total = await LinkedInPost.find(query).count()
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = encode_cursor(posts[-1]["created_at"], posts[-1]["_id"])
         
-        return {
+        response = {
             "data": posts,
-            "total": total,
             "limit": limit,
-            "skip": skip,
+            "next_cursor": next_cursor,
         }
+        if skip and not cursor:
+            response["skip"] = skip
+        
+        if total == "exact":
+            count_key = (current_user.id, ai_generated, is_published)
+            # Writes of other workers are only seen while invalidation is live
+            count = post_count_cache.get(count_key) if cache_registry.live else None
+            if count is None:
+                count = await collection.count_documents(query)
+                if cache_registry.live:
+                    post_count_cache.set(count_key, count)
+            response["total"] = count
+            response["total_is_estimate"] = False
+        elif total == "estimated":
+            count = await collection.count_documents(query, limit=ESTIMATED_COUNT_CAP)
+            response["total"] = count
+            response["total_is_estimate"] = count >= ESTIMATED_COUNT_CAP
+        
+        return ORJSONResponse(response)
     except Exception as e:
         logger.error(f"Error getting LinkedIn posts: {e}")
         raise HTTPException(
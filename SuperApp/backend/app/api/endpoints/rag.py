@@ -0,0 +1,182 @@
+"""
+RAG document endpoints: upload, ingestion progress and deletion.
+
+Uploads are streamed to GridFS and ingested in the background by the
+staged pipeline in ``app/services/rag/ingestion.py``; clients poll the
+document's ingestion progress until ``is_processed`` is set.
+"""
+
+import logging
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi.responses import ORJSONResponse
+
+from app.core.config import settings
+from app.db.mongodb.document_store import delete_document, save_content_stream
+from app.db.mongodb.models import Document, IngestionProgress, User
+from app.services.ai.gemini_service import GeminiService
+from app.services.rag.ingestion import ingestion_pipeline
+from app.api.deps import get_current_active_user, get_current_admin_user, get_user_gemini_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Uploads are decoded as UTF-8 text
+TEXT_EXTENSIONS = (".txt", ".md", ".markdown", ".csv", ".json", ".html")
+
+
+def _is_text(file: UploadFile) -> bool:
+    content_type = (file.content_type or "").split(";")[0]
+    name = (file.filename or "").lower()
+    return content_type.startswith("text/") or content_type == "application/json" or name.endswith(TEXT_EXTENSIONS)
+
+
+async def _pieces(file: UploadFile) -> AsyncIterator[bytes]:
+    """Read an upload in GridFS-chunk-sized pieces."""
+    while True:
+        piece = await file.read(settings.DOCUMENT_BODY_CHUNK_BYTES)
+        if not piece:
+            return
+        yield piece
+
+
+def _summary(document: Document) -> dict:
+    return {
+        "id": document.id,
+        "title": document.title,
+        "content_length": document.content_length,
+        "chunk_count": document.chunk_count,
+        "is_processed": document.is_processed,
+        "is_public": document.is_public,
+        "ingestion": document.ingestion.dict() if document.ingestion else None,
+        "created_at": document.created_at,
+    }
+
+
+def _require_pipeline() -> None:
+    """Refuse ingestion requests the background workers cannot take."""
+    if not ingestion_pipeline.running:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Document ingestion is unavailable",
+        )
+
+
+async def _owned_document(document_id: str, user: User) -> Document:
+    document = await Document.get(document_id)
+    if document is None or document.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    return document
+
+
+@router.post(
+    "/documents",
+    response_class=ORJSONResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Upload a document",
+    description="Store a text document and queue it for chunking and embedding.",
+)
+async def upload_document(
+    file: UploadFile = File(...),
+    title: Optional[str] = Form(None),
+    is_public: bool = Form(False),
+    current_user: User = Depends(get_current_active_user),
+    gemini_service: GeminiService = Depends(get_user_gemini_service),
+):
+    """Upload a document; ingestion continues in the background."""
+    _require_pipeline()
+    if not _is_text(file):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Only UTF-8 text documents are supported",
+        )
+
+    document = Document(
+        user_id=current_user.id,
+        title=title or file.filename or "Untitled",
+        metadata={"filename": file.filename, "content_type": file.content_type},
+        is_public=is_public,
+        ingestion=IngestionProgress(),
+    )
+    try:
+        await save_content_stream(document, _pieces(file), max_bytes=settings.RAG_MAX_UPLOAD_BYTES)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+    # Left pending for the next start if the workers stopped meanwhile
+    await ingestion_pipeline.submit(document.id, gemini_service, inline=False)
+    return ORJSONResponse(_summary(document), status_code=status.HTTP_202_ACCEPTED)
+
+
+@router.get(
+    "/documents",
+    response_class=ORJSONResponse,
+    summary="List documents",
+    description="The current user's documents with their ingestion progress, newest first.",
+)
+async def list_documents(
+    current_user: User = Depends(get_current_active_user),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """List the user's documents."""
+    documents = await Document.find(Document.user_id == current_user.id).sort(-Document.created_at).limit(limit).to_list()
+    return ORJSONResponse({"data": [_summary(document) for document in documents]})
+
+
+@router.get(
+    "/documents/{document_id}",
+    response_class=ORJSONResponse,
+    summary="Get a document's ingestion progress",
+)
+async def get_document(
+    document_id: str,
+    current_user: User = Depends(get_current_active_user),
+):
+    """Get a document with its ingestion progress."""
+    return ORJSONResponse(_summary(await _owned_document(document_id, current_user)))
+
+
+@router.post(
+    "/documents/{document_id}/ingest",
+    response_class=ORJSONResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Ingest a document again",
+    description="Resume a failed ingestion, or start over with restart=true.",
+)
+async def ingest_document(
+    document_id: str,
+    restart: bool = Query(False),
+    current_user: User = Depends(get_current_active_user),
+    gemini_service: GeminiService = Depends(get_user_gemini_service),
+):
+    """Queue a document for (re-)ingestion."""
+    _require_pipeline()
+    document = await _owned_document(document_id, current_user)
+    await ingestion_pipeline.submit(document.id, gemini_service, restart=restart, inline=False)
+    return ORJSONResponse(_summary(document), status_code=status.HTTP_202_ACCEPTED)
+
+
+@router.delete(
+    "/documents/{document_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a document",
+)
+async def remove_document(
+    document_id: str,
+    current_user: User = Depends(get_current_active_user),
+):
+    """Delete a document with its body and chunks."""
+    await delete_document(await _owned_document(document_id, current_user))
+
+
+@router.get(
+    "/ingestion/stats",
+    response_class=ORJSONResponse,
+    summary="Get ingestion pipeline metrics",
+    description="Per-stage throughput, queue depth and backpressure of the ingestion pipeline.",
+)
+async def ingestion_stats(current_user: User = Depends(get_current_admin_user)):
+    """Get ingestion pipeline metrics."""
+    return ORJSONResponse(ingestion_pipeline.stats())
@@ -0,0 +1,281 @@
+"""
+Sliding-window rate limiting middleware.
+
+Limits are declared per router in ``app/api/api.py`` through the
+``rate_limit_registry``. Each router is assigned a route class (for example
+``auth`` or ``ai``) and a list of limits scoped per client IP or per user.
+Counters live in Redis and are updated by an atomic Lua script; when Redis
+is unreachable the limiter falls back to per-worker in-memory counters.
+"""
+
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from jose import jwt, JWTError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.redis.client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# Sliding-window counter: the previous fixed window is weighted by how much
+# of it still overlaps the sliding window. Returns {allowed, retry_after_ms}.
+_SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local weighted = previous * (window - elapsed) / window + current
+if weighted + 1 > limit then
+    local retry
+    if current + 1 > limit then
+        retry = (window - elapsed) + window * (current + 1 - limit) / current
+    else
+        retry = (weighted + 1 - limit) * window / previous
+    end
+    return {0, math.ceil(retry)}
+end
+redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return {1, 0}
+"""
+
+
+class RateLimit:
+    """A single limit of ``limit`` requests per ``window_seconds``."""
+
+    def __init__(self, limit: int, window_seconds: int, scope: str = "ip"):
+        if scope not in ("ip", "user"):
+            raise ValueError(f"Unknown rate limit scope: {scope}")
+        if limit < 1 or window_seconds < 1:
+            raise ValueError("Rate limits need a positive count and window")
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.scope = scope
+
+    @classmethod
+    def parse(cls, value: str, scope: str = "ip") -> "RateLimit":
+        """
+        Parse a limit such as ``"10/minute"``.
+
+        Args:
+            value: Limit in ``<count>/<period>`` format
+            scope: Identity the limit applies to (ip or user)
+
+        Returns:
+            RateLimit: The parsed limit
+        """
+        count, _, period = value.partition("/")
+        if period not in _PERIODS:
+            raise ValueError(f"Invalid rate limit period in '{value}'")
+        return cls(int(count), _PERIODS[period], scope)
+
+    @property
+    def window_ms(self) -> int:
+        """Window length in milliseconds."""
+        return self.window_seconds * 1000
+
+    def __repr__(self) -> str:
+        return f"RateLimit({self.limit}/{self.window_seconds}s, scope={self.scope})"
+
+
+class RateLimitRegistry:
+    """Maps router path prefixes to a route class and its limits."""
+
+    def __init__(self):
+        self._routes: Dict[str, Tuple[str, List[RateLimit]]] = {}
+
+    def register(self, prefix: str, route_class: str, limits: List[RateLimit]) -> None:
+        """
+        Register limits for all routes under a router prefix.
+
+        Args:
+            prefix: Router prefix relative to the API root (e.g. "/auth")
+            route_class: Name shared by routers with a common budget
+            limits: Limits to enforce, all of which must pass
+        """
+        self._routes[prefix.rstrip("/")] = (route_class, limits)
+
+    def match(self, path: str) -> Optional[Tuple[str, List[RateLimit]]]:
+        """Find the limits for a path using the longest matching prefix."""
+        best: Optional[str] = None
+        for prefix in self._routes:
+            if path == prefix or path.startswith(prefix + "/"):
+                if best is None or len(prefix) > len(best):
+                    best = prefix
+        return self._routes[best] if best is not None else None
+
+
+def _sliding_window(previous: int, current: int, limit: int, window_ms: int, elapsed_ms: int) -> Tuple[bool, int]:
+    """Python mirror of ``_SLIDING_WINDOW_SCRIPT`` used by the local fallback."""
+    weighted = previous * (window_ms - elapsed_ms) / window_ms + current
+    if weighted + 1 > limit:
+        if current + 1 > limit:
+            retry = (window_ms - elapsed_ms) + window_ms * (current + 1 - limit) / current
+        else:
+            retry = (weighted + 1 - limit) * window_ms / previous
+        return False, math.ceil(retry)
+    return True, 0
+
+
+class SlidingWindowLimiter:
+    """Sliding-window counters in Redis with an in-process fallback."""
+
+    def __init__(self, redis_retry_seconds: int = settings.RATE_LIMIT_REDIS_RETRY_SECONDS):
+        self._redis_retry_seconds = redis_retry_seconds
+        self._redis_down_until = 0.0
+        self._script = None
+        # key -> [window_start_ms, previous_count, current_count, window_ms]
+        self._local: Dict[str, List[int]] = {}
+        self._last_sweep = 0.0
+
+    async def hit(self, key: str, limit: int, window_ms: int) -> Tuple[bool, int]:
+        """
+        Count a request against a key.
+
+        Args:
+            key: Counter key (route class, scope and identity)
+            limit: Maximum requests per window
+            window_ms: Window length in milliseconds
+
+        Returns:
+            Tuple of (allowed, retry_after_ms)
+        """
+        now_ms = int(time.time() * 1000)
+        window_start = now_ms - now_ms % window_ms
+        elapsed = now_ms - window_start
+
+        if time.monotonic() >= self._redis_down_until:
+            try:
+                return await self._hit_redis(key, limit, window_ms, window_start, elapsed)
+            except Exception as e:
+                logger.warning(f"Rate limiter falling back to local counters: {e}")
+                self._redis_down_until = time.monotonic() + self._redis_retry_seconds
+
+        return self._hit_local(key, limit, window_ms, window_start, elapsed)
+
+    async def _hit_redis(
+        self, key: str, limit: int, window_ms: int, window_start: int, elapsed: int
+    ) -> Tuple[bool, int]:
+        """Count a request using the atomic Redis script."""
+        if self._script is None:
+            self._script = get_redis_client().register_script(_SLIDING_WINDOW_SCRIPT)
+        # Hash tag keeps both windows in the same cluster slot
+        keys = [f"rl:{{{key}}}:{window_start}", f"rl:{{{key}}}:{window_start - window_ms}"]
+        allowed, retry_ms = await self._script(keys=keys, args=[limit, window_ms, elapsed])
+        return bool(allowed), int(retry_ms)
+
+    def _hit_local(
+        self, key: str, limit: int, window_ms: int, window_start: int, elapsed: int
+    ) -> Tuple[bool, int]:
+        """Count a request in this worker only (approximate across workers)."""
+        self._sweep(window_start + elapsed)
+        state = self._local.get(key)
+        if state is None or state[0] < window_start - window_ms:
+            state = [window_start, 0, 0, window_ms]
+        elif state[0] < window_start:
+            state = [window_start, state[2], 0, window_ms]
+        self._local[key] = state
+
+        allowed, retry_ms = _sliding_window(state[1], state[2], limit, window_ms, elapsed)
+        if allowed:
+            state[2] += 1
+        return allowed, retry_ms
+
+    def _sweep(self, now_ms: int) -> None:
+        """Drop local counters that no longer affect their sliding window."""
+        now = time.monotonic()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        self._local = {k: v for k, v in self._local.items() if v[0] + 2 * v[3] > now_ms}
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing the limits registered for each router."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        registry: RateLimitRegistry,
+        prefix: str = "",
+        limiter: Optional[SlidingWindowLimiter] = None,
+    ):
+        self.app = app
+        self.registry = registry
+        self.prefix = prefix.rstrip("/")
+        self.limiter = limiter or SlidingWindowLimiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path: str = scope["path"]
+        match = None
+        if path.startswith(self.prefix):
+            match = self.registry.match(path[len(self.prefix):])
+        if match is None:
+            await self.app(scope, receive, send)
+            return
+
+        route_class, limits = match
+        headers = dict(scope.get("headers") or [])
+        client_ip = self._client_ip(scope, headers)
+        user_id = self._user_id(headers)
+
+        for rule in limits:
+            identity = user_id if rule.scope == "user" and user_id else client_ip
+            key = f"{route_class}:{rule.scope}:{rule.window_seconds}:{identity}"
+            allowed, retry_ms = await self.limiter.hit(key, rule.limit, rule.window_ms)
+            if not allowed:
+                retry_after = max(1, math.ceil(retry_ms / 1000))
+                logger.info(f"Rate limit exceeded for {key} ({rule})")
+                response = JSONResponse(
+                    status_code=429,
+                    content={"detail": "Too many requests"},
+                    headers={"Retry-After": str(retry_after)},
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _client_ip(scope: Scope, headers: Dict[bytes, bytes]) -> str:
+        """Get the client IP, honouring X-Forwarded-For only when trusted."""
+        if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+            forwarded = headers.get(b"x-forwarded-for")
+            if forwarded:
+                return forwarded.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    def _user_id(headers: Dict[bytes, bytes]) -> Optional[str]:
+        """Get the user ID from a bearer token without touching the database."""
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+        return payload.get("sub")
+
+
+# Global registry populated by app/api/api.py
+rate_limit_registry = RateLimitRegistry()
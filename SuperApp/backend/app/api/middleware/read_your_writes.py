@@ -0,0 +1,29 @@
+"""
+Read-your-writes scope for replica routing.
+
+Gives every HTTP request its own primary pin (see
+``app.db.postgres.session``): reads go to a replica until the request
+writes to PostgreSQL, after which the rest of the request reads from the
+primary. Pins never leak between requests.
+"""
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.db.postgres.session import begin_request_scope, end_request_scope
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware opening one read-your-writes scope per request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = begin_request_scope()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_request_scope(token)
@@ -0,0 +1,195 @@
+"""
+Per-worker caches and the registry that keeps them coherent across workers.
+
+Caches register an invalidation handler per MongoDB collection. The change
+listener (app/db/mongodb/change_events.py) dispatches every write it sees to
+those handlers, in every worker. While no listener is running,
+``cache_registry.live`` is False and data that other workers can change
+should not be served from a cache.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationEvent:
+    """A write to a document, as seen by the change listener."""
+
+    def __init__(
+        self,
+        collection: str,
+        operation: str,
+        doc_id: Any,
+        user_id: Optional[str] = None,
+        occurred_at: Optional[datetime] = None,
+        fields: Optional[List[str]] = None,
+    ):
+        self.collection = collection
+        self.operation = operation  # insert, update, replace, delete
+        self.doc_id = doc_id
+        self.user_id = user_id
+        self.occurred_at = occurred_at
+        # Top-level fields an update changed; None when unknown
+        self.fields = fields
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "collection": self.collection,
+            "operation": self.operation,
+            "doc_id": self.doc_id,
+            "user_id": self.user_id,
+            "occurred_at": self.occurred_at.isoformat() if self.occurred_at else None,
+            "fields": self.fields,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InvalidationEvent":
+        occurred_at = data.get("occurred_at")
+        return cls(
+            collection=data["collection"],
+            operation=data["operation"],
+            doc_id=data.get("doc_id"),
+            user_id=data.get("user_id"),
+            occurred_at=datetime.fromisoformat(occurred_at) if occurred_at else None,
+            fields=data.get("fields"),
+        )
+
+
+class LocalCache:
+    """Thread-safe TTL and LRU bounded cache of one worker."""
+
+    def __init__(self, name: str, ttl_seconds: int = 60, max_entries: int = 10000):
+        self.name = name
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value if it has not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Cache a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop one entry."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+class CacheRegistry:
+    """Routes invalidation events to the caches of this worker."""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[InvalidationEvent], None]]] = {}
+        self._clears: List[Callable[[], None]] = []
+        self._caches: Dict[str, LocalCache] = {}
+        self.live = False
+
+    def register(
+        self,
+        collection: str,
+        handler: Callable[[InvalidationEvent], None],
+        clear: Callable[[], None],
+    ) -> None:
+        """
+        Register a cache's invalidation callbacks.
+
+        Args:
+            collection: Collection whose writes affect the cache
+            handler: Called with each event of that collection
+            clear: Empties the cache when events may have been missed
+        """
+        self._handlers.setdefault(collection, []).append(handler)
+        self._clears.append(clear)
+
+    def register_cache(
+        self,
+        cache: LocalCache,
+        collection: str,
+        key_for: Callable[[InvalidationEvent], Optional[Hashable]],
+    ) -> LocalCache:
+        """
+        Register a LocalCache invalidated by key.
+
+        Args:
+            cache: Cache to register
+            collection: Collection whose writes affect the cache
+            key_for: Cache key of an event, or None to clear the whole cache
+
+        Returns:
+            LocalCache: The registered cache
+        """
+        def handler(event: InvalidationEvent) -> None:
+            key = key_for(event)
+            if key is None:
+                cache.clear()
+            else:
+                cache.invalidate(key)
+
+        self.register(collection, handler, cache.clear)
+        self._caches[cache.name] = cache
+        return cache
+
+    def dispatch(self, event: InvalidationEvent) -> None:
+        """Apply an event to every cache of its collection."""
+        for handler in self._handlers.get(event.collection, []):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Cache invalidation handler failed for {event.collection}: {e}")
+
+    def clear_all(self) -> None:
+        """Empty every registered cache."""
+        for clear in self._clears:
+            clear()
+
+    @property
+    def collections(self) -> List[str]:
+        """Collections with registered caches."""
+        return list(self._handlers)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: cache.stats() for name, cache in self._caches.items()}
+
+
+# Global cache registry of this worker
+cache_registry = CacheRegistry()
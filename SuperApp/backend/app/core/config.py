@@ -42,18 +42,181 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
     
+    # API key encryption settings (Fernet keys, newest first for rotation)
+    API_KEY_ENCRYPTION_SECRET: Optional[str] = os.getenv("API_KEY_ENCRYPTION_SECRET")
+    # Comma-separated retired keys, still accepted for decryption
+    API_KEY_ENCRYPTION_PREVIOUS_SECRETS: str = os.getenv("API_KEY_ENCRYPTION_PREVIOUS_SECRETS", "")
+    API_KEY_CACHE_TTL_SECONDS: int = int(os.getenv("API_KEY_CACHE_TTL_SECONDS", "300"))
+    API_KEY_CACHE_MAX_ENTRIES: int = int(os.getenv("API_KEY_CACHE_MAX_ENTRIES", "1024"))
+    API_KEY_REENCRYPT_BATCH_SIZE: int = int(os.getenv("API_KEY_REENCRYPT_BATCH_SIZE", "100"))
+    
     # MongoDB settings
     MONGODB_URI: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
     MONGODB_DB_NAME: str = os.getenv("MONGODB_DB_NAME", "superapp")
+    MONGODB_APP_NAME: str = os.getenv("MONGODB_APP_NAME", "superapp-api")
+    # Connection pool per worker process
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "5"))
+    MONGODB_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+    MONGODB_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000"))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGODB_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "30000"))
+    # Comma-separated wire compressors (zstd and snappy need extra packages)
+    MONGODB_COMPRESSORS: str = os.getenv("MONGODB_COMPRESSORS", "zlib")
+    # Create missing declared indexes in the background at startup
+    MONGODB_RECONCILE_INDEXES: bool = os.getenv("MONGODB_RECONCILE_INDEXES", "True").lower() == "true"
+    # Chat messages stored per bucket document
+    CHAT_BUCKET_SIZE: int = int(os.getenv("CHAT_BUCKET_SIZE", "100"))
+    # RAG document bodies in GridFS; reads are streamed in pieces of this size
+    DOCUMENT_BODY_CHUNK_BYTES: int = int(os.getenv("DOCUMENT_BODY_CHUNK_BYTES", "261120"))
+    DOCUMENT_CHUNK_BATCH_SIZE: int = int(os.getenv("DOCUMENT_CHUNK_BATCH_SIZE", "200"))
+    # RAG ingestion pipeline: upload limit, chunking (characters), texts per
+    # embedding request, concurrent embedding requests per document, chunks
+    # per store batch, capacity of each inter-stage queue and documents
+    # ingested at once
+    RAG_MAX_UPLOAD_BYTES: int = int(os.getenv("RAG_MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+    RAG_CHUNK_SIZE: int = int(os.getenv("RAG_CHUNK_SIZE", "1000"))
+    RAG_CHUNK_OVERLAP: int = int(os.getenv("RAG_CHUNK_OVERLAP", "200"))
+    RAG_EMBED_BATCH_SIZE: int = int(os.getenv("RAG_EMBED_BATCH_SIZE", "32"))
+    RAG_EMBED_CONCURRENCY: int = int(os.getenv("RAG_EMBED_CONCURRENCY", "4"))
+    RAG_STORE_BATCH_SIZE: int = int(os.getenv("RAG_STORE_BATCH_SIZE", "128"))
+    RAG_STAGE_QUEUE_SIZE: int = int(os.getenv("RAG_STAGE_QUEUE_SIZE", "4"))
+    RAG_INGEST_CONCURRENCY: int = int(os.getenv("RAG_INGEST_CONCURRENCY", "2"))
+    # Runs of a failing document before it is marked failed, and the first retry delay (doubling)
+    RAG_INGEST_MAX_ATTEMPTS: int = int(os.getenv("RAG_INGEST_MAX_ATTEMPTS", "3"))
+    RAG_INGEST_RETRY_SECONDS: int = int(os.getenv("RAG_INGEST_RETRY_SECONDS", "60"))
+    # Cross-worker cache invalidation: auto, change_stream, redis or off
+    CACHE_INVALIDATION_MODE: str = os.getenv("CACHE_INVALIDATION_MODE", "auto")
+    CACHE_INVALIDATION_CHANNEL: str = os.getenv("CACHE_INVALIDATION_CHANNEL", "superapp:cache-invalidation")
+    CHANGE_STREAM_RETRY_SECONDS: int = int(os.getenv("CHANGE_STREAM_RETRY_SECONDS", "5"))
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+    # Engagement time series: raw snapshot retention and rollup refresh
+    ENGAGEMENT_RAW_RETENTION_DAYS: int = int(os.getenv("ENGAGEMENT_RAW_RETENTION_DAYS", "90"))
+    ENGAGEMENT_ROLLUP_INTERVAL_SECONDS: int = int(os.getenv("ENGAGEMENT_ROLLUP_INTERVAL_SECONDS", "300"))
+    ENGAGEMENT_INGEST_BATCH_SIZE: int = int(os.getenv("ENGAGEMENT_INGEST_BATCH_SIZE", "1000"))
+    # Content analytics refresh: interval, and how far before the watermark
+    # posts are re-read to catch transactions that committed late
+    CONTENT_ANALYTICS_INTERVAL_SECONDS: int = int(os.getenv("CONTENT_ANALYTICS_INTERVAL_SECONDS", "300"))
+    CONTENT_ANALYTICS_OVERLAP_SECONDS: int = int(os.getenv("CONTENT_ANALYTICS_OVERLAP_SECONDS", "300"))
+    # Outbox replication of users, posts and documents to PostgreSQL
+    OUTBOX_ENABLED: bool = os.getenv("OUTBOX_ENABLED", "True").lower() == "true"
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+    OUTBOX_POLL_SECONDS: float = float(os.getenv("OUTBOX_POLL_SECONDS", "1"))
+    OUTBOX_MAX_BACKOFF_SECONDS: int = int(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", "300"))
+    OUTBOX_RETENTION_HOURS: int = int(os.getenv("OUTBOX_RETENTION_HOURS", "72"))
+    # Maximum queued submissions of the background document writer
+    DEFERRED_WRITE_QUEUE_SIZE: int = int(os.getenv("DEFERRED_WRITE_QUEUE_SIZE", "1000"))
+    # Longest shutdown waits for queued deferred writes
+    DEFERRED_WRITE_DRAIN_TIMEOUT_SECONDS: float = float(os.getenv("DEFERRED_WRITE_DRAIN_TIMEOUT_SECONDS", "10"))
+    
+    # PostgreSQL settings
+    POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "localhost")
+    POSTGRES_PORT: int = int(os.getenv("POSTGRES_PORT", "5432"))
+    POSTGRES_DB: str = os.getenv("POSTGRES_DB", "superapp")
+    POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
+    POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
+    SQLALCHEMY_DATABASE_URI: Optional[str] = os.getenv("SQLALCHEMY_DATABASE_URI")
+    VECTOR_DB_TYPE: str = os.getenv("VECTOR_DB_TYPE", "postgres")
+    # pgvector HNSW build parameters and default search breadth
+    VECTOR_HNSW_M: int = int(os.getenv("VECTOR_HNSW_M", "16"))
+    VECTOR_HNSW_EF_CONSTRUCTION: int = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", "64"))
+    VECTOR_HNSW_EF_SEARCH: int = int(os.getenv("VECTOR_HNSW_EF_SEARCH", "40"))
+    VECTOR_IVFFLAT_PROBES: int = int(os.getenv("VECTOR_IVFFLAT_PROBES", "10"))
+    # Keep scanning the index until filtered searches fill the limit: off, strict_order, relaxed_order
+    # (ignored on pgvector < 0.8, which has no iterative scans)
+    VECTOR_ITERATIVE_SCAN: str = os.getenv("VECTOR_ITERATIVE_SCAN", "relaxed_order")
+    VECTOR_INDEX_BUILD_MEMORY: str = os.getenv("VECTOR_INDEX_BUILD_MEMORY", "1GB")
+    # Index chunk embeddings quantized (none, halfvec, bit) and re-rank
+    # limit * VECTOR_RERANK_FACTOR coarse candidates with the full vectors
+    VECTOR_QUANTIZATION: str = os.getenv("VECTOR_QUANTIZATION", "none")
+    VECTOR_RERANK_FACTOR: int = int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+    # Hybrid search: text search configuration of the chunk tsvector column,
+    # candidates taken from each of the lexical and vector lists, and RRF constant
+    HYBRID_TEXT_SEARCH_CONFIG: str = os.getenv("HYBRID_TEXT_SEARCH_CONFIG", "english")
+    HYBRID_CANDIDATES: int = int(os.getenv("HYBRID_CANDIDATES", "50"))
+    HYBRID_RRF_K: int = int(os.getenv("HYBRID_RRF_K", "60"))
+    # Partitions: hash partitions of document_chunks, and monthly
+    # linkedin_posts partitions created ahead / kept (0 keeps all)
+    DOCUMENT_CHUNK_PARTITIONS: int = int(os.getenv("DOCUMENT_CHUNK_PARTITIONS", "16"))
+    POST_PARTITION_MONTHS_AHEAD: int = int(os.getenv("POST_PARTITION_MONTHS_AHEAD", "3"))
+    POST_PARTITION_RETENTION_MONTHS: int = int(os.getenv("POST_PARTITION_RETENTION_MONTHS", "0"))
+    # Soft-delete purge: days deleted rows are kept, rows per batch, pause
+    # between batches and how often the purger runs
+    SOFT_DELETE_RETENTION_DAYS: int = int(os.getenv("SOFT_DELETE_RETENTION_DAYS", "30"))
+    SOFT_DELETE_PURGE_BATCH_SIZE: int = int(os.getenv("SOFT_DELETE_PURGE_BATCH_SIZE", "500"))
+    SOFT_DELETE_PURGE_PAUSE_SECONDS: float = float(os.getenv("SOFT_DELETE_PURGE_PAUSE_SECONDS", "0.2"))
+    SOFT_DELETE_PURGE_INTERVAL_SECONDS: int = int(os.getenv("SOFT_DELETE_PURGE_INTERVAL_SECONDS", "3600"))
+    # Binary COPY ingestion of chunks: rows per COPY and batches buffered ahead
+    BULK_INGEST_BATCH_ROWS: int = int(os.getenv("BULK_INGEST_BATCH_ROWS", "1000"))
+    BULK_INGEST_QUEUE_BATCHES: int = int(os.getenv("BULK_INGEST_QUEUE_BATCHES", "4"))
+    # Create missing vector indexes in the background at startup
+    VECTOR_ENSURE_INDEXES: bool = os.getenv("VECTOR_ENSURE_INDEXES", "True").lower() == "true"
+    # One engine per worker: persistent connections plus temporary overflow
+    POSTGRES_POOL_SIZE: int = int(os.getenv("POSTGRES_POOL_SIZE", "10"))
+    POSTGRES_MAX_OVERFLOW: int = int(os.getenv("POSTGRES_MAX_OVERFLOW", "10"))
+    POSTGRES_POOL_TIMEOUT: float = float(os.getenv("POSTGRES_POOL_TIMEOUT", "10"))
+    POSTGRES_POOL_RECYCLE: int = int(os.getenv("POSTGRES_POOL_RECYCLE", "1800"))
+    POSTGRES_POOL_PRE_PING: bool = os.getenv("POSTGRES_POOL_PRE_PING", "True").lower() == "true"
+    # asyncpg statement caches; set both to 0 behind PgBouncer in transaction mode
+    POSTGRES_STATEMENT_CACHE_SIZE: int = int(os.getenv("POSTGRES_STATEMENT_CACHE_SIZE", "100"))
+    POSTGRES_PREPARED_STATEMENT_CACHE_SIZE: int = int(os.getenv("POSTGRES_PREPARED_STATEMENT_CACHE_SIZE", "100"))
+    POSTGRES_COMMAND_TIMEOUT: float = float(os.getenv("POSTGRES_COMMAND_TIMEOUT", "30"))
+    POSTGRES_APP_NAME: str = os.getenv("POSTGRES_APP_NAME", "superapp-api")
+    # Read replicas for read-only sessions (comma-separated URIs; the primary
+    # URI listed twice works for local testing), their lag limit and checks
+    POSTGRES_REPLICA_URIS: str = os.getenv("POSTGRES_REPLICA_URIS", "")
+    POSTGRES_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("POSTGRES_REPLICA_MAX_LAG_SECONDS", "5"))
+    POSTGRES_REPLICA_CHECK_SECONDS: float = float(os.getenv("POSTGRES_REPLICA_CHECK_SECONDS", "5"))
+    
+    @validator("SQLALCHEMY_DATABASE_URI", pre=True, always=True)
+    def assemble_db_uri(cls, v: Optional[str], values: Dict[str, Any]) -> str:
+        """Build the async PostgreSQL URI from its parts if not given."""
+        if v:
+            return v
+        return (
+            f"postgresql+asyncpg://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}"
+            f"@{values.get('POSTGRES_HOST')}:{values.get('POSTGRES_PORT')}/{values.get('POSTGRES_DB')}"
+        )
     
     # Redis settings
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
     REDIS_PASSWORD: Optional[str] = os.getenv("REDIS_PASSWORD")
+    REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
+    REDIS_URI: Optional[str] = os.getenv("REDIS_URI")
+    
+    @validator("REDIS_URI", pre=True, always=True)
+    def assemble_redis_uri(cls, v: Optional[str], values: Dict[str, Any]) -> str:
+        """Build the Redis URI from host, port and password if not given."""
+        if v:
+            return v
+        password = values.get("REDIS_PASSWORD")
+        auth = f":{password}@" if password else ""
+        return f"redis://{auth}{values.get('REDIS_HOST')}:{values.get('REDIS_PORT')}/{values.get('REDIS_DB')}"
+    
+    # Startup and health check settings (seconds)
+    STARTUP_TIMEOUT_MONGODB: float = float(os.getenv("STARTUP_TIMEOUT_MONGODB", "15"))
+    STARTUP_TIMEOUT_POSTGRES: float = float(os.getenv("STARTUP_TIMEOUT_POSTGRES", "10"))
+    STARTUP_TIMEOUT_REDIS: float = float(os.getenv("STARTUP_TIMEOUT_REDIS", "3"))
+    HEALTH_CHECK_INTERVAL: float = float(os.getenv("HEALTH_CHECK_INTERVAL", "15"))
+    HEALTH_CHECK_TIMEOUT: float = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+    
+    # Rate limiting settings (limits are "<count>/<second|minute|hour|day>")
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_AUTH_IP: str = os.getenv("RATE_LIMIT_AUTH_IP", "10/minute")
+    RATE_LIMIT_AI_USER: str = os.getenv("RATE_LIMIT_AI_USER", "20/minute")
+    RATE_LIMIT_AI_IP: str = os.getenv("RATE_LIMIT_AI_IP", "60/minute")
+    RATE_LIMIT_DEFAULT_IP: str = os.getenv("RATE_LIMIT_DEFAULT_IP", "300/minute")
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "False").lower() == "true"
+    RATE_LIMIT_REDIS_RETRY_SECONDS: int = int(os.getenv("RATE_LIMIT_REDIS_RETRY_SECONDS", "30"))
     
     # Gemini settings
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-pro")
+    # Embeddings sized to the vector(1536) columns
+    GEMINI_EMBEDDING_MODEL: str = os.getenv("GEMINI_EMBEDDING_MODEL", "models/gemini-embedding-001")
+    GEMINI_EMBEDDING_DIMENSIONS: int = int(os.getenv("GEMINI_EMBEDDING_DIMENSIONS", "1536"))
     
     # Email settings
     EMAILS_ENABLED: bool = False
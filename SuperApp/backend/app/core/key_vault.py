@@ -0,0 +1,215 @@
+"""
+API key vault with key rotation and a short-lived plaintext cache.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+from app.core.cache import InvalidationEvent, cache_registry
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _CacheEntry:
+    """Decrypted key held as a mutable buffer so it can be wiped."""
+
+    __slots__ = ("plaintext", "expires_at")
+
+    def __init__(self, plaintext: bytearray, expires_at: float):
+        self.plaintext = plaintext
+        self.expires_at = expires_at
+
+    def zeroize(self) -> None:
+        """Overwrite the plaintext buffer in place."""
+        for i in range(len(self.plaintext)):
+            self.plaintext[i] = 0
+
+
+class KeyVault:
+    """
+    Encrypts and decrypts API keys with MultiFernet.
+
+    The first key encrypts, every key decrypts, so old keys can be retired by
+    re-encrypting stored values with ``rotate``. Decrypted keys are cached in
+    memory only, keyed by a hash of the ciphertext, for ``cache_ttl`` seconds
+    and wiped when evicted; ``start_key_cache_sweep`` wipes expired entries
+    that are not looked up again. Callers still receive a ``str`` copy, which Python
+    cannot wipe, so keep the returned value scoped to the request.
+    """
+
+    def __init__(self, keys: List[str], cache_ttl: int = 300, max_entries: int = 1024):
+        if not keys:
+            raise ValueError("At least one encryption key is required")
+        self._primary = Fernet(keys[0].encode())
+        self._fernet = MultiFernet([self._primary] + [Fernet(k.encode()) for k in keys[1:]])
+        self._cache_ttl = cache_ttl
+        self._max_entries = max_entries
+        self._cache: "OrderedDict[bytes, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> Optional["KeyVault"]:
+        """Create a vault from settings, or None if no key is configured."""
+        if not settings.API_KEY_ENCRYPTION_SECRET:
+            return None
+        previous = [k.strip() for k in settings.API_KEY_ENCRYPTION_PREVIOUS_SECRETS.split(",") if k.strip()]
+        return cls(
+            [settings.API_KEY_ENCRYPTION_SECRET] + previous,
+            cache_ttl=settings.API_KEY_CACHE_TTL_SECONDS,
+            max_entries=settings.API_KEY_CACHE_MAX_ENTRIES,
+        )
+
+    def encrypt(self, api_key: str) -> str:
+        """Encrypt an API key with the primary key."""
+        return self._fernet.encrypt(api_key.encode()).decode()
+
+    def decrypt(self, encrypted_api_key: str) -> str:
+        """
+        Decrypt an API key, serving repeated lookups from the cache.
+
+        Args:
+            encrypted_api_key: Fernet token
+
+        Returns:
+            Decrypted API key
+
+        Raises:
+            InvalidToken: If no configured key can decrypt the token
+        """
+        cache_key = hashlib.sha256(encrypted_api_key.encode()).digest()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._cache.move_to_end(cache_key)
+                    return entry.plaintext.decode()
+                self._evict(cache_key)
+
+        plaintext = bytearray(self._fernet.decrypt(encrypted_api_key.encode()))
+        api_key = plaintext.decode()
+
+        with self._lock:
+            if cache_key in self._cache:
+                self._evict(cache_key)
+            self._cache[cache_key] = _CacheEntry(plaintext, now + self._cache_ttl)
+            while len(self._cache) > self._max_entries:
+                self._evict(next(iter(self._cache)))
+
+        return api_key
+
+    def rotate(self, encrypted_api_key: str) -> Optional[str]:
+        """
+        Re-encrypt a token with the primary key if it uses a retired key.
+
+        Args:
+            encrypted_api_key: Fernet token
+
+        Returns:
+            The re-encrypted token, or None if it already uses the primary key
+
+        Raises:
+            InvalidToken: If no configured key can decrypt the token
+        """
+        try:
+            self._primary.decrypt(encrypted_api_key.encode())
+            return None
+        except InvalidToken:
+            pass
+        rotated = self._fernet.rotate(encrypted_api_key.encode()).decode()
+        self.invalidate(encrypted_api_key)
+        return rotated
+
+    def invalidate(self, encrypted_api_key: str) -> None:
+        """Drop a cached plaintext, e.g. when the stored key changes."""
+        cache_key = hashlib.sha256(encrypted_api_key.encode()).digest()
+        with self._lock:
+            if cache_key in self._cache:
+                self._evict(cache_key)
+
+    def clear(self) -> None:
+        """Wipe and drop every cached plaintext."""
+        with self._lock:
+            for cache_key in list(self._cache):
+                self._evict(cache_key)
+
+    def purge_expired(self) -> int:
+        """Wipe cached plaintexts past their TTL and return how many."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, entry in self._cache.items() if entry.expires_at <= now]
+            for cache_key in expired:
+                self._evict(cache_key)
+        return len(expired)
+
+    @property
+    def cache_ttl(self) -> int:
+        return self._cache_ttl
+
+    def _evict(self, cache_key: bytes) -> None:
+        """Remove a cache entry and zeroize it. Caller holds the lock."""
+        entry = self._cache.pop(cache_key)
+        entry.zeroize()
+
+
+# Global vault instance (None when API_KEY_ENCRYPTION_SECRET is not set or invalid)
+try:
+    key_vault = KeyVault.from_settings()
+except Exception as e:
+    logger.warning(f"Failed to initialize the API key vault: {e}")
+    logger.warning("API keys will not be encrypted properly!")
+    key_vault = None
+
+# ApiKey fields whose updates wipe the cached plaintexts
+_KEY_FIELDS = {"key", "is_active"}
+
+
+def _on_api_key_change(event: InvalidationEvent) -> None:
+    """
+    Wipe cached plaintexts when a key is deleted, replaced, deactivated or
+    re-keyed. Cached plaintexts are keyed by ciphertext and cannot go
+    stale, but such a key should not stay decrypted in any worker; quota
+    updates, by far the most frequent writes, leave the cache alone.
+    """
+    if event.operation == "insert":
+        return
+    if event.operation == "update" and event.fields is not None and not _KEY_FIELDS & set(event.fields):
+        return
+    key_vault.clear()
+
+
+if key_vault is not None:
+    cache_registry.register("api_keys", _on_api_key_change, key_vault.clear)
+
+
+def start_key_cache_sweep(interval: Optional[int] = None) -> Optional[asyncio.Task]:
+    """
+    Wipe expired plaintexts every ``interval`` seconds (default: the cache TTL).
+
+    Returns:
+        The running task, or None if no vault is configured
+    """
+    if key_vault is None:
+        return None
+    interval = interval or key_vault.cache_ttl
+
+    async def run():
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                purged = key_vault.purge_expired()
+                if purged:
+                    logger.debug(f"Wiped {purged} expired API key plaintexts")
+            except Exception as e:
+                logger.error(f"API key cache sweep failed: {e}")
+
+    return asyncio.create_task(run(), name="key-cache-sweep")
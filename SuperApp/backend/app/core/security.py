@@ -6,12 +6,12 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional, Union
 
-import jwt
 from passlib.context import CryptContext
-from cryptography.fernet import Fernet
+from cryptography.fernet import InvalidToken
 from jose import jwt, JWTError
 
 from app.core.config import settings
+from app.core.key_vault import key_vault
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +19,9 @@ logger = logging.getLogger(__name__)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # API key encryption
-try:
-    fernet_key = Fernet(settings.API_KEY_ENCRYPTION_SECRET.encode())
-except Exception as e:
-    logger.warning(f"Failed to initialize Fernet for API key encryption: {e}")
+if key_vault is None:
+    logger.warning("API_KEY_ENCRYPTION_SECRET is not set")
     logger.warning("API keys will not be encrypted properly!")
-    fernet_key = None
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -134,25 +131,28 @@ def encrypt_api_key(api_key: str) -> str:
     Returns:
         Encrypted API key
     """
-    if not fernet_key:
+    if not key_vault:
         logger.warning("API key encryption not available. Using fallback method.")
         # Simple fallback encryption (not secure)
         return f"mock_encrypted_{api_key[-8:]}"
     
-    return fernet_key.encrypt(api_key.encode()).decode()
+    return key_vault.encrypt(api_key)
 
 
 def decrypt_api_key(encrypted_api_key: str) -> Optional[str]:
     """
     Decrypt API key.
     
+    Repeated lookups of the same stored key are served from the vault's
+    short-lived in-memory cache instead of running Fernet again.
+    
     Args:
         encrypted_api_key: Encrypted API key
         
     Returns:
         Decrypted API key or None on failure
     """
-    if not fernet_key:
+    if not key_vault:
         logger.warning("API key decryption not available. Using fallback method.")
         # Simple fallback decryption (not secure)
         if encrypted_api_key.startswith("mock_encrypted_"):
@@ -160,7 +160,10 @@ def decrypt_api_key(encrypted_api_key: str) -> Optional[str]:
         return None
     
     try:
-        return fernet_key.decrypt(encrypted_api_key.encode()).decode()
+        return key_vault.decrypt(encrypted_api_key)
+    except InvalidToken:
+        logger.error("Failed to decrypt API key: no configured key matches")
+        return None
     except Exception as e:
         logger.error(f"Failed to decrypt API key: {e}")
         return None
@@ -0,0 +1,129 @@
+"""
+Dependency health tracking for liveness and readiness probes.
+
+Startup records the outcome of each dependency initialization, and a
+background monitor re-checks them periodically. Probes read the cached
+status, so they never wait on a slow dependency.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyStatus:
+    """Last known status of one dependency."""
+
+    def __init__(self, name: str, required: bool):
+        self.name = name
+        self.required = required
+        self.healthy = False
+        self.detail: Optional[str] = "not checked"
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "required": self.required,
+            "detail": self.detail,
+            "latency_ms": self.latency_ms,
+            "checked_at": self.checked_at.isoformat() + "Z" if self.checked_at else None,
+        }
+
+
+class DependencyHealth:
+    """Registry of dependency checks and their cached results."""
+
+    def __init__(self):
+        self._statuses: Dict[str, DependencyStatus] = {}
+        self._checks: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._monitor: Optional[asyncio.Task] = None
+
+    def register(self, name: str, check: Callable[[], Awaitable[Any]], required: bool = False) -> None:
+        """
+        Register a dependency check.
+
+        Args:
+            name: Dependency name shown in probe responses
+            check: Coroutine function raising if the dependency is unusable
+            required: Whether the worker is not ready without it
+        """
+        self._checks[name] = check
+        if name not in self._statuses:
+            self._statuses[name] = DependencyStatus(name, required)
+        else:
+            self._statuses[name].required = required
+
+    def record(self, name: str, healthy: bool, detail: Optional[str] = None, latency_ms: Optional[float] = None) -> None:
+        """Store the outcome of a check or initialization."""
+        status = self._statuses.setdefault(name, DependencyStatus(name, required=False))
+        if status.healthy != healthy and status.checked_at is not None:
+            log = logger.info if healthy else logger.warning
+            log(f"Dependency {name} is now {'healthy' if healthy else 'unhealthy'}: {detail}")
+        status.healthy = healthy
+        status.detail = detail
+        status.latency_ms = latency_ms
+        status.checked_at = datetime.utcnow()
+
+    async def check(self, name: str, timeout: float = settings.HEALTH_CHECK_TIMEOUT) -> bool:
+        """Run one registered check with a deadline and record the result."""
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._checks[name](), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.record(name, False, f"timed out after {timeout}s")
+            return False
+        except Exception as e:
+            self.record(name, False, str(e))
+            return False
+        self.record(name, True, "ok", round((time.perf_counter() - start) * 1000, 2))
+        return True
+
+    async def check_all(self) -> None:
+        """Run all registered checks concurrently."""
+        await asyncio.gather(*(self.check(name) for name in self._checks))
+
+    @property
+    def ready(self) -> bool:
+        """Whether every required dependency is healthy."""
+        return all(s.healthy for s in self._statuses.values() if s.required)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Cached status of every dependency."""
+        return {name: status.to_dict() for name, status in self._statuses.items()}
+
+    def start_monitor(self, interval: float = settings.HEALTH_CHECK_INTERVAL) -> None:
+        """Re-check all dependencies in the background every ``interval`` seconds."""
+        if self._monitor is not None and not self._monitor.done():
+            return
+
+        async def run():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.check_all()
+                except Exception as e:
+                    logger.error(f"Dependency health check failed: {e}")
+
+        self._monitor = asyncio.create_task(run(), name="dependency-health")
+
+    async def stop_monitor(self) -> None:
+        """Stop the background monitor."""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+
+# Global dependency health registry
+dependency_health = DependencyHealth()
@@ -1,15 +1,27 @@
 """
 Database initialization module.
+
+Independent dependencies are initialized concurrently, each with its own
+deadline. MongoDB is required; PostgreSQL, the vector extension and Redis are
+optional and the application starts in a degraded mode without them. Every
+outcome is recorded in ``dependency_health`` for the readiness probe.
 """
 
+import asyncio
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
 import redis.asyncio as redis
 
 from app.core.config import settings
-from app.db.mongodb.client import get_mongodb_client, close_mongodb_client
-from app.db.postgres.session import get_db_engine, get_async_session
+from app.db.health import dependency_health
+from app.db.mongodb.client import close_mongodb_client, connect_mongodb
+from app.db.mongodb.init_db import init_mongodb as init_mongodb_odm
+from app.db.postgres.session import dispose_engine, get_engine, is_engine_initialized
+from app.db.redis.client import get_redis_client, close_redis_client
 
 logger = logging.getLogger(__name__)
 
@@ -18,20 +30,13 @@ async def init_mongodb():
     """Initialize MongoDB connection."""
     logger.info("Initializing MongoDB connection")
     
-    # Create MongoDB client
-    client = AsyncIOMotorClient(settings.MONGODB_URL)
-    
-    # Test connection
-    try:
-        # The ismaster command is cheap and does not require auth
-        await client.admin.command('ismaster')
-        logger.info("MongoDB connection successful")
-    except Exception as e:
-        logger.error(f"MongoDB connection failed: {e}")
-        raise
+    # Shared client and Beanie models (one pool per worker)
+    client = await init_mongodb_odm()
+    logger.info("MongoDB connection successful")
     
-    # Set client in app state
-    await get_mongodb_client(client=client)
+    # Warm up the pool so first requests do not pay for handshakes
+    warm = max(1, settings.MONGODB_MIN_POOL_SIZE)
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(warm)))
     
     return client
 
@@ -40,34 +45,24 @@ async def init_postgres():
     """Initialize PostgreSQL connection."""
     logger.info("Initializing PostgreSQL connection")
     
-    # Create engine and session factory
-    engine = create_async_engine(
-        settings.SQLALCHEMY_DATABASE_URI,
-        echo=settings.DEBUG,
-        pool_pre_ping=True,
-    )
+    # Shared engine of this process (pool sized by the POSTGRES_POOL_* settings)
+    engine = get_engine()
     
-    # Test connection
-    try:
+    # Test connection and warm up the pool with concurrent checkouts
+    async def ping():
         async with engine.connect() as conn:
-            await conn.execute("SELECT 1")
+            await conn.execute(text("SELECT 1"))
+    
+    try:
+        warm = engine.pool.size() if hasattr(engine.pool, "size") else 1
+        await asyncio.gather(*(ping() for _ in range(max(1, warm))))
         logger.info("PostgreSQL connection successful")
-    except Exception as e:
+    except BaseException as e:
         logger.error(f"PostgreSQL connection failed: {e}")
+        await dispose_engine()
         raise
     
-    # Create sessionmaker
-    async_session_factory = async_sessionmaker(
-        engine, 
-        expire_on_commit=False,
-        autoflush=False,
-    )
-    
-    # Set engine and session in app state
-    get_db_engine.set(engine)
-    get_async_session.set(async_session_factory)
-    
-    return engine, async_session_factory
+    return engine
 
 
 async def init_redis():
@@ -75,55 +70,112 @@ async def init_redis():
     logger.info("Initializing Redis connection")
     
     # Create Redis client
-    try:
-        redis_client = redis.from_url(
-            settings.REDIS_URI,
-            encoding="utf-8",
-            decode_responses=True,
-        )
-        
-        # Test connection
-        await redis_client.ping()
-        logger.info("Redis connection successful")
-        
-        return redis_client
-    except Exception as e:
-        logger.error(f"Redis connection failed: {e}")
-        logger.warning("Continuing without Redis. Some features may not work correctly.")
-        return None
+    redis_client = redis.from_url(
+        settings.REDIS_URI,
+        encoding="utf-8",
+        decode_responses=True,
+    )
+    
+    # Test connection
+    await redis_client.ping()
+    logger.info("Redis connection successful")
+    
+    # Share client with rate limiting and caches
+    get_redis_client(client=redis_client)
+    
+    return redis_client
 
 
-async def init_vector_extensions():
+async def init_vector_extensions(engine: AsyncEngine):
     """Initialize vector extensions for PostgreSQL."""
     logger.info("Initializing vector extensions")
     
     if settings.VECTOR_DB_TYPE == "postgres":
         try:
-            engine = get_db_engine()
             async with engine.begin() as conn:
                 # Create pgvector extension if not exists
-                await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
             logger.info("Vector extension initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize vector extension: {e}")
             raise
 
 
-async def init_db():
-    """Initialize all database connections."""
-    # Initialize MongoDB
-    await init_mongodb()
-    
-    # Initialize PostgreSQL
-    await init_postgres()
-    
-    # Initialize Redis (optional)
-    await init_redis()
+async def _init_dependency(
+    name: str,
+    init: Callable[[], Awaitable[Any]],
+    timeout: float,
+    required: bool,
+) -> Optional[Any]:
+    """
+    Run one initialization with a deadline and record its outcome.
+    
+    Args:
+        name: Dependency name
+        init: Initialization coroutine function
+        timeout: Deadline in seconds
+        required: Raise instead of degrading when initialization fails
+        
+    Returns:
+        The initialization result, or None if an optional dependency failed
+    """
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(init(), timeout=timeout)
+    except Exception as e:
+        detail = f"timed out after {timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+        dependency_health.record(name, False, detail)
+        if required:
+            raise RuntimeError(f"Required dependency {name} failed to start: {detail}") from e
+        logger.warning(f"Continuing without {name}: {detail}. Some features may not work correctly.")
+        return None
     
-    # Initialize vector extensions
-    await init_vector_extensions()
+    dependency_health.record(name, True, "ok", round((time.perf_counter() - start) * 1000, 2))
+    return result
+
+
+async def _init_postgres_stack():
+    """Initialize PostgreSQL, then the vector extension on the same engine."""
+    engine = await init_postgres()
+    if settings.VECTOR_DB_TYPE == "postgres":
+        await _init_dependency(
+            "vector",
+            lambda: init_vector_extensions(engine),
+            settings.STARTUP_TIMEOUT_POSTGRES,
+            required=False,
+        )
+    return engine
+
+
+async def _check_postgres():
+    """Readiness check for PostgreSQL."""
+    if not is_engine_initialized():
+        raise RuntimeError("PostgreSQL engine is not initialized")
+    engine = get_engine()
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+def _register_health_checks():
+    """Register the periodic checks behind the readiness probe."""
+    dependency_health.register("mongodb", lambda: connect_mongodb().admin.command("ping"), required=True)
+    dependency_health.register("postgres", _check_postgres, required=False)
+    dependency_health.register("redis", lambda: get_redis_client().ping(), required=False)
+
+
+async def init_db():
+    """Initialize all database connections concurrently."""
+    _register_health_checks()
+    
+    start = time.perf_counter()
+    await asyncio.gather(
+        _init_dependency("mongodb", init_mongodb, settings.STARTUP_TIMEOUT_MONGODB, required=True),
+        _init_dependency("postgres", _init_postgres_stack, settings.STARTUP_TIMEOUT_POSTGRES, required=False),
+        _init_dependency("redis", init_redis, settings.STARTUP_TIMEOUT_REDIS, required=False),
+    )
     
-    logger.info("All database connections initialized successfully")
+    elapsed = time.perf_counter() - start
+    logger.info(f"Database initialization finished in {elapsed:.2f}s: {dependency_health.snapshot()}")
 
 
 async def close_db_connections():
@@ -134,8 +186,9 @@ async def close_db_connections():
     await close_mongodb_client()
     
     # Close PostgreSQL connection
-    engine = get_db_engine()
-    if engine:
-        await engine.dispose()
+    await dispose_engine()
+    
+    # Close Redis connection
+    await close_redis_client()
     
     logger.info("Database connections closed") 
\ No newline at end of file
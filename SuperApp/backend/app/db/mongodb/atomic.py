@@ -0,0 +1,298 @@
+"""
+Atomic field updates on MongoDB models.
+
+Counters such as ``ApiKey.quota_used`` and ``LinkedInPost.engagement_stats``
+are updated with ``$inc``/``$set``/``$max`` issued directly to the server,
+optionally guarded by a filter condition, instead of a load, mutate,
+``save()`` cycle. Each update is one round trip (plus the outbox mark
+below) and concurrent updates never overwrite each other.
+
+Updates of replicated collections (LinkedIn posts) also mark the matched
+entities with ``record_coalesced``, a second round trip outside any
+transaction that adds at most one pending outbox event per entity, so the
+PostgreSQL copy follows hot counters without an event per increment.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from beanie import Document
+from pymongo import ReturnDocument, UpdateOne
+
+from app.db.mongodb.models import ApiKey, LinkedInPost
+from app.db.mongodb.outbox import REPLICATED_COLLECTIONS, record_coalesced
+
+logger = logging.getLogger(__name__)
+
+
+def build_update(
+    inc: Optional[Dict[str, Any]] = None,
+    set: Optional[Dict[str, Any]] = None,
+    max: Optional[Dict[str, Any]] = None,
+    touch: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Build an update document from field operations.
+
+    Args:
+        inc: Fields to increment by the given amounts
+        set: Fields to set
+        max: Fields to raise to the given values if currently lower
+        touch: Also set ``updated_at``
+
+    Returns:
+        Update document for ``update_one``/``UpdateOne``
+    """
+    update: Dict[str, Dict[str, Any]] = {}
+    if inc:
+        update["$inc"] = dict(inc)
+    if set or touch:
+        update["$set"] = dict(set or {})
+        if touch:
+            update["$set"]["updated_at"] = datetime.utcnow()
+    if max:
+        update["$max"] = dict(max)
+    if not update:
+        raise ValueError("Update has no operations")
+    return update
+
+
+async def atomic_update(
+    model: Type[Document],
+    doc_id: str,
+    inc: Optional[Dict[str, Any]] = None,
+    set: Optional[Dict[str, Any]] = None,
+    max: Optional[Dict[str, Any]] = None,
+    condition: Optional[Dict[str, Any]] = None,
+    touch: bool = True,
+    projection: Optional[Dict[str, int]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Apply an update to one document if it matches a condition.
+
+    Args:
+        model: Document model
+        doc_id: Document ID
+        inc: Fields to increment
+        set: Fields to set
+        max: Fields to raise to a value if currently lower
+        condition: Extra filter the document must match
+        touch: Also set ``updated_at``
+        projection: Fields of the updated document to return
+
+    Returns:
+        The updated raw document (projected), or None if no document matched
+    """
+    query = {"_id": doc_id, **(condition or {})}
+    collection = model.get_motor_collection()
+    doc = await collection.find_one_and_update(
+        query,
+        build_update(inc, set, max, touch),
+        projection=projection or {"_id": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is not None and collection.name in REPLICATED_COLLECTIONS:
+        await record_coalesced(collection.name, [doc_id])
+    return doc
+
+
+class AtomicBatch:
+    """
+    Collects atomic updates and sends them with one ``bulk_write`` per model.
+
+    Example::
+
+        batch = AtomicBatch()
+        for post_id, delta in deltas.items():
+            add_engagement(batch, post_id, **delta)
+        await batch.execute()
+    """
+
+    def __init__(self):
+        self._operations: Dict[Type[Document], List[UpdateOne]] = {}
+        self._ids: Dict[Type[Document], List[str]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(ops) for ops in self._operations.values())
+
+    def add(
+        self,
+        model: Type[Document],
+        doc_id: str,
+        inc: Optional[Dict[str, Any]] = None,
+        set: Optional[Dict[str, Any]] = None,
+        max: Optional[Dict[str, Any]] = None,
+        condition: Optional[Dict[str, Any]] = None,
+        touch: bool = True,
+    ) -> None:
+        """Queue an update; arguments are as for ``atomic_update``."""
+        query = {"_id": doc_id, **(condition or {})}
+        self._operations.setdefault(model, []).append(
+            UpdateOne(query, build_update(inc, set, max, touch))
+        )
+        self._ids.setdefault(model, []).append(doc_id)
+
+    async def execute(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Send all queued updates, unordered, and clear the batch.
+
+        Returns:
+            Dict mapping collection name to (matched, modified) counts
+        """
+        results = {}
+        operations, self._operations = self._operations, {}
+        ids, self._ids = self._ids, {}
+        for model, ops in operations.items():
+            collection = model.get_motor_collection()
+            result = await collection.bulk_write(ops, ordered=False)
+            results[collection.name] = (result.matched_count, result.modified_count)
+            if collection.name in REPLICATED_COLLECTIONS and result.matched_count:
+                changed = list(dict.fromkeys(ids[model]))
+                if result.matched_count < len(ops):
+                    # bulk_write does not say which updates matched; skip ids that do not exist
+                    changed = await collection.distinct("_id", {"_id": {"$in": changed}})
+                await record_coalesced(collection.name, changed)
+        return results
+
+
+def _quota_condition(amount: int) -> Dict[str, Any]:
+    """Filter matching active keys with room for ``amount`` more units."""
+    return {
+        "is_active": True,
+        "$expr": {"$lte": [{"$add": ["$quota_used", amount]}, "$quota_limit"]},
+    }
+
+
+async def consume_quota(api_key_id: str, amount: int = 1) -> Optional[int]:
+    """
+    Use ``amount`` units of an API key's quota if it has room for them.
+
+    Args:
+        api_key_id: API key ID
+        amount: Units to consume
+
+    Returns:
+        Remaining quota after consumption, or None if the key is inactive,
+        missing or would exceed its limit
+    """
+    doc = await atomic_update(
+        ApiKey,
+        api_key_id,
+        inc={"quota_used": amount},
+        condition=_quota_condition(amount),
+        projection={"quota_used": 1, "quota_limit": 1},
+    )
+    if doc is None:
+        return None
+    return doc["quota_limit"] - doc["quota_used"]
+
+
+async def reset_quota(api_key_id: str, reset_date: datetime) -> bool:
+    """
+    Reset an API key's usage once its reset date has passed.
+
+    The date condition makes concurrent resets apply only once.
+
+    Args:
+        api_key_id: API key ID
+        reset_date: Next reset date
+
+    Returns:
+        True if the quota was reset
+    """
+    doc = await atomic_update(
+        ApiKey,
+        api_key_id,
+        set={"quota_used": 0, "quota_reset_date": reset_date},
+        condition={"quota_reset_date": {"$lte": datetime.utcnow()}},
+    )
+    return doc is not None
+
+
+def add_quota_usage(batch: AtomicBatch, api_key_id: str, amount: int) -> None:
+    """Queue a quota consumption, applied only if it stays within the limit."""
+    batch.add(ApiKey, api_key_id, inc={"quota_used": amount}, condition=_quota_condition(amount))
+
+
+def engagement_increments(**deltas: int) -> Dict[str, int]:
+    """
+    Map engagement deltas to ``engagement_stats`` fields.
+
+    Example: ``engagement_increments(likes=3, comments=1)``
+    """
+    return {f"engagement_stats.{name}": value for name, value in deltas.items() if value}
+
+
+# Older posts store ``engagement_stats: null``, where nested $inc/$max fail
+_HAS_STATS = {"engagement_stats": {"$type": "object"}}
+
+
+async def _update_engagement(post_id: str, **operations: Dict[str, int]) -> bool:
+    """Apply an engagement update, initializing a null stats object first."""
+    if await atomic_update(LinkedInPost, post_id, condition=_HAS_STATS, **operations) is not None:
+        return True
+    await LinkedInPost.get_motor_collection().update_one(
+        {"_id": post_id, "engagement_stats": None},
+        {"$set": {"engagement_stats": {}}},
+    )
+    return await atomic_update(LinkedInPost, post_id, condition=_HAS_STATS, **operations) is not None
+
+
+async def record_engagement(post_id: str, **deltas: int) -> bool:
+    """
+    Increment engagement counters of a post.
+
+    Args:
+        post_id: LinkedIn post ID
+        **deltas: Increments per metric (likes, comments, shares, impressions, clicks)
+
+    Returns:
+        True if the post exists
+    """
+    inc = engagement_increments(**deltas)
+    if not inc:
+        return True
+    return await _update_engagement(post_id, inc=inc)
+
+
+async def sync_engagement(post_id: str, **totals: int) -> bool:
+    """
+    Store engagement totals reported by LinkedIn.
+
+    Totals only grow, so ``$max`` keeps the highest value seen and an older,
+    delayed report cannot lower the counters.
+
+    Args:
+        post_id: LinkedIn post ID
+        **totals: Totals per metric
+
+    Returns:
+        True if the post exists
+    """
+    values = {f"engagement_stats.{name}": value for name, value in totals.items()}
+    return await _update_engagement(post_id, max=values)
+
+
+def add_engagement(batch: AtomicBatch, post_id: str, **deltas: int) -> None:
+    """
+    Queue engagement increments for a post.
+
+    Posts whose stats are still null are not matched; use
+    ``record_engagement`` for those.
+    """
+    inc = engagement_increments(**deltas)
+    if inc:
+        batch.add(LinkedInPost, post_id, inc=inc, condition=_HAS_STATS)
+
+
+def add_engagement_totals(batch: AtomicBatch, post_id: str, **totals: int) -> None:
+    """
+    Queue engagement totals reported by LinkedIn, kept with ``$max``.
+
+    Posts whose stats are still null are not matched; use
+    ``sync_engagement`` for those.
+    """
+    values = {f"engagement_stats.{name}": value for name, value in totals.items()}
+    if values:
+        batch.add(LinkedInPost, post_id, max=values, condition=_HAS_STATS)
@@ -0,0 +1,270 @@
+"""
+Cross-worker cache invalidation from MongoDB writes.
+
+Each worker runs one ``ChangeListener``. On a replica set or sharded cluster
+it watches a change stream on the collections with registered caches and
+resumes from the last resume token after transient errors. On a standalone
+server, where change streams are unavailable, writers announce changes with
+``publish_change`` over Redis pub/sub instead. Either way events are applied
+to ``cache_registry`` in every worker.
+
+If events may have been missed (resume token lost or expired, pub/sub
+reconnect), every registered cache is cleared instead.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.cache import CacheRegistry, InvalidationEvent, cache_registry
+from app.core.config import settings
+from app.db.mongodb.client import connect_mongodb
+from app.db.redis.client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Server error codes meaning the resume token can no longer be used
+CHANGE_STREAM_HISTORY_LOST = 286
+CHANGE_STREAM_FATAL_ERROR = 280
+
+# Collections whose writes are watched; caches of other collections are
+# only invalidated through ``publish_change``
+WATCHED_COLLECTIONS = ["users", "api_keys", "linkedin_posts"]
+
+
+class ChangeListener:
+    """Applies writes from any worker to the local cache registry."""
+
+    def __init__(self, registry: CacheRegistry):
+        self._registry = registry
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token: Optional[Dict[str, Any]] = None
+        self.mode: Optional[str] = None
+        self.events = 0
+        self.resumes = 0
+        self.full_clears = 0
+        self.errors = 0
+        self.last_event_at: Optional[datetime] = None
+        self.last_lag_ms: Optional[float] = None
+        self.max_lag_ms: float = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _detect_mode(self) -> str:
+        """Pick change streams when the deployment supports them."""
+        mode = settings.CACHE_INVALIDATION_MODE
+        if mode != "auto":
+            return mode
+        hello = await connect_mongodb().admin.command("hello")
+        if hello.get("setName") or hello.get("msg") == "isdbgrid":
+            return "change_stream"
+        return "redis"
+
+    async def start(self) -> None:
+        """
+        Start listening in the background.
+
+        ``cache_registry.live`` is set only while the stream or subscription
+        is connected, so caches fall back to the database during outages.
+        """
+        if self.active:
+            return
+        self.mode = await self._detect_mode()
+        if self.mode == "off":
+            logger.info("Cache invalidation is disabled; caches of shared data stay off")
+            return
+        run = self._run_change_stream if self.mode == "change_stream" else self._run_pubsub
+        self._task = asyncio.create_task(run(), name="cache-invalidation")
+        logger.info(f"Cache invalidation listening via {self.mode}")
+
+    async def stop(self) -> None:
+        """Stop listening; caches of shared data are disabled again."""
+        self._registry.live = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._registry.clear_all()
+
+    def _apply(self, event: InvalidationEvent) -> None:
+        """Dispatch an event and update the lag metrics."""
+        self.events += 1
+        self.last_event_at = datetime.utcnow()
+        if event.occurred_at is not None:
+            lag = (self.last_event_at - event.occurred_at).total_seconds() * 1000
+            self.last_lag_ms = round(max(lag, 0.0), 2)
+            self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+        self._registry.dispatch(event)
+
+    def _missed_events(self, reason: str) -> None:
+        """Clear every cache because events may have been missed."""
+        logger.warning(f"Clearing local caches: {reason}")
+        self.full_clears += 1
+        self._registry.clear_all()
+
+    @staticmethod
+    def _event_from_change(change: Dict[str, Any]) -> InvalidationEvent:
+        """Build an invalidation event from a change stream document."""
+        collection = change["ns"]["coll"]
+        doc_id = change.get("documentKey", {}).get("_id")
+        full_document = change.get("fullDocument") or {}
+        user_id = doc_id if collection == "users" else full_document.get("user_id")
+        occurred_at = change.get("wallTime")
+        if occurred_at is None and change.get("clusterTime") is not None:
+            occurred_at = change["clusterTime"].as_datetime().replace(tzinfo=None)
+        fields = None
+        description = change.get("updateDescription")
+        if description is not None:
+            changed = list(description.get("updatedFields") or {}) + list(description.get("removedFields") or [])
+            fields = sorted({name.split(".")[0] for name in changed})
+        return InvalidationEvent(collection, change["operationType"], doc_id, user_id, occurred_at, fields)
+
+    async def _run_change_stream(self) -> None:
+        """Watch the database, resuming after errors."""
+        database = connect_mongodb()[settings.MONGODB_DB_NAME]
+        collections = sorted(set(WATCHED_COLLECTIONS) | set(self._registry.collections))
+        pipeline = [
+            {"$match": {"ns.coll": {"$in": collections}}},
+            {"$project": {
+                "operationType": 1,
+                "ns": 1,
+                "documentKey": 1,
+                "clusterTime": 1,
+                "wallTime": 1,
+                "fullDocument.user_id": 1,
+                "updateDescription.updatedFields": 1,
+                "updateDescription.removedFields": 1,
+            }},
+        ]
+        while True:
+            try:
+                async with database.watch(
+                    pipeline,
+                    full_document="updateLookup",
+                    resume_after=self._resume_token,
+                ) as stream:
+                    self._registry.live = True
+                    async for change in stream:
+                        if change["operationType"] == "invalidate":
+                            # The stream is closed and its token cannot be resumed
+                            self._resume_token = None
+                            self._missed_events("change stream invalidated")
+                            break
+                        self._resume_token = stream.resume_token
+                        if change["operationType"] in ("drop", "rename", "dropDatabase"):
+                            self._missed_events(f"change stream {change['operationType']}")
+                            continue
+                        self._apply(self._event_from_change(change))
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                self._registry.live = False
+                self.errors += 1
+                if e.code in (CHANGE_STREAM_HISTORY_LOST, CHANGE_STREAM_FATAL_ERROR):
+                    self._resume_token = None
+                    self._missed_events(f"resume token expired ({e})")
+                else:
+                    logger.error(f"Change stream failed: {e}")
+                    await self._before_retry()
+            except PyMongoError as e:
+                self._registry.live = False
+                self.errors += 1
+                logger.error(f"Change stream failed: {e}")
+                await self._before_retry()
+
+    async def _before_retry(self) -> None:
+        """Wait before reconnecting; without a token the gap is unknown."""
+        await asyncio.sleep(settings.CHANGE_STREAM_RETRY_SECONDS)
+        self.resumes += 1
+        if self._resume_token is None:
+            self._missed_events("change stream restarted without a resume token")
+
+    async def _run_pubsub(self) -> None:
+        """Subscribe to invalidation messages, re-subscribing after errors."""
+        first = True
+        while True:
+            pubsub = get_redis_client().pubsub()
+            try:
+                await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                if not first:
+                    self.resumes += 1
+                    self._missed_events("pub/sub re-subscribed")
+                first = False
+                self._registry.live = True
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        event = InvalidationEvent.from_dict(json.loads(message["data"]))
+                    except (ValueError, KeyError) as e:
+                        logger.warning(f"Ignoring malformed invalidation message: {e}")
+                        continue
+                    self._apply(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._registry.live = False
+                self.errors += 1
+                logger.error(f"Invalidation subscription failed: {e}")
+                await asyncio.sleep(settings.CHANGE_STREAM_RETRY_SECONDS)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "active": self.active,
+            "events": self.events,
+            "resumes": self.resumes,
+            "full_clears": self.full_clears,
+            "errors": self.errors,
+            "last_event_at": self.last_event_at.isoformat() + "Z" if self.last_event_at else None,
+            "last_lag_ms": self.last_lag_ms,
+            "max_lag_ms": self.max_lag_ms,
+            "caches": self._registry.stats(),
+        }
+
+
+# Global listener of this worker
+change_listener = ChangeListener(cache_registry)
+
+
+async def publish_change(
+    collection: str,
+    doc_id: Any,
+    operation: str = "update",
+    user_id: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> None:
+    """
+    Announce a write for workers that cannot watch a change stream.
+
+    Does nothing when the change stream already reports the write. Failures
+    are logged, not raised, so a Redis outage never fails the write itself.
+
+    Args:
+        collection: Collection written to
+        doc_id: ID of the written document
+        operation: insert, update, replace or delete
+        user_id: Owner of the document, if known
+        fields: Top-level fields an update changed, if known
+    """
+    if change_listener.mode in ("change_stream", "off"):
+        return
+    event = InvalidationEvent(collection, operation, doc_id, user_id, datetime.utcnow(), fields)
+    try:
+        await get_redis_client().publish(settings.CACHE_INVALIDATION_CHANNEL, json.dumps(event.to_dict()))
+    except Exception as e:
+        logger.warning(f"Could not publish invalidation for {collection}/{doc_id}: {e}")
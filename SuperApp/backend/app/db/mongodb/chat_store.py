@@ -0,0 +1,238 @@
+"""
+Bucketed chat message store.
+
+Messages are stored in ``chat_message_buckets`` documents of at most
+``bucket_size`` messages each, keyed by session. The size is stored on the
+session when it is created (CHAT_BUCKET_SIZE at that time), so changing
+the setting never moves existing messages to other buckets. An append is
+one update of the session (assigning the message sequence number and
+updating its summary) and one ``$push`` upsert on the target bucket, so
+its cost does not depend on the conversation length.
+
+Existing sessions with embedded messages are migrated with the
+application stopped (see ``migrate_embedded_messages``)::
+
+    python -m app.db.mongodb.chat_store --migrate
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import DESCENDING, ReplaceOne, ReturnDocument
+
+from app.core.config import settings
+from app.db.mongodb.models import ChatMessage, ChatMessageBucket, ChatSession
+
+logger = logging.getLogger(__name__)
+
+# Characters of the last message kept on the session for list views
+PREVIEW_LENGTH = 200
+
+
+def _bucket_id(session_id: str, bucket: int) -> str:
+    """ID of a session's bucket."""
+    return f"{session_id}:{bucket}"
+
+
+async def append_message(session_id: str, role: str, content: str) -> ChatMessage:
+    """
+    Append a message to a chat session.
+
+    Args:
+        session_id: Chat session ID
+        role: Message role (user, assistant, system)
+        content: Message content
+
+    Returns:
+        ChatMessage: The stored message with its sequence number
+
+    Raises:
+        LookupError: If the session does not exist
+    """
+    now = datetime.utcnow()
+    # Pipeline update: sessions stored without a bucket size get the current one
+    session = await ChatSession.get_motor_collection().find_one_and_update(
+        {"_id": session_id},
+        [{"$set": {
+            "message_count": {"$add": [{"$ifNull": ["$message_count", 0]}, 1]},
+            "bucket_size": {"$ifNull": ["$bucket_size", settings.CHAT_BUCKET_SIZE]},
+            "last_message_at": now,
+            "last_message_preview": {"$literal": content[:PREVIEW_LENGTH]},
+            "updated_at": now,
+        }}],
+        projection={"message_count": 1, "bucket_size": 1, "user_id": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if session is None:
+        raise LookupError(f"Chat session {session_id} not found")
+
+    seq = session["message_count"] - 1
+    bucket = seq // session["bucket_size"]
+    message = ChatMessage(role=role, content=content, timestamp=now, seq=seq)
+
+    await ChatMessageBucket.get_motor_collection().update_one(
+        {"_id": _bucket_id(session_id, bucket)},
+        {
+            "$push": {"messages": message.dict()},
+            "$inc": {"message_count": 1},
+            "$set": {"updated_at": now},
+            "$setOnInsert": {
+                "session_id": session_id,
+                "user_id": session["user_id"],
+                "bucket": bucket,
+                "created_at": now,
+            },
+        },
+        upsert=True,
+    )
+    return message
+
+
+async def get_messages(
+    session_id: str,
+    limit: int = 50,
+    before_seq: Optional[int] = None,
+) -> Tuple[List[ChatMessage], Optional[int]]:
+    """
+    Read a page of a session's history, oldest message first.
+
+    Args:
+        session_id: Chat session ID
+        limit: Maximum number of messages
+        before_seq: Only return messages before this sequence number
+            (None for the latest messages)
+
+    Returns:
+        Tuple of (messages, before_seq for the previous page or None)
+    """
+    session = await ChatSession.get_motor_collection().find_one(
+        {"_id": session_id}, {"message_count": 1, "bucket_size": 1}
+    )
+    if session is None:
+        return [], None
+    if before_seq is None:
+        before_seq = session.get("message_count", 0)
+    if before_seq <= 0:
+        return [], None
+
+    size = session.get("bucket_size") or settings.CHAT_BUCKET_SIZE
+    upper_bucket = (before_seq - 1) // size
+    # Enough buckets to cover the page even if the top one is partly used
+    bucket_count = (limit + size - 1) // size + 1
+
+    buckets = await ChatMessageBucket.get_motor_collection().find(
+        {"session_id": session_id, "bucket": {"$lte": upper_bucket}},
+        {"messages": 1},
+    ).sort("bucket", DESCENDING).limit(bucket_count).to_list(bucket_count)
+
+    raw = [m for b in buckets for m in b.get("messages", []) if m["seq"] < before_seq]
+    raw.sort(key=lambda m: m["seq"])
+    page = raw[-limit:]
+
+    messages = [ChatMessage(**m) for m in page]
+    previous = messages[0].seq if messages and messages[0].seq > 0 else None
+    return messages, previous
+
+
+def _build_buckets(session: Dict[str, Any], size: int) -> List[Dict[str, Any]]:
+    """Split a legacy session's embedded messages into bucket documents."""
+    now = datetime.utcnow()
+    buckets = []
+    messages = session.get("messages") or []
+    for start in range(0, len(messages), size):
+        page = []
+        for offset, message in enumerate(messages[start:start + size]):
+            page.append({**message, "seq": start + offset})
+        bucket = start // size
+        buckets.append({
+            "_id": _bucket_id(session["_id"], bucket),
+            "session_id": session["_id"],
+            "user_id": session.get("user_id"),
+            "bucket": bucket,
+            "message_count": len(page),
+            "messages": page,
+            "created_at": page[0].get("timestamp", now),
+            "updated_at": now,
+        })
+    return buckets
+
+
+async def migrate_embedded_messages(batch_size: int = 100) -> int:
+    """
+    Move embedded ``ChatSession.messages`` into message buckets.
+
+    Buckets are written with upserts by ID, so the migration can be re-run
+    safely after an interruption. The embedded list is removed only after
+    its buckets are stored.
+
+    Run it with the application stopped: each bucket is replaced whole and
+    ``message_count`` is reset to the embedded messages, so messages
+    appended to a session while it is being migrated would be overwritten.
+
+    Args:
+        batch_size: Sessions read per batch
+
+    Returns:
+        Number of sessions migrated
+    """
+    sessions = ChatSession.get_motor_collection()
+    buckets = ChatMessageBucket.get_motor_collection()
+    migrated = 0
+
+    while True:
+        batch = await sessions.find(
+            {"messages": {"$exists": True}},
+            {"messages": 1, "user_id": 1, "bucket_size": 1},
+        ).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+
+        for session in batch:
+            size = session.get("bucket_size") or settings.CHAT_BUCKET_SIZE
+            new_buckets = _build_buckets(session, size)
+            if new_buckets:
+                await buckets.bulk_write(
+                    [ReplaceOne({"_id": b["_id"]}, b, upsert=True) for b in new_buckets],
+                    ordered=False,
+                )
+            messages = session.get("messages") or []
+            summary: Dict[str, Any] = {"message_count": len(messages), "bucket_size": size}
+            if messages:
+                summary["last_message_at"] = messages[-1].get("timestamp")
+                summary["last_message_preview"] = (messages[-1].get("content") or "")[:PREVIEW_LENGTH]
+            await sessions.update_one(
+                {"_id": session["_id"]},
+                {"$set": summary, "$unset": {"messages": ""}},
+            )
+            migrated += 1
+
+        logger.info(f"Migrated {migrated} chat sessions to message buckets")
+
+    return migrated
+
+
+async def _main(args: argparse.Namespace) -> int:
+    """Command line entry point."""
+    from app.db.mongodb.client import close_mongodb_client
+    from app.db.mongodb.init_db import init_mongodb
+
+    await init_mongodb()
+    try:
+        if args.migrate:
+            count = await migrate_embedded_messages(args.batch_size)
+            print(f"Migrated {count} chat sessions")
+        return 0
+    finally:
+        await close_mongodb_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat message bucket maintenance")
+    parser.add_argument("--migrate", action="store_true", help="move embedded messages into buckets (application stopped)")
+    parser.add_argument("--batch-size", type=int, default=100)
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
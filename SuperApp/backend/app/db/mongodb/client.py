@@ -3,24 +3,112 @@ MongoDB client module.
 """
 
 import logging
-from typing import Optional, Callable, Any
+import threading
+from typing import Optional, Callable, Any, Dict
 from functools import lru_cache, wraps
 from contextlib import asynccontextmanager
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Global client variable
-_client: Optional[AsyncIOMotorClient] = None
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Collects connection pool counters per server address."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+    
+    def _bump(self, address: Any, **changes: int) -> None:
+        key = f"{address[0]}:{address[1]}"
+        with self._lock:
+            stats = self._stats.setdefault(key, {
+                "open": 0,
+                "in_use": 0,
+                "waiting": 0,
+                "created": 0,
+                "closed": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "pool_clears": 0,
+            })
+            for name, delta in changes.items():
+                stats[name] += delta
+    
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Copy of the current counters."""
+        with self._lock:
+            return {address: dict(stats) for address, stats in self._stats.items()}
+    
+    def pool_created(self, event):
+        self._bump(event.address)
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        self._bump(event.address, pool_clears=1)
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        self._bump(event.address, open=1, created=1)
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        self._bump(event.address, open=-1, closed=1)
+    
+    def connection_check_out_started(self, event):
+        self._bump(event.address, waiting=1)
+    
+    def connection_check_out_failed(self, event):
+        self._bump(event.address, waiting=-1, checkout_failures=1)
+    
+    def connection_checked_out(self, event):
+        self._bump(event.address, waiting=-1, in_use=1, checkouts=1)
+    
+    def connection_checked_in(self, event):
+        self._bump(event.address, in_use=-1)
 
 
 class MongoDBClientManager:
-    """MongoDB client manager with dependency injection support."""
+    """
+    Owns the single MongoDB client of this worker process.
+    
+    Beanie and raw Motor access share this client, so each worker holds
+    exactly one connection pool sized by the MONGODB_* settings.
+    """
     
     def __init__(self):
         self._client: Optional[AsyncIOMotorClient] = None
+        self._pool_listener = PoolStatsListener()
+    
+    def connect(self) -> AsyncIOMotorClient:
+        """Create the client if it does not exist yet and return it."""
+        if self._client is None:
+            logger.debug("Creating MongoDB client")
+            compressors = [c.strip() for c in settings.MONGODB_COMPRESSORS.split(",") if c.strip()]
+            self._client = AsyncIOMotorClient(
+                settings.MONGODB_URI,
+                appname=settings.MONGODB_APP_NAME,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+                connectTimeoutMS=settings.MONGODB_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                socketTimeoutMS=settings.MONGODB_SOCKET_TIMEOUT_MS,
+                compressors=compressors or None,
+                event_listeners=[self._pool_listener],
+            )
+        return self._client
     
     async def get_client(self, client: Optional[AsyncIOMotorClient] = None) -> AsyncIOMotorClient:
         """Get MongoDB client, optionally setting a new client."""
@@ -28,11 +116,7 @@ class MongoDBClientManager:
             self._client = client
             logger.debug("MongoDB client set")
         
-        if self._client is None:
-            logger.debug("Creating new MongoDB client")
-            self._client = AsyncIOMotorClient(settings.MONGODB_URL)
-        
-        return self._client
+        return self.connect()
     
     async def get_db(self, db_name: Optional[str] = None) -> AsyncIOMotorDatabase:
         """Get MongoDB database."""
@@ -40,6 +124,15 @@ class MongoDBClientManager:
         db_name = db_name or settings.MONGODB_DB_NAME
         return client[db_name]
     
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool settings and live counters per server."""
+        return {
+            "connected": self._client is not None,
+            "max_pool_size": settings.MONGODB_MAX_POOL_SIZE,
+            "min_pool_size": settings.MONGODB_MIN_POOL_SIZE,
+            "servers": self._pool_listener.snapshot(),
+        }
+    
     async def close(self):
         """Close MongoDB client."""
         if self._client:
@@ -52,6 +145,16 @@ class MongoDBClientManager:
 _manager = MongoDBClientManager()
 
 
+def connect_mongodb() -> AsyncIOMotorClient:
+    """Get the shared MongoDB client, creating it on first use."""
+    return _manager.connect()
+
+
+def get_mongodb_pool_stats() -> Dict[str, Any]:
+    """Get connection pool statistics of the shared client."""
+    return _manager.pool_stats()
+
+
 @lru_cache()
 def get_mongodb_client():
     """Get MongoDB client dependency."""
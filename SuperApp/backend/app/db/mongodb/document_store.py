@@ -0,0 +1,355 @@
+"""
+Storage of RAG document bodies and chunks.
+
+``Document`` holds only metadata. Bodies are stored in the
+``document_bodies`` GridFS bucket and chunks in the ``document_chunks``
+collection; both are loaded on demand and read in bounded pieces, so memory
+per request does not grow with the document size.
+
+Bodies can be streamed straight to a client::
+
+    return StreamingResponse(stream_content(document), media_type="text/plain")
+
+Documents stored with inline ``content``/``chunks`` are migrated with::
+
+    python -m app.db.mongodb.document_store --migrate
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo import ASCENDING, ReplaceOne
+
+from app.core.config import settings
+from app.db.mongodb.models import Document, DocumentChunk
+from app.db.mongodb.outbox import write_with_outbox
+
+logger = logging.getLogger(__name__)
+
+BODY_BUCKET = "document_bodies"
+
+
+def _body_bucket() -> AsyncIOMotorGridFSBucket:
+    """GridFS bucket on the database the document models are bound to."""
+    return AsyncIOMotorGridFSBucket(
+        Document.get_motor_collection().database,
+        bucket_name=BODY_BUCKET,
+        chunk_size_bytes=settings.DOCUMENT_BODY_CHUNK_BYTES,
+    )
+
+
+def _chunk_id(document_id: str, index: int) -> str:
+    """ID of a document's chunk."""
+    return f"{document_id}:{index}"
+
+
+async def _upload_body(document: Document, content: str) -> ObjectId:
+    """Store a body in GridFS and return its file ID."""
+    return await _body_bucket().upload_from_stream(
+        document.id,
+        content.encode("utf-8"),
+        metadata={"document_id": document.id, "user_id": document.user_id},
+    )
+
+
+async def _delete_body(file_id: Optional[str]) -> None:
+    """Delete a stored body, ignoring files that are already gone."""
+    if not file_id:
+        return
+    try:
+        await _body_bucket().delete(ObjectId(file_id))
+    except Exception as e:
+        logger.warning(f"Could not delete document body {file_id}: {e}")
+
+
+async def save_content(document: Document, content: str) -> Document:
+    """
+    Store or replace a document's body.
+
+    The new body is uploaded before the metadata is switched over, and the
+    previous body is deleted afterwards, so readers never see a missing file.
+
+    Args:
+        document: Document whose body is replaced
+        content: Full text
+
+    Returns:
+        Document: The updated document
+    """
+    previous = document.content_file_id
+    file_id = await _upload_body(document, content)
+
+    document.content_file_id = str(file_id)
+    document.content_length = len(content.encode("utf-8"))
+    document.updated_at = datetime.utcnow()
+    await write_with_outbox(lambda session: document.save(session=session), "documents", [document.id])
+
+    await _delete_body(previous)
+    return document
+
+
+async def save_content_stream(
+    document: Document,
+    pieces: AsyncIterable[bytes],
+    max_bytes: Optional[int] = None,
+) -> Document:
+    """
+    Store or replace a document's body from a stream of byte pieces.
+
+    Like ``save_content``, but the body is never held in memory as a whole,
+    so large uploads can be written as they arrive.
+
+    Args:
+        document: Document whose body is replaced
+        pieces: Consecutive pieces of the UTF-8 body
+        max_bytes: Refuse bodies larger than this (None for no limit)
+
+    Returns:
+        Document: The updated document
+
+    Raises:
+        ValueError: If the body is larger than ``max_bytes``
+    """
+    previous = document.content_file_id
+    stream = _body_bucket().open_upload_stream(
+        document.id,
+        metadata={"document_id": document.id, "user_id": document.user_id},
+    )
+    length = 0
+    try:
+        async for piece in pieces:
+            length += len(piece)
+            if max_bytes is not None and length > max_bytes:
+                raise ValueError(f"Document {document.id} is more than {max_bytes} bytes")
+            await stream.write(piece)
+    except BaseException:
+        await stream.abort()
+        raise
+    await stream.close()
+
+    document.content_file_id = str(stream._id)
+    document.content_length = length
+    document.updated_at = datetime.utcnow()
+    await write_with_outbox(lambda session: document.save(session=session), "documents", [document.id])
+
+    if previous != document.content_file_id:
+        await _delete_body(previous)
+    return document
+
+
+async def stream_content(document: Document) -> AsyncIterator[bytes]:
+    """
+    Stream a document's body in GridFS-chunk-sized pieces.
+
+    Args:
+        document: Document to read
+
+    Yields:
+        bytes: Consecutive pieces of the UTF-8 body
+    """
+    if not document.content_file_id:
+        return
+    stream = await _body_bucket().open_download_stream(ObjectId(document.content_file_id))
+    try:
+        while True:
+            piece = await stream.readchunk()
+            if not piece:
+                break
+            yield piece
+    finally:
+        stream.close()
+
+
+async def read_content(document: Document, max_bytes: Optional[int] = None) -> str:
+    """
+    Read a document's body into memory.
+
+    Args:
+        document: Document to read
+        max_bytes: Refuse bodies larger than this (None for no limit)
+
+    Returns:
+        str: The body text
+
+    Raises:
+        ValueError: If the body is larger than ``max_bytes``
+    """
+    if max_bytes is not None and document.content_length > max_bytes:
+        raise ValueError(
+            f"Document {document.id} is {document.content_length} bytes, more than {max_bytes}"
+        )
+    pieces = [piece async for piece in stream_content(document)]
+    return b"".join(pieces).decode("utf-8")
+
+
+async def save_chunks(document: Document, chunks: Sequence[Dict[str, Any]]) -> Document:
+    """
+    Store or replace a document's chunks.
+
+    Args:
+        document: Document the chunks belong to
+        chunks: Chunk payloads (content, metadata, vector_id, vector_provider)
+
+    Returns:
+        Document: The updated document
+    """
+    now = datetime.utcnow()
+    batch_size = settings.DOCUMENT_CHUNK_BATCH_SIZE
+
+    for start in range(0, len(chunks), batch_size):
+        await save_chunk_batch(document, enumerate(chunks[start:start + batch_size], start=start))
+
+    # Drop chunks left over from a longer previous version
+    await delete_chunks(document.id, from_index=len(chunks))
+
+    document.chunk_count = len(chunks)
+    document.updated_at = now
+    await write_with_outbox(lambda session: document.save(session=session), "documents", [document.id])
+    return document
+
+
+async def save_chunk_batch(document: Document, chunks: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+    """
+    Store or replace some of a document's chunks, by index.
+
+    Does not touch the document, so pipelines can store chunks in batches
+    and in any order, then update the document once.
+
+    Args:
+        document: Document the chunks belong to
+        chunks: Pairs of (index, chunk payload)
+
+    Returns:
+        Number of chunks written
+    """
+    now = datetime.utcnow()
+    operations = []
+    for index, payload in chunks:
+        chunk = DocumentChunk(
+            id=_chunk_id(document.id, index),
+            document_id=document.id,
+            user_id=document.user_id,
+            index=index,
+            created_at=now,
+            updated_at=now,
+            **payload,
+        )
+        operations.append(ReplaceOne({"_id": chunk.id}, chunk.dict(by_alias=True), upsert=True))
+    if operations:
+        await DocumentChunk.get_motor_collection().bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def delete_chunks(document_id: str, from_index: int = 0) -> None:
+    """Delete a document's chunks from ``from_index`` on."""
+    await DocumentChunk.get_motor_collection().delete_many(
+        {"document_id": document_id, "index": {"$gte": from_index}}
+    )
+
+
+async def iter_chunks(
+    document_id: str,
+    batch_size: int = settings.DOCUMENT_CHUNK_BATCH_SIZE,
+) -> AsyncIterator[List[DocumentChunk]]:
+    """
+    Iterate over a document's chunks in index order, one batch at a time.
+
+    Args:
+        document_id: Document ID
+        batch_size: Chunks per batch
+
+    Yields:
+        List[DocumentChunk]: Consecutive batches of chunks
+    """
+    collection = DocumentChunk.get_motor_collection()
+    next_index = 0
+    while True:
+        raw = await collection.find(
+            {"document_id": document_id, "index": {"$gte": next_index}}
+        ).sort("index", ASCENDING).limit(batch_size).to_list(batch_size)
+        if not raw:
+            return
+        yield [DocumentChunk.parse_obj(doc) for doc in raw]
+        next_index = raw[-1]["index"] + 1
+
+
+async def delete_document(document: Document) -> None:
+    """Delete a document with its body and chunks."""
+    await delete_chunks(document.id)
+    await _delete_body(document.content_file_id)
+    await write_with_outbox(
+        lambda session: document.delete(session=session), "documents", [document.id], op="delete"
+    )
+
+
+async def migrate_inline_documents(batch_size: int = 20) -> int:
+    """
+    Move inline ``content`` and ``chunks`` of documents to their stores.
+
+    Documents are processed one at a time; the inline fields are removed
+    only after the body and chunks are stored, so the migration can be
+    re-run after an interruption.
+
+    Args:
+        batch_size: Documents read per batch
+
+    Returns:
+        Number of documents migrated
+    """
+    collection = Document.get_motor_collection()
+    migrated = 0
+
+    while True:
+        ids = await collection.find(
+            {"$or": [{"content": {"$exists": True}}, {"chunks": {"$exists": True}}]},
+            {"_id": 1},
+        ).limit(batch_size).to_list(batch_size)
+        if not ids:
+            break
+
+        for ref in ids:
+            raw = await collection.find_one({"_id": ref["_id"]})
+            if raw is None:
+                continue
+            content = raw.pop("content", None)
+            chunks = raw.pop("chunks", None) or []
+            document = Document.parse_obj(raw)
+
+            if content is not None:
+                await save_content(document, content)
+            await save_chunks(document, chunks)
+            await collection.update_one({"_id": document.id}, {"$unset": {"content": "", "chunks": ""}})
+            migrated += 1
+
+        logger.info(f"Migrated {migrated} documents to separate body and chunk storage")
+
+    return migrated
+
+
+async def _main(args: argparse.Namespace) -> int:
+    """Command line entry point."""
+    from app.db.mongodb.client import close_mongodb_client
+    from app.db.mongodb.init_db import init_mongodb
+
+    await init_mongodb()
+    try:
+        if args.migrate:
+            count = await migrate_inline_documents(args.batch_size)
+            print(f"Migrated {count} documents")
+        return 0
+    finally:
+        await close_mongodb_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RAG document storage maintenance")
+    parser.add_argument("--migrate", action="store_true", help="move inline bodies and chunks out of documents")
+    parser.add_argument("--batch-size", type=int, default=20)
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,286 @@
+"""
+Declarative MongoDB index registry.
+
+Indexes are declared next to each model in ``app/db/mongodb/models.py``::
+
+    @index_registry.declare(
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+    )
+    class LinkedInPost(BaseDocument):
+        ...
+
+and reconciled against the database at startup (in the background) or from
+the command line::
+
+    python -m app.db.mongodb.indexes            # report only
+    python -m app.db.mongodb.indexes --apply    # create missing indexes
+    python -m app.db.mongodb.indexes --explain  # fail if a hot query does a COLLSCAN
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+
+class IndexReport:
+    """Result of comparing declared indexes with the database."""
+
+    def __init__(self):
+        self.created: List[str] = []
+        self.missing: List[str] = []
+        self.extra: List[str] = []
+        self.unused: List[str] = []
+        self.conflicts: List[str] = []
+
+    def __str__(self) -> str:
+        lines = []
+        for label, names in (
+            ("created", self.created),
+            ("missing", self.missing),
+            ("conflicting", self.conflicts),
+            ("not declared", self.extra),
+            ("unused since restart", self.unused),
+        ):
+            for name in names:
+                lines.append(f"{label}: {name}")
+        return "\n".join(lines) or "all declared indexes present"
+
+
+class HotQuery:
+    """A representative query that must be served by an index."""
+
+    def __init__(self, collection: str, filter: Dict[str, Any], sort: Optional[List[Tuple[str, int]]] = None):
+        self.collection = collection
+        self.filter = filter
+        self.sort = sort
+
+
+def _collection_name(model: type) -> str:
+    """Collection name from a Beanie model's Settings, without needing init."""
+    settings = getattr(model, "Settings", None)
+    return getattr(settings, "name", None) or model.__name__
+
+
+# Index options that change which documents an index holds or keeps
+_COMPARED_OPTIONS = {
+    "unique": False,
+    "sparse": False,
+    "partialFilterExpression": None,
+    "expireAfterSeconds": None,
+}
+
+
+def _index_differences(existing: Dict[str, Any], declared: Dict[str, Any]) -> List[str]:
+    """Names of the key and options in which an existing index differs from its declaration."""
+    differences = []
+    if list(existing["key"]) != list(declared["key"].items()):
+        differences.append("key")
+    for option, default in _COMPARED_OPTIONS.items():
+        if existing.get(option, default) != declared.get(option, default):
+            differences.append(option)
+    return differences
+
+
+def _beanie_field_indexes(model: type) -> List[str]:
+    """Default names of indexes Beanie creates for ``Indexed`` fields."""
+    names = []
+    for name, field in getattr(model, "__fields__", {}).items():
+        indexed = getattr(field.outer_type_, "_indexed", None)
+        if indexed:
+            names.append(f"{field.alias or name}_{indexed[0]}")
+    return names
+
+
+class IndexRegistry:
+    """Collects index declarations and hot queries for all models."""
+
+    def __init__(self):
+        self._indexes: Dict[str, List[IndexModel]] = {}
+        self._managed: Dict[str, List[str]] = {}
+        self._hot_queries: Dict[str, HotQuery] = {}
+
+    def declare(self, *indexes: IndexModel):
+        """Class decorator declaring the indexes of a document model."""
+        def decorator(model: type) -> type:
+            collection = _collection_name(model)
+            self._indexes.setdefault(collection, []).extend(indexes)
+            self._managed[collection] = _beanie_field_indexes(model)
+            return model
+        return decorator
+
+    def hot_query(
+        self,
+        name: str,
+        model: type,
+        filter: Dict[str, Any],
+        sort: Optional[List[Tuple[str, int]]] = None,
+    ) -> None:
+        """
+        Register a query shape that must never scan the whole collection.
+
+        Args:
+            name: Name used in reports
+            model: Document model queried
+            filter: Representative filter (values only need the right type)
+            sort: Sort specification
+        """
+        self._hot_queries[name] = HotQuery(_collection_name(model), filter, sort)
+
+    @property
+    def collections(self) -> List[str]:
+        """Collections with declared indexes."""
+        return list(self._indexes)
+
+    async def reconcile(self, database: AsyncIOMotorDatabase, apply: bool = True) -> IndexReport:
+        """
+        Compare declared indexes with the database and create missing ones.
+
+        Index builds on MongoDB 4.2+ only hold exclusive locks briefly at the
+        start and end, so this can run while the application serves traffic.
+
+        Args:
+            database: Target database
+            apply: Create missing indexes (otherwise only report them)
+
+        Returns:
+            IndexReport: What was created, missing, extra or unused
+        """
+        report = IndexReport()
+
+        for collection_name, declared in self._indexes.items():
+            collection = database[collection_name]
+            existing = await collection.index_information()
+            declared_names = {index.document["name"] for index in declared}
+
+            to_create = []
+            for index in declared:
+                name = index.document["name"]
+                label = f"{collection_name}.{name}"
+                if name not in existing:
+                    to_create.append(index)
+                    continue
+                differences = _index_differences(existing[name], index.document)
+                if differences:
+                    report.conflicts.append(f"{label} ({', '.join(differences)})")
+
+            if to_create:
+                if apply:
+                    await collection.create_indexes(to_create)
+                    report.created.extend(f"{collection_name}.{i.document['name']}" for i in to_create)
+                else:
+                    report.missing.extend(f"{collection_name}.{i.document['name']}" for i in to_create)
+
+            managed = set(self._managed.get(collection_name, [])) | {"_id_"}
+            for name in existing:
+                if name not in declared_names and name not in managed:
+                    report.extra.append(f"{collection_name}.{name}")
+
+            try:
+                async for stats in collection.aggregate([{"$indexStats": {}}]):
+                    if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0:
+                        report.unused.append(f"{collection_name}.{stats['name']}")
+            except Exception as e:
+                logger.debug(f"$indexStats unavailable for {collection_name}: {e}")
+
+        for label in report.created:
+            logger.info(f"Created index {label}")
+        for label in report.conflicts:
+            logger.warning(f"Index {label} exists with a different definition; drop it to rebuild")
+        for label in report.missing:
+            logger.warning(f"Missing index {label}")
+        return report
+
+    def start_background_reconcile(self, database: AsyncIOMotorDatabase) -> asyncio.Task:
+        """Run ``reconcile`` as a background task that logs its outcome."""
+        async def run():
+            try:
+                report = await self.reconcile(database)
+                logger.info(f"Index reconciliation finished: {report}")
+            except Exception as e:
+                logger.error(f"Index reconciliation failed: {e}")
+        return asyncio.create_task(run(), name="index-reconcile")
+
+    async def explain_hot_queries(self, database: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+        """
+        Explain every hot query and collect the stages of its winning plan.
+
+        Returns:
+            Mapping of hot query name to plan stage names
+        """
+        plans = {}
+        for name, query in self._hot_queries.items():
+            command: Dict[str, Any] = {"find": query.collection, "filter": query.filter, "limit": 20}
+            if query.sort:
+                command["sort"] = dict(query.sort)
+            explain = await database.command("explain", command, verbosity="queryPlanner")
+            plans[name] = _plan_stages(explain["queryPlanner"]["winningPlan"])
+        return plans
+
+    async def assert_no_collscan(self, database: AsyncIOMotorDatabase) -> None:
+        """
+        Fail if any hot query's winning plan scans the whole collection.
+
+        Raises:
+            AssertionError: Listing the offending queries and their plans
+        """
+        plans = await self.explain_hot_queries(database)
+        offending = {name: stages for name, stages in plans.items() if "COLLSCAN" in stages}
+        if offending:
+            details = ", ".join(f"{name} ({' > '.join(stages)})" for name, stages in offending.items())
+            raise AssertionError(f"Hot queries doing a COLLSCAN: {details}")
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Flatten the stage names of an explain plan (classic and SBE formats)."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            if isinstance(value, (dict, list)):
+                stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+# Global registry populated by app/db/mongodb/models.py
+index_registry = IndexRegistry()
+
+
+async def _main(args: argparse.Namespace) -> int:
+    """Command line entry point."""
+    from app.core.config import settings
+    from app.db.mongodb.client import close_mongodb_client, connect_mongodb
+    import app.db.mongodb.models  # noqa: F401  (registers declarations)
+
+    database = connect_mongodb()[settings.MONGODB_DB_NAME]
+    try:
+        report = await index_registry.reconcile(database, apply=args.apply)
+        print(report)
+        if args.explain:
+            try:
+                await index_registry.assert_no_collscan(database)
+                print("all hot queries use an index")
+            except AssertionError as e:
+                print(e)
+                return 1
+        return 1 if report.missing or report.conflicts else 0
+    finally:
+        await close_mongodb_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile MongoDB indexes")
+    parser.add_argument("--apply", action="store_true", help="create missing indexes")
+    parser.add_argument("--explain", action="store_true", help="check hot queries for COLLSCAN")
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
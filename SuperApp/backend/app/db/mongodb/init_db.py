@@ -3,41 +3,72 @@ MongoDB database initialization.
 """
 
 import logging
-import motor.motor_asyncio
 from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.config import settings
-from app.db.mongodb.models import User, LinkedInPost, LinkedInProfile
+from app.db.mongodb.client import connect_mongodb
+from app.db.mongodb.models import (
+    User,
+    ApiKey,
+    ChatSession,
+    ChatMessageBucket,
+    Document,
+    DocumentChunk,
+    EngagementRollup,
+    EngagementSnapshot,
+    LinkedInPost,
+    LinkedInProfile,
+    OutboxEvent,
+)
 
 logger = logging.getLogger(__name__)
 
+# All Beanie document models, registered on the shared client
+DOCUMENT_MODELS = [
+    User,
+    ApiKey,
+    ChatSession,
+    ChatMessageBucket,
+    Document,
+    DocumentChunk,
+    EngagementRollup,
+    EngagementSnapshot,
+    LinkedInProfile,
+    LinkedInPost,
+    OutboxEvent,
+]
 
-async def init_mongodb():
+
+async def init_mongodb() -> AsyncIOMotorClient:
     """
     Initialize MongoDB connection and Beanie ODM.
     
     This function:
-    1. Creates a connection to MongoDB using the connection string from settings
-    2. Initializes Beanie with the document models
-    3. Creates indexes for the document models
+    1. Gets the shared, pool-tuned client from the client manager
+    2. Checks the connection with a ping
+    3. Initializes Beanie with the document models on that client
+    
+    Indexes declared in the index registry are reconciled separately
+    (see app/db/mongodb/indexes.py).
+    
+    Returns:
+        AsyncIOMotorClient: The shared client
     """
     try:
         logger.info("Connecting to MongoDB...")
         
-        # Create client
-        client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URI)
+        client = connect_mongodb()
+        await client.admin.command("ping")
         
         # Initialize Beanie with document models
         await init_beanie(
             database=client[settings.MONGODB_DB_NAME],
-            document_models=[
-                User,
-                LinkedInPost,
-                LinkedInProfile,
-            ]
+            document_models=DOCUMENT_MODELS,
         )
         
         logger.info("MongoDB connection established successfully.")
+        return client
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
-        raise 
\ No newline at end of file
+        raise
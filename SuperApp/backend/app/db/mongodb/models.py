@@ -6,8 +6,13 @@ import uuid
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Union
 
-from beanie import Document, Indexed, TimeSeriesConfig, Link
+from beanie import Document, Granularity, Indexed, TimeSeriesConfig, Link
 from pydantic import BaseModel, Field, EmailStr
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.core.config import settings
+from app.db.mongodb.indexes import index_registry
+from app.db.mongodb.pagination import KEYSET_SORT
 
 
 class BaseDocument(Document):
@@ -68,6 +73,13 @@ class User(BaseDocument):
         }
 
 
+@index_registry.declare(
+    IndexModel(
+        [("user_id", ASCENDING), ("service", ASCENDING)],
+        name="user_service_active",
+        partialFilterExpression={"is_active": True},
+    ),
+)
 class ApiKey(BaseDocument):
     """API key document model."""
     
@@ -89,21 +101,34 @@ class ApiKey(BaseDocument):
 
 
 class ChatMessage(BaseModel):
-    """Chat message model (embedded in ChatSession)."""
+    """Chat message model (embedded in ChatMessageBucket)."""
     
     role: str  # user, assistant, system
     content: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    seq: Optional[int] = None  # Position in the session, starting at 0
 
 
+@index_registry.declare(
+    IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)], name="user_updated"),
+)
 class ChatSession(BaseDocument):
-    """Chat session document model."""
+    """
+    Chat session document model.
+    
+    Messages live in ChatMessageBucket documents; the session only keeps a
+    summary for list views.
+    """
     
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: Indexed(str)
     title: str = "New Conversation"
     model_id: str
-    messages: List[ChatMessage] = []
+    message_count: int = 0
+    # Messages per bucket, fixed for the session's lifetime
+    bucket_size: int = Field(default_factory=lambda: settings.CHAT_BUCKET_SIZE)
+    last_message_at: Optional[datetime] = None
+    last_message_preview: Optional[str] = None
     metadata: Dict[str, Any] = {}
     
     class Settings:
@@ -112,26 +137,69 @@ class ChatSession(BaseDocument):
         use_state_management = True
 
 
-class DocumentChunk(BaseModel):
-    """Document chunk model (embedded in Document)."""
+@index_registry.declare(
+    IndexModel([("session_id", ASCENDING), ("bucket", DESCENDING)], name="session_bucket"),
+)
+class ChatMessageBucket(BaseDocument):
+    """
+    Fixed-size page of chat messages of one session.
     
-    content: str
-    metadata: Dict[str, Any] = {}
-    vector_id: Optional[str] = None
-    vector_provider: str = "postgres"  # postgres, pinecone, qdrant, chroma
+    The ID is "<session_id>:<bucket>", so appends can upsert the right
+    bucket with a single $push.
+    """
+    
+    id: str
+    session_id: str
+    user_id: str
+    bucket: int
+    message_count: int = 0
+    messages: List[ChatMessage] = []
+    
+    class Settings:
+        """Beanie document settings."""
+        name = "chat_message_buckets"
 
 
+class IngestionProgress(BaseModel):
+    """Progress of a document through the RAG ingestion pipeline."""
+    
+    status: str = "pending"  # pending, running, done, failed
+    chunk_size: int = 0
+    chunk_overlap: int = 0
+    chunks_stored: int = 0  # Chunks 0..chunks_stored-1 are stored with embeddings
+    attempts: int = 0  # Failed runs; pending again until RAG_INGEST_MAX_ATTEMPTS
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None  # Last progress of a running ingestion
+    finished_at: Optional[datetime] = None
+
+
+@index_registry.declare(
+    IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+    IndexModel(
+        [("created_at", DESCENDING)],
+        name="public_created",
+        partialFilterExpression={"is_public": True},
+    ),
+)
 class Document(BaseDocument):
-    """Document model for RAG system."""
+    """
+    Document model for RAG system.
+    
+    Only metadata is stored here. The body lives in GridFS and the chunks in
+    the document_chunks collection (see app/db/mongodb/document_store.py).
+    """
     
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: Indexed(str)
     title: str
-    content: str
     metadata: Dict[str, Any] = {}
-    chunks: List[DocumentChunk] = []
+    content_file_id: Optional[str] = None  # GridFS file ID of the body
+    content_length: int = 0  # Body size in bytes (UTF-8)
+    chunk_count: int = 0
     is_processed: bool = False
     is_public: bool = False
+    ingestion: Optional[IngestionProgress] = None
     
     class Settings:
         """Beanie document settings."""
@@ -139,6 +207,31 @@ class Document(BaseDocument):
         use_state_management = True
 
 
+@index_registry.declare(
+    IndexModel([("document_id", ASCENDING), ("index", ASCENDING)], name="document_index"),
+)
+class DocumentChunk(BaseDocument):
+    """
+    Chunk of a RAG document.
+    
+    The ID is "<document_id>:<index>", so re-processing a document
+    overwrites its chunks in place.
+    """
+    
+    id: str
+    document_id: str
+    user_id: str
+    index: int
+    content: str
+    metadata: Dict[str, Any] = {}
+    vector_id: Optional[str] = None
+    vector_provider: str = "postgres"  # postgres, pinecone, qdrant, chroma
+    
+    class Settings:
+        """Beanie document settings."""
+        name = "document_chunks"
+
+
 class Experience(BaseModel):
     """Experience model (embedded in LinkedInProfile)."""
     
@@ -169,6 +262,10 @@ class Skill(BaseModel):
     endorsements: int = 0
 
 
+@index_registry.declare(
+    IndexModel([("user_id", ASCENDING)], name="user_id"),
+    IndexModel([("linkedin_id", ASCENDING)], name="linkedin_id"),
+)
 class LinkedInProfile(BaseDocument):
     """LinkedIn profile document model."""
     
@@ -220,6 +317,26 @@ class AiEngagementPrediction(BaseModel):
     shares: str = Field(..., description="Predicted shares level")
 
 
+@index_registry.declare(
+    # Keyset pagination of a user's posts, newest first, optionally filtered
+    IndexModel(
+        [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="user_created_id",
+    ),
+    IndexModel(
+        [("user_id", ASCENDING), ("ai_generated", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="user_ai_created_id",
+    ),
+    IndexModel(
+        [("user_id", ASCENDING), ("is_published", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="user_published_created_id",
+    ),
+    IndexModel(
+        [("user_id", ASCENDING), ("published_at", DESCENDING)],
+        name="user_published_at",
+        partialFilterExpression={"is_published": True},
+    ),
+)
 class LinkedInPost(BaseDocument):
     """LinkedIn post document model."""
     
@@ -234,7 +351,7 @@ class LinkedInPost(BaseDocument):
     is_published: bool = False
     published_at: Optional[datetime] = None
     linkedin_post_id: Optional[str] = None
-    engagement_stats: Optional[Dict[str, Any]] = None
+    engagement_stats: Optional[Dict[str, Any]] = Field(default_factory=dict)
     tags: List[str] = []
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -261,24 +378,156 @@ class LinkedInPost(BaseDocument):
         }
 
 
+class EngagementMeta(BaseModel):
+    """Series key of an engagement snapshot (time-series metaField)."""
+    
+    post_id: str
+    user_id: str
+
+
+@index_registry.declare(
+    IndexModel([("meta.post_id", ASCENDING), ("timestamp", ASCENDING)], name="post_timestamp"),
+)
+class EngagementSnapshot(Document):
+    """
+    Engagement totals of a post at one point in time.
+    
+    Stored in a time-series collection; raw points expire after
+    ENGAGEMENT_RAW_RETENTION_DAYS and analytics read EngagementRollup.
+    """
+    
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    meta: EngagementMeta
+    metrics: EngagementMetrics
+    
+    class Settings:
+        """Beanie document settings."""
+        name = "engagement_snapshots"
+        timeseries = TimeSeriesConfig(
+            time_field="timestamp",
+            meta_field="meta",
+            granularity=Granularity.minutes,
+            expire_after_seconds=settings.ENGAGEMENT_RAW_RETENTION_DAYS * 86400,
+        )
+
+
+@index_registry.declare(
+    IndexModel(
+        [("post_id", ASCENDING), ("period", ASCENDING), ("bucket_start", ASCENDING)],
+        name="post_period_bucket",
+    ),
+    IndexModel(
+        [("user_id", ASCENDING), ("period", ASCENDING), ("bucket_start", ASCENDING)],
+        name="user_period_bucket",
+    ),
+)
+class EngagementRollup(Document):
+    """
+    Engagement of a post per hour or day, precomputed from snapshots.
+    
+    ``metrics`` holds the highest totals seen in the bucket (totals only
+    grow) and ``samples`` the number of snapshots. The ID is
+    "<post_id>:<period>:<bucket_start>", so recomputing a bucket replaces it.
+    """
+    
+    id: str
+    post_id: str
+    user_id: str
+    period: str  # hour, day
+    bucket_start: datetime
+    metrics: EngagementMetrics
+    samples: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        """Beanie document settings."""
+        name = "engagement_rollups"
+
+
+@index_registry.declare(
+    IndexModel(
+        [("available_at", ASCENDING)],
+        name="pending_available",
+        partialFilterExpression={"pending": True},
+    ),
+    IndexModel(
+        [("replicated_at", ASCENDING)],
+        name="replicated_ttl",
+        expireAfterSeconds=settings.OUTBOX_RETENTION_HOURS * 3600,
+    ),
+    # At most one pending coalesced event per entity
+    IndexModel(
+        [("collection", ASCENDING), ("entity_id", ASCENDING)],
+        name="coalesced_pending",
+        unique=True,
+        partialFilterExpression={"pending": True, "coalesced": True},
+    ),
+)
+class OutboxEvent(Document):
+    """
+    Notice that a replicated entity changed, for the PostgreSQL replicator.
+    
+    Written with the entity change; ``pending`` until replicated, then kept
+    for OUTBOX_RETENTION_HOURS so it can be replayed. Coalesced events stand
+    for any number of changes: each change bumps ``revision``, and the
+    replicator completes the event only if no change arrived meanwhile.
+    """
+    
+    collection: str  # users, linkedin_posts, documents
+    entity_id: str
+    op: str = "upsert"  # upsert, delete
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    pending: bool = True
+    attempts: int = 0
+    last_error: Optional[str] = None
+    replicated_at: Optional[datetime] = None
+    coalesced: bool = False
+    revision: int = 0
+    
+    class Settings:
+        """Beanie document settings."""
+        name = "outbox"
+
+
+# Query shapes served on hot paths; checked for COLLSCAN by
+# `python -m app.db.mongodb.indexes --explain`
+index_registry.hot_query("linkedin_posts.list", LinkedInPost, {"user_id": ""}, KEYSET_SORT)
+index_registry.hot_query(
+    "linkedin_posts.list_ai_generated", LinkedInPost, {"user_id": "", "ai_generated": True}, KEYSET_SORT
+)
+index_registry.hot_query(
+    "linkedin_posts.list_published", LinkedInPost, {"user_id": "", "is_published": True}, KEYSET_SORT
+)
+index_registry.hot_query("linkedin_profiles.by_user", LinkedInProfile, {"user_id": ""})
+index_registry.hot_query("users.by_email", User, {"email": ""})
+index_registry.hot_query("users.by_username", User, {"username": ""})
+index_registry.hot_query("api_keys.by_user", ApiKey, {"user_id": ""})
+index_registry.hot_query("chat_sessions.list", ChatSession, {"user_id": ""}, [("updated_at", DESCENDING)])
+index_registry.hot_query(
+    "chat_message_buckets.history",
+    ChatMessageBucket,
+    {"session_id": "", "bucket": {"$lte": 0}},
+    [("bucket", DESCENDING)],
+)
+index_registry.hot_query(
+    "engagement_rollups.by_post",
+    EngagementRollup,
+    {"post_id": "", "period": "day", "bucket_start": {"$gte": datetime(1970, 1, 1)}},
+    [("bucket_start", ASCENDING)],
+)
+index_registry.hot_query(
+    "engagement_rollups.by_user",
+    EngagementRollup,
+    {"user_id": "", "period": "day", "bucket_start": {"$gte": datetime(1970, 1, 1)}},
+)
+index_registry.hot_query(
+    "document_chunks.by_document", DocumentChunk, {"document_id": "", "index": {"$gte": 0}}, [("index", ASCENDING)]
+)
+
+
 async def init_beanie():
-    """Initialize Beanie ODM with all document models."""
-    from beanie import init_beanie
-    from motor.motor_asyncio import AsyncIOMotorClient
-    from app.core.config import settings
-    
-    # Create MongoDB client
-    client = AsyncIOMotorClient(settings.MONGODB_URL)
-    
-    # Initialize Beanie with all document models
-    await init_beanie(
-        database=client[settings.MONGODB_DB_NAME],
-        document_models=[
-            User,
-            ApiKey,
-            ChatSession,
-            Document,
-            LinkedInProfile,
-            LinkedInPost,
-        ],
-    ) 
\ No newline at end of file
+    """Initialize Beanie ODM with all document models on the shared client."""
+    from app.db.mongodb.init_db import init_mongodb
+    
+    await init_mongodb()
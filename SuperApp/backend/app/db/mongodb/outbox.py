@@ -0,0 +1,156 @@
+"""
+Transactional outbox for entities mirrored to PostgreSQL.
+
+Writes of replicated entities (users, LinkedIn posts, documents) go through
+``write_with_outbox``, which records an ``OutboxEvent`` per entity in the
+same MongoDB transaction as the write, so a change is never stored without
+its event. Requests only wait for MongoDB; ``app.db.replication`` copies
+the entities to PostgreSQL in the background.
+
+Events only name the entity: the replicator reads its current document, so
+duplicated or replayed events are harmless.
+
+Transactions need a replica set or sharded cluster. On a standalone server
+the event is written right after the entity, which loses the event if the
+process dies between the two writes; ``python -m app.db.replication
+--backfill`` repairs such gaps.
+
+Hot counters (post engagement) use ``record_coalesced`` instead, outside
+any transaction: a change marks its entity with one pending event, however
+many changes follow before the replicator catches up.
+"""
+
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Optional, TypeVar
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.db.mongodb.client import connect_mongodb, mongodb_transaction
+from app.db.mongodb.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Collections whose documents are mirrored to PostgreSQL tables
+REPLICATED_COLLECTIONS = ("users", "documents", "linkedin_posts")
+
+T = TypeVar("T")
+
+_transactions_supported: Optional[bool] = None
+
+
+async def transactions_supported() -> bool:
+    """Whether the deployment supports multi-document transactions (checked once)."""
+    global _transactions_supported
+    if _transactions_supported is None:
+        hello = await connect_mongodb().admin.command("hello")
+        _transactions_supported = bool(hello.get("setName") or hello.get("msg") == "isdbgrid")
+    return _transactions_supported
+
+
+async def record_outbox(
+    collection: str,
+    entity_ids: Iterable[str],
+    op: str = "upsert",
+    session=None,
+) -> int:
+    """
+    Append outbox events for changed entities.
+
+    Args:
+        collection: Collection of the entities
+        entity_ids: IDs of the changed entities
+        op: upsert or delete
+        session: Session of the transaction the change is part of
+
+    Returns:
+        Number of events recorded
+    """
+    events = [OutboxEvent(collection=collection, entity_id=str(i), op=op) for i in entity_ids]
+    if not events:
+        return 0
+    await OutboxEvent.insert_many(events, session=session)
+    return len(events)
+
+
+# MongoDB duplicate key error code
+_DUPLICATE_KEY = 11000
+
+
+async def record_coalesced(collection: str, entity_ids: Iterable[str]) -> int:
+    """
+    Mark changed entities with one pending upsert event each.
+
+    An entity that already has a pending coalesced event only gets its
+    ``revision`` bumped, so frequent changes of one entity cost one event.
+
+    Args:
+        collection: Collection of the entities
+        entity_ids: IDs of the changed entities
+
+    Returns:
+        Number of entities marked
+    """
+    if not settings.OUTBOX_ENABLED or collection not in REPLICATED_COLLECTIONS:
+        return 0
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"collection": collection, "entity_id": entity_id, "pending": True, "coalesced": True},
+            {
+                "$inc": {"revision": 1},
+                "$setOnInsert": {"op": "upsert", "created_at": now, "available_at": now, "attempts": 0},
+            },
+            upsert=True,
+        )
+        for entity_id in dict.fromkeys(str(i) for i in entity_ids)
+    ]
+    if not operations:
+        return 0
+    events = OutboxEvent.get_motor_collection()
+    try:
+        await events.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != _DUPLICATE_KEY for error in errors):
+            raise
+        # Concurrent upserts of the same entity: the event exists now, so these match it
+        await events.bulk_write([operations[error["index"]] for error in errors], ordered=False)
+    return len(operations)
+
+
+async def write_with_outbox(
+    write: Callable[[Optional[object]], Awaitable[T]],
+    collection: str,
+    entity_ids: Iterable[str],
+    op: str = "upsert",
+) -> T:
+    """
+    Run a write and record its outbox events atomically.
+
+    Example::
+
+        await write_with_outbox(lambda session: user.save(session=session), "users", [user.id])
+
+    Args:
+        write: Performs the write, given the transaction's session (or None)
+        collection: Collection of the written entities
+        entity_ids: IDs of the written entities
+        op: upsert or delete
+
+    Returns:
+        Whatever ``write`` returns
+    """
+    entity_ids = list(entity_ids)
+    if not settings.OUTBOX_ENABLED or collection not in REPLICATED_COLLECTIONS:
+        return await write(None)
+    if await transactions_supported():
+        async with mongodb_transaction() as session:
+            result = await write(session)
+            await record_outbox(collection, entity_ids, op, session=session)
+        return result
+    result = await write(None)
+    await record_outbox(collection, entity_ids, op)
+    return result
@@ -0,0 +1,103 @@
+"""
+Keyset (cursor) pagination helpers for MongoDB queries.
+
+Pages are ordered by ``(created_at, _id)`` descending and continue from an
+opaque cursor holding the last item's sort key, so every page is an index
+range scan regardless of depth.
+"""
+
+import base64
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Sort order matching the (user_id, created_at, _id) compound indexes
+KEYSET_SORT: List[Tuple[str, int]] = [("created_at", -1), ("_id", -1)]
+
+
+def encode_cursor(created_at: datetime, doc_id: Any) -> str:
+    """
+    Encode the sort key of the last item of a page.
+
+    Args:
+        created_at: Creation time of the last item
+        doc_id: ID of the last item
+
+    Returns:
+        Opaque URL-safe cursor
+    """
+    raw = json.dumps({"t": created_at.isoformat(), "i": doc_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Any]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["t"]), data["i"]
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def apply_cursor(query: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Restrict a query to items after the cursor in ``KEYSET_SORT`` order.
+
+    Args:
+        query: Base filter (must include the index prefix, e.g. user_id)
+        cursor: Cursor from the previous page, or None for the first page
+
+    Returns:
+        Filter for the requested page
+    """
+    if not cursor:
+        return query
+    created_at, doc_id = decode_cursor(cursor)
+    return {
+        **query,
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": doc_id}},
+        ],
+    }
+
+
+class CountCache:
+    """Small per-worker TTL cache for expensive total counts."""
+
+    def __init__(self, ttl_seconds: int = 30, max_entries: int = 10000):
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+
+    def get(self, key: Hashable) -> Optional[int]:
+        """Get a cached count if it has not expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: int) -> None:
+        """Cache a count."""
+        if len(self._entries) >= self._max_entries:
+            self._entries.clear()
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+
+    def invalidate(self, predicate=None) -> None:
+        """Drop all entries, or those whose key matches ``predicate``."""
+        if predicate is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if predicate(k)]:
+            self._entries.pop(key, None)
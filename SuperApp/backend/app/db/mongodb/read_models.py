@@ -0,0 +1,65 @@
+"""
+Lean read models for list endpoints.
+
+List views only need a few fields per item. These models define the
+projection sent to MongoDB, and the raw documents are returned as-is (no
+Beanie document construction or re-validation) for ``ORJSONResponse``.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pydantic import BaseModel, Field
+
+
+def projection_for(model: Type[BaseModel]) -> Dict[str, int]:
+    """Build a MongoDB projection containing only the model's fields."""
+    return {field.alias: 1 for field in model.__fields__.values()}
+
+
+async def find_projected(
+    collection: AsyncIOMotorCollection,
+    model: Type[BaseModel],
+    query: Dict[str, Any],
+    sort: Optional[List[Tuple[str, int]]] = None,
+    skip: int = 0,
+    limit: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Run a read-only query returning raw projected documents.
+
+    Args:
+        collection: Collection to query
+        model: Read model describing the fields to fetch
+        query: Filter
+        sort: Sort specification
+        skip: Number of documents to skip
+        limit: Maximum number of documents (0 for no limit)
+
+    Returns:
+        List of raw documents with only the read model's fields
+    """
+    cursor = collection.find(query, projection_for(model))
+    if sort:
+        cursor = cursor.sort(sort)
+    if skip:
+        cursor = cursor.skip(skip)
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(length=limit or None)
+
+
+class LinkedInPostListItem(BaseModel):
+    """LinkedIn post fields shown in list views."""
+
+    id: str = Field(..., alias="_id")
+    title: Optional[str] = None
+    content: str
+    image_url: Optional[str] = None
+    ai_generated: bool = False
+    is_published: bool = False
+    published_at: Optional[datetime] = None
+    tags: List[str] = []
+    created_at: datetime
+    updated_at: datetime
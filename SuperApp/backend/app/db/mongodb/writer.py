@@ -0,0 +1,176 @@
+"""
+Bulk and deferred persistence of Beanie documents.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Sequence, Type
+
+from beanie import Document
+from pymongo.errors import BulkWriteError
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from app.core.config import settings
+from app.db.mongodb.outbox import write_with_outbox
+
+logger = logging.getLogger(__name__)
+
+# MongoDB duplicate key error code
+DUPLICATE_KEY = 11000
+
+
+async def insert_documents(model: Type[Document], documents: Sequence[Document], session=None) -> int:
+    """
+    Insert documents with one unordered ``insert_many``.
+
+    Documents carry client-generated IDs, so a retried batch that was partly
+    written before a failure reports duplicate keys for the rows already
+    stored; those are treated as written, which makes retries idempotent.
+    Inside a transaction any write error aborts it, so there the IDs
+    already stored are looked up and skipped instead.
+
+    Args:
+        model: Document model of the batch
+        documents: Documents to insert
+        session: Session of an enclosing transaction, if any
+
+    Returns:
+        Number of documents stored by this call
+    """
+    if not documents:
+        return 0
+    if session is not None:
+        existing = set(await model.get_motor_collection().distinct(
+            "_id", {"_id": {"$in": [document.id for document in documents]}}, session=session
+        ))
+        documents = [document for document in documents if document.id not in existing]
+        if not documents:
+            return 0
+        result = await model.insert_many(documents, ordered=False, session=session)
+        return len(result.inserted_ids)
+    try:
+        result = await model.insert_many(list(documents), ordered=False, session=session)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY for error in errors):
+            raise
+        return e.details.get("nInserted", 0)
+
+
+class DeferredWriter:
+    """
+    Persists documents in the background so responses need not wait.
+
+    Submitted documents are queued (bounded, so producers slow down rather
+    than exhaust memory), grouped per model into batches and written with
+    ``insert_documents``, retrying with exponential backoff. ``stop`` drains
+    the queue, for up to DEFERRED_WRITE_DRAIN_TIMEOUT_SECONDS, so queued
+    writes survive a graceful shutdown.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = settings.DEFERRED_WRITE_QUEUE_SIZE,
+        batch_size: int = 100,
+        max_attempts: int = 5,
+    ):
+        self._queue: "asyncio.Queue[List[Document]]" = asyncio.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._max_attempts = max_attempts
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the background task is running."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        """Number of queued submissions."""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start the background writer task."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="deferred-writer")
+
+    async def stop(self) -> None:
+        """Flush queued documents and stop the background task."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), settings.DEFERRED_WRITE_DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(f"Deferred writer stopped with {self.pending} submissions still queued")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, documents: Sequence[Document]) -> None:
+        """
+        Queue documents for insertion.
+
+        Writes inline when the background task is not running (e.g. in
+        scripts), so submitted documents are never silently dropped.
+        """
+        if not documents:
+            return
+        if not self.running:
+            model = type(documents[0])
+            await write_with_outbox(
+                lambda session: insert_documents(model, documents, session=session),
+                model.get_motor_collection().name,
+                [document.id for document in documents],
+            )
+            return
+        await self._queue.put(list(documents))
+
+    async def _run(self) -> None:
+        """Consume the queue, batching documents per model."""
+        while True:
+            submissions = [await self._queue.get()]
+            while not self._queue.empty() and sum(len(s) for s in submissions) < self._batch_size:
+                submissions.append(self._queue.get_nowait())
+
+            batches: Dict[Type[Document], List[Document]] = {}
+            for documents in submissions:
+                for document in documents:
+                    batches.setdefault(type(document), []).append(document)
+
+            try:
+                for model, documents in batches.items():
+                    await self._write_batch(model, documents)
+            finally:
+                for _ in submissions:
+                    self._queue.task_done()
+
+    async def _write_batch(self, model: Type[Document], documents: List[Document]) -> None:
+        """Write one batch, retrying transient failures."""
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(self._max_attempts),
+                wait=wait_exponential(multiplier=0.5, min=0.5, max=10),
+                retry=retry_if_exception_type(Exception),
+                reraise=True,
+            ):
+                with attempt:
+                    await write_with_outbox(
+                        lambda session: insert_documents(model, documents, session=session),
+                        model.get_motor_collection().name,
+                        [document.id for document in documents],
+                    )
+            self.written += len(documents)
+        except Exception as e:
+            self.failed += len(documents)
+            ids = ", ".join(str(document.id) for document in documents)
+            logger.error(f"Deferred write of {len(documents)} {model.__name__} documents failed: {e} (ids: {ids})")
+
+
+# Global writer started and drained by the application lifespan
+deferred_writer = DeferredWriter()
@@ -5,9 +5,9 @@ Base classes for SQLAlchemy models.
 from datetime import datetime
 from typing import Optional, Any
 
-from sqlalchemy import func
+from sqlalchemy import Index, event, func, text
 from sqlalchemy.ext.declarative import declared_attr
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, with_loader_criteria
 
 
 class Base(DeclarativeBase):
@@ -43,15 +43,44 @@ class UUIDMixin:
 
 
 class SoftDeleteMixin:
-    """Mixin that adds deleted_at column for soft delete."""
+    """
+    Mixin that adds deleted_at column for soft delete.
+
+    ORM queries only see live rows (see ``_live_rows``) unless executed with
+    ``execution_options(include_deleted=True)``. The column has no full
+    index: tables index live rows with ``live_index`` and the deleted ones,
+    for the purger, with ``deleted_index``.
+    """
     
     deleted_at: Mapped[Optional[datetime]] = mapped_column(
         default=None,
         nullable=True,
-        index=True,
     )
     
     @property
     def is_deleted(self) -> bool:
         """Check if record is deleted."""
-        return self.deleted_at is not None 
\ No newline at end of file
+        return self.deleted_at is not None
+
+
+def live_index(name: str, *columns: str) -> Index:
+    """Partial index over the live rows of a soft-delete table."""
+    return Index(name, *columns, postgresql_where=text("deleted_at IS NULL"))
+
+
+def deleted_index(name: str) -> Index:
+    """Partial index over the soft-deleted rows, ordered for purging."""
+    return Index(name, "deleted_at", postgresql_where=text("deleted_at IS NOT NULL"))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _live_rows(state) -> None:
+    """Hide soft-deleted rows from ORM selects, including joins and subqueries."""
+    if state.is_select and not state.execution_options.get("include_deleted", False):
+        state.statement = state.statement.options(
+            with_loader_criteria(
+                SoftDeleteMixin,
+                lambda cls: cls.deleted_at.is_(None),
+                include_aliases=True,
+            )
+        ) 
\ No newline at end of file
@@ -0,0 +1,285 @@
+"""
+Bulk ingestion of RAG documents and chunk embeddings with binary COPY.
+
+Chunks are streamed to ``document_chunks`` with asyncpg's binary
+``copy_records_to_table`` in batches of BULK_INGEST_BATCH_ROWS. A producer
+fills a queue of at most BULK_INGEST_QUEUE_BATCHES batches, so embedding
+generation and COPY overlap while memory stays bounded: a slow database
+slows the producer down instead of letting batches pile up.
+
+Each document (its row and all of its chunks) is written in one
+transaction, so a failed ingestion leaves no partial document behind.
+Incremental writers (the RAG ingestion pipeline) use ``write_chunks``
+instead, which commits one idempotent batch at a time.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_COLUMNS = [
+    "id",
+    "document_id",
+    "user_id",
+    "content",
+    "start_idx",
+    "end_idx",
+    "page_number",
+    "section_title",
+    "embedding",
+]
+
+ChunkRecord = Tuple[Any, ...]
+ChunkSource = Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+
+
+class IngestStats:
+    """Counters of one ingestion run."""
+
+    def __init__(self):
+        self.documents = 0
+        self.rows = 0
+        self.batches = 0
+        self.copy_seconds = 0.0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "documents": self.documents,
+            "rows": self.rows,
+            "batches": self.batches,
+            "elapsed_sec": round(self.elapsed, 3),
+            "copy_sec": round(self.copy_seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+        }
+
+
+def _record(document_id: uuid.UUID, user_id: Any, chunk: Dict[str, Any]) -> ChunkRecord:
+    """Chunk dict to a COPY record in CHUNK_COLUMNS order."""
+    return (
+        chunk.get("id") or uuid.uuid4(),
+        document_id,
+        user_id,
+        chunk["content"],
+        chunk.get("start_idx"),
+        chunk.get("end_idx"),
+        chunk.get("page_number"),
+        chunk.get("section_title"),
+        chunk.get("embedding"),
+    )
+
+
+async def _iterate(source: ChunkSource) -> AsyncIterator[Dict[str, Any]]:
+    """Iterate a sync or async chunk source."""
+    if hasattr(source, "__aiter__"):
+        async for chunk in source:
+            yield chunk
+    else:
+        for chunk in source:
+            yield chunk
+
+
+class ChunkIngestor:
+    """
+    Streams documents and their chunks into PostgreSQL over one connection.
+
+    Example::
+
+        async with ChunkIngestor(get_engine()) as ingestor:
+            for doc in corpus:
+                await ingestor.ingest_document(doc["row"], doc["chunks"])
+        logger.info(ingestor.stats.to_dict())
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        batch_rows: int = settings.BULK_INGEST_BATCH_ROWS,
+        queue_batches: int = settings.BULK_INGEST_QUEUE_BATCHES,
+    ):
+        self._engine = engine
+        self._batch_rows = batch_rows
+        self._queue_batches = queue_batches
+        self._conn = None
+        self._raw = None
+        self.stats = IngestStats()
+
+    async def __aenter__(self) -> "ChunkIngestor":
+        from pgvector.asyncpg import register_vector
+
+        self._conn = await self._engine.connect()
+        fairy = await self._conn.get_raw_connection()
+        self._raw = fairy.driver_connection
+        # Binary codec for the vector type, needed by binary COPY
+        await register_vector(self._raw)
+        self.stats = IngestStats()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+            self._raw = None
+
+    async def ingest_document(self, document: Dict[str, Any], chunks: ChunkSource) -> int:
+        """
+        Insert a document and stream its chunks in one transaction.
+
+        Args:
+            document: Row for ``documents`` (id, user_id, title, content,
+                metadata, is_processed, is_public); id is generated if missing
+            chunks: Chunk dicts (content, embedding, start_idx, end_idx,
+                page_number, section_title), sync or async, consumed lazily
+
+        Returns:
+            Number of chunks written
+        """
+        if self._raw is None:
+            raise RuntimeError("ChunkIngestor must be used as an async context manager")
+
+        document_id = document.get("id") or uuid.uuid4()
+        queue: "asyncio.Queue[Optional[List[ChunkRecord]]]" = asyncio.Queue(maxsize=self._queue_batches)
+
+        async def produce():
+            batch: List[ChunkRecord] = []
+            async for chunk in _iterate(chunks):
+                batch.append(_record(document_id, document["user_id"], chunk))
+                if len(batch) >= self._batch_rows:
+                    await queue.put(batch)
+                    batch = []
+            if batch:
+                await queue.put(batch)
+            await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        written = 0
+        try:
+            async with self._raw.transaction():
+                await self._raw.execute(
+                    "INSERT INTO documents (id, user_id, title, content, metadata, is_processed, is_public) "
+                    "VALUES ($1, $2, $3, $4, $5::jsonb, $6, $7)",
+                    document_id,
+                    document["user_id"],
+                    document["title"],
+                    document.get("content", ""),
+                    json.dumps(document["metadata"]) if document.get("metadata") is not None else None,
+                    document.get("is_processed", True),
+                    document.get("is_public", False),
+                )
+                while True:
+                    getter = asyncio.ensure_future(queue.get())
+                    done, _ = await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+                    if getter not in done:
+                        getter.cancel()
+                        # The producer finished without its end marker: it failed
+                        producer.result()
+                        continue
+                    batch = getter.result()
+                    if batch is None:
+                        break
+                    start = time.perf_counter()
+                    await self._raw.copy_records_to_table(
+                        "document_chunks", records=batch, columns=CHUNK_COLUMNS
+                    )
+                    self.stats.copy_seconds += time.perf_counter() - start
+                    self.stats.batches += 1
+                    written += len(batch)
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+        self.stats.documents += 1
+        self.stats.rows += written
+        return written
+
+    async def write_chunks(self, document: Dict[str, Any], chunks: Sequence[Dict[str, Any]]) -> int:
+        """
+        Write one batch of a document's chunks in its own transaction.
+
+        The document row is created if missing (replication fills in the
+        rest later) and chunks whose ids already exist are replaced, so
+        batches can be retried or written again after a restart.
+
+        Args:
+            document: Document row (id, user_id, title, is_public)
+            chunks: Chunk dicts with stable ids
+
+        Returns:
+            Number of chunks written
+        """
+        if self._raw is None:
+            raise RuntimeError("ChunkIngestor must be used as an async context manager")
+
+        records = [_record(document["id"], document["user_id"], chunk) for chunk in chunks]
+        start = time.perf_counter()
+        async with self._raw.transaction():
+            await self._raw.execute(
+                "INSERT INTO documents (id, user_id, title, content, is_processed, is_public) "
+                "VALUES ($1, $2, $3, '', false, $4) ON CONFLICT (id) DO NOTHING",
+                document["id"],
+                document["user_id"],
+                document["title"],
+                document.get("is_public", False),
+            )
+            # user_id prunes the delete to the document's partition
+            await self._raw.execute(
+                "DELETE FROM document_chunks WHERE user_id = $1 AND id = ANY($2::uuid[])",
+                document["user_id"],
+                [record[0] for record in records],
+            )
+            await self._raw.copy_records_to_table("document_chunks", records=records, columns=CHUNK_COLUMNS)
+        self.stats.copy_seconds += time.perf_counter() - start
+        self.stats.batches += 1
+        self.stats.rows += len(records)
+        return len(records)
+
+    async def delete_chunks(self, document_id: uuid.UUID, user_id: Any) -> None:
+        """Delete all chunks of a document."""
+        if self._raw is None:
+            raise RuntimeError("ChunkIngestor must be used as an async context manager")
+        await self._raw.execute(
+            "DELETE FROM document_chunks WHERE user_id = $1 AND document_id = $2", user_id, document_id
+        )
+
+
+async def ingest_documents(
+    engine: AsyncEngine,
+    documents: Iterable[Tuple[Dict[str, Any], ChunkSource]],
+) -> IngestStats:
+    """
+    Ingest many documents, each in its own transaction.
+
+    Args:
+        engine: Engine to take the connection from
+        documents: Pairs of (document row, chunk source)
+
+    Returns:
+        IngestStats: Rows, batches and rows/sec of the run
+    """
+    async with ChunkIngestor(engine) as ingestor:
+        for document, chunks in documents:
+            await ingestor.ingest_document(document, chunks)
+    stats = ingestor.stats
+    logger.info(f"Ingested {stats.rows} chunks of {stats.documents} documents at {stats.rows_per_sec:.0f} rows/sec")
+    return stats
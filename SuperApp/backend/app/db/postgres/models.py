@@ -2,14 +2,15 @@
 PostgreSQL models for vector storage.
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List, Dict, Any
 
-from sqlalchemy import String, Integer, Boolean, DateTime, Text, JSON, ForeignKey
-from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+from sqlalchemy import String, Integer, BigInteger, Boolean, Date, DateTime, Text, JSON, ForeignKey, Computed, Index, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.postgres.base import Base, TimestampMixin
+from app.core.config import settings
+from app.db.postgres.base import Base, SoftDeleteMixin, TimestampMixin, deleted_index, live_index
 
 
 try:
@@ -151,14 +152,33 @@ class LinkedInSkillTable(Base, TimestampMixin):
     profile = relationship("LinkedInProfileTable", back_populates="skills")
 
 
-class LinkedInPostTable(Base, TimestampMixin):
-    """LinkedIn post table for PostgreSQL."""
+class LinkedInPostTable(Base, TimestampMixin, SoftDeleteMixin):
+    """
+    LinkedIn post table for PostgreSQL.
+
+    Range partitioned by month of ``created_at``, which is therefore part of
+    the primary key; partitions are managed by ``app.db.postgres.partitions``.
+    """
     
     __tablename__ = "linkedin_posts"
+    __table_args__ = (
+        live_index("linkedin_posts_user_created_live_idx", "user_id", "created_at"),
+        deleted_index("linkedin_posts_deleted_at_idx"),
+        # Changed posts, for the incremental analytics refresh
+        Index("linkedin_posts_updated_idx", "updated_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    # Set client side so the full primary key is known before the insert
+    created_at: Mapped[datetime] = mapped_column(
+        primary_key=True,
+        default=datetime.utcnow,
+        server_default=func.now(),
+    )
     user_id: Mapped[str] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
-    profile_id: Mapped[str] = mapped_column(UUID(as_uuid=True), ForeignKey("linkedin_profiles.id", ondelete="CASCADE"))
+    # Posts replicated from MongoDB are not linked to a profile
+    profile_id: Mapped[Optional[str]] = mapped_column(UUID(as_uuid=True), ForeignKey("linkedin_profiles.id", ondelete="CASCADE"))
     linkedin_post_id: Mapped[Optional[str]] = mapped_column(String(100))
     content: Mapped[str] = mapped_column(Text, nullable=False)
     media_urls: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String(255)))
@@ -183,16 +203,22 @@ class LinkedInPostTable(Base, TimestampMixin):
     profile = relationship("LinkedInProfileTable", back_populates="posts")
 
 
-class DocumentTable(Base, TimestampMixin):
+class DocumentTable(Base, TimestampMixin, SoftDeleteMixin):
     """Document table for RAG system."""
     
     __tablename__ = "documents"
+    __table_args__ = (
+        live_index("documents_user_live_idx", "user_id"),
+        deleted_index("documents_deleted_at_idx"),
+    )
     
     id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True)
     user_id: Mapped[str] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     title: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Empty for replicated documents: bodies stay in MongoDB GridFS
     content: Mapped[str] = mapped_column(Text, nullable=False)
-    metadata: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
+    # "metadata" is reserved on declarative classes, so map it under another name
+    metadata_: Mapped[Optional[Dict[str, Any]]] = mapped_column("metadata", JSONB)
     is_processed: Mapped[bool] = mapped_column(Boolean, default=False)
     is_public: Mapped[bool] = mapped_column(Boolean, default=False)
     
@@ -202,11 +228,25 @@ class DocumentTable(Base, TimestampMixin):
 
 
 class DocumentChunkTable(Base, TimestampMixin):
-    """Document chunk table for RAG system."""
+    """
+    Document chunk table for RAG system.
+
+    Hash partitioned by ``user_id`` (copied from the document, and part of
+    the primary key), so one user's chunks and their index entries live in
+    a single partition.
+    """
     
     __tablename__ = "document_chunks"
+    __table_args__ = (
+        # Used by document cascades and the soft-delete purger
+        Index("document_chunks_document_idx", "document_id"),
+        {"postgresql_partition_by": "HASH (user_id)"},
+    )
     
     id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    user_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
     document_id: Mapped[str] = mapped_column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"))
     content: Mapped[str] = mapped_column(Text, nullable=False)
     start_idx: Mapped[Optional[int]] = mapped_column(Integer)
@@ -215,6 +255,12 @@ class DocumentChunkTable(Base, TimestampMixin):
     section_title: Mapped[Optional[str]] = mapped_column(String(255))
     # Vector field for embedding
     embedding: Mapped[Optional[Any]] = mapped_column(Vector(1536))
+    # Lexical search vector, maintained by PostgreSQL and GIN indexed
+    content_tsv: Mapped[Optional[Any]] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{settings.HYBRID_TEXT_SEARCH_CONFIG}', content)", persisted=True),
+        deferred=True,
+    )
     
     # Relationships
     document = relationship("DocumentTable", back_populates="chunks")
@@ -231,4 +277,51 @@ class RefreshToken(Base, TimestampMixin):
     expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     
     # Relationships
-    user = relationship("UserTable") 
\ No newline at end of file
+    user = relationship("UserTable")
+
+
+class ContentStatsDailyTable(Base):
+    """
+    Per user and day aggregates of live LinkedIn posts.
+
+    Maintained incrementally by ``app.services.analytics.content``; days are
+    UTC days of ``created_at``.
+    """
+    
+    __tablename__ = "content_stats_daily"
+    
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    posts: Mapped[int] = mapped_column(Integer, default=0)
+    ai_generated: Mapped[int] = mapped_column(Integer, default=0)
+    published: Mapped[int] = mapped_column(Integer, default=0)
+    likes: Mapped[int] = mapped_column(BigInteger, default=0)
+    comments: Mapped[int] = mapped_column(BigInteger, default=0)
+    shares: Mapped[int] = mapped_column(BigInteger, default=0)
+    impressions: Mapped[int] = mapped_column(BigInteger, default=0)
+    clicks: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class ContentTagStatsTable(Base):
+    """Per user and tag aggregates of live LinkedIn posts."""
+    
+    __tablename__ = "content_tag_stats"
+    
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tag: Mapped[str] = mapped_column(String(100), primary_key=True)
+    posts: Mapped[int] = mapped_column(Integer, default=0)
+    likes: Mapped[int] = mapped_column(BigInteger, default=0)
+    comments: Mapped[int] = mapped_column(BigInteger, default=0)
+    shares: Mapped[int] = mapped_column(BigInteger, default=0)
+    impressions: Mapped[int] = mapped_column(BigInteger, default=0)
+    clicks: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class AnalyticsWatermarkTable(Base):
+    """How far each incremental analytics refresh has processed its source."""
+    
+    __tablename__ = "analytics_watermarks"
+    
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    processed_through: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,425 @@
+"""
+Partition lifecycle of the partitioned PostgreSQL tables.
+
+``document_chunks`` is hash partitioned by ``user_id`` into
+DOCUMENT_CHUNK_PARTITIONS partitions (``document_chunks_p0`` ...), so a
+per-user query with ``user_id = ...`` touches one partition and one slice of
+each index. The count is fixed when the table is created.
+
+``linkedin_posts`` is range partitioned by month of ``created_at``
+(``linkedin_posts_y2026m10`` ...), with a default partition catching rows
+outside every monthly range. Monthly partitions are created
+POST_PARTITION_MONTHS_AHEAD months ahead; with POST_PARTITION_RETENTION_MONTHS
+set, older ones are detached and optionally dropped. PostgreSQL refuses
+``DETACH ... CONCURRENTLY`` while a default partition exists, so each
+partition is detached in a short transaction with a lock timeout instead;
+the periodic job holds an advisory lock so one worker maintains at a time.
+
+Indexes on a partitioned table cannot be built concurrently, so
+``create_index`` builds each partition's index concurrently and attaches it
+to an index created on the parent only.
+
+Usage::
+
+    python -m app.db.postgres.partitions --ensure
+    python -m app.db.postgres.partitions --retire [--drop]
+    python -m app.db.postgres.partitions --migrate document_chunks
+    python -m app.db.postgres.partitions --list
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+import sys
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_TABLE = "document_chunks"
+POST_TABLE = "linkedin_posts"
+POST_DEFAULT_PARTITION = f"{POST_TABLE}_default"
+
+# Advisory lock key so only one worker maintains partitions at a time
+PARTITION_LOCK_KEY = 741_004
+
+# Longest a detach waits for its lock on linkedin_posts before giving up until the next run
+DETACH_LOCK_TIMEOUT = "2s"
+
+_MONTH_PARTITION = re.compile(rf"^{POST_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+# PostgreSQL truncates identifiers longer than this
+_MAX_IDENTIFIER = 63
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_start(day: Optional[date] = None) -> date:
+    day = day or datetime.utcnow().date()
+    return date(day.year, day.month, 1)
+
+
+def post_partition_name(month: date) -> str:
+    """Name of the linkedin_posts partition holding ``month``."""
+    return f"{POST_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def child_index_name(partition: str, parent_index: str, table: str) -> str:
+    """Name of a partition's index attached to ``parent_index``."""
+    suffix = parent_index[len(table) + 1:] if parent_index.startswith(f"{table}_") else parent_index
+    return f"{partition}_{suffix}"[:_MAX_IDENTIFIER]
+
+
+async def relkind(conn, name: str) -> Optional[str]:
+    """pg_class kind of a relation: 'r' table, 'p' partitioned table, 'I' partitioned index."""
+    return (await conn.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :name"), {"name": name}
+    )).scalar()
+
+
+async def is_partitioned(conn, table: str) -> bool:
+    return await relkind(conn, table) == "p"
+
+
+async def partition_names(conn, table: str) -> List[str]:
+    """Names of the partitions currently attached to ``table``."""
+    rows = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table ORDER BY c.relname"
+        ),
+        {"table": table},
+    )
+    return [row.relname for row in rows]
+
+
+async def list_partitions(conn, table: str) -> List[Dict[str, Any]]:
+    """Partitions of ``table`` with their bounds and total size."""
+    rows = await conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound, "
+            "pg_total_relation_size(c.oid) AS bytes FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table ORDER BY c.relname"
+        ),
+        {"table": table},
+    )
+    return [{"name": row.relname, "bound": row.bound, "bytes": row.bytes} for row in rows]
+
+
+async def create_index(conn, name: str, table: str, definition: str) -> None:
+    """
+    Build an index without blocking writes, on a plain or partitioned table.
+
+    Args:
+        conn: Connection in autocommit mode
+        name: Index name
+        table: Table to index
+        definition: Everything after ``ON <table>``, e.g. ``USING gin (col)``
+    """
+    if not await is_partitioned(conn, table):
+        await conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}"))
+        return
+    # Invalid until every partition has an attached index
+    await conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} {definition}"))
+    for partition in await partition_names(conn, table):
+        child = child_index_name(partition, name, table)
+        await conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}"))
+        await conn.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
+
+
+async def drop_index(conn, name: str) -> None:
+    """Drop an index, concurrently unless it is a partitioned index."""
+    if await relkind(conn, name) == "I":
+        # Drops the attached partition indexes too; not possible concurrently
+        await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    else:
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+async def rename_index(conn, name: str, new_name: str, table: str) -> None:
+    """Rename an index and, on a partitioned table, its partition indexes."""
+    if await relkind(conn, name) == "I":
+        for partition in await partition_names(conn, table):
+            await conn.execute(text(
+                f"ALTER INDEX IF EXISTS {child_index_name(partition, name, table)} "
+                f"RENAME TO {child_index_name(partition, new_name, table)}"
+            ))
+    await conn.execute(text(f"ALTER INDEX {name} RENAME TO {new_name}"))
+
+
+async def ensure_chunk_partitions(conn, count: int = settings.DOCUMENT_CHUNK_PARTITIONS) -> List[str]:
+    """Create the missing hash partitions of document_chunks."""
+    created = []
+    for remainder in range(count):
+        name = f"{CHUNK_TABLE}_p{remainder}"
+        if await relkind(conn, name) is None:
+            await conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {CHUNK_TABLE} "
+                f"FOR VALUES WITH (MODULUS {count}, REMAINDER {remainder})"
+            ))
+            created.append(name)
+    return created
+
+
+async def ensure_post_partitions(
+    conn,
+    months_ahead: int = settings.POST_PARTITION_MONTHS_AHEAD,
+    start: Optional[date] = None,
+) -> List[str]:
+    """
+    Create monthly linkedin_posts partitions from ``start`` (default: this
+    month) through ``months_ahead`` months ahead, plus the default partition.
+    """
+    created = []
+    if await relkind(conn, POST_DEFAULT_PARTITION) is None:
+        await conn.execute(text(f"CREATE TABLE {POST_DEFAULT_PARTITION} PARTITION OF {POST_TABLE} DEFAULT"))
+        created.append(POST_DEFAULT_PARTITION)
+
+    this_month = _month_start()
+    month = _month_start(start) if start else this_month
+    last = _add_months(this_month, months_ahead)
+    while month <= last:
+        name = post_partition_name(month)
+        if await relkind(conn, name) is None:
+            await conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {POST_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+        month = _add_months(month, 1)
+    return created
+
+
+async def ensure_partitions(engine: AsyncEngine) -> List[str]:
+    """
+    Create missing partitions of both tables; run periodically (e.g. daily)
+    so monthly post partitions always exist before they are needed.
+
+    Tables that are not partitioned yet are skipped with a warning.
+    """
+    created = []
+    async with engine.begin() as conn:
+        if await is_partitioned(conn, CHUNK_TABLE):
+            created += await ensure_chunk_partitions(conn)
+        else:
+            logger.warning(f"{CHUNK_TABLE} is not partitioned; run --migrate {CHUNK_TABLE}")
+        if await is_partitioned(conn, POST_TABLE):
+            created += await ensure_post_partitions(conn)
+        else:
+            logger.warning(f"{POST_TABLE} is not partitioned; run --migrate {POST_TABLE}")
+    if created:
+        logger.info(f"Created partitions: {created}")
+    return created
+
+
+async def retire_post_partitions(
+    engine: AsyncEngine,
+    retention_months: int = settings.POST_PARTITION_RETENTION_MONTHS,
+    drop: bool = False,
+    today: Optional[date] = None,
+) -> List[str]:
+    """
+    Detach monthly post partitions older than the retention window.
+
+    A plain detach takes an ACCESS EXCLUSIVE lock on linkedin_posts (the
+    concurrent form is not allowed next to the default partition), so each
+    partition is detached in its own transaction with DETACH_LOCK_TIMEOUT:
+    a detach that would queue behind long-running queries, and block the
+    writes queued after it, gives up until the next run instead. A detached
+    partition remains as a plain table, for archiving, unless ``drop`` is set.
+
+    Args:
+        engine: Engine to run on
+        retention_months: Whole months to keep before the current one; 0 keeps everything
+        drop: Drop the detached tables
+        today: Reference date (default: now)
+
+    Returns:
+        Names of the detached partitions
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = _add_months(_month_start(today), -retention_months)
+
+    async with engine.connect() as conn:
+        names = await partition_names(conn, POST_TABLE)
+
+    retired = []
+    for name in names:
+        match = _MONTH_PARTITION.match(name)
+        if not match or date(int(match.group(1)), int(match.group(2)), 1) >= cutoff:
+            continue
+        logger.info(f"Detaching partition {name}")
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'"))
+                await conn.execute(text(f"ALTER TABLE {POST_TABLE} DETACH PARTITION {name}"))
+                if drop:
+                    await conn.execute(text(f"DROP TABLE {name}"))
+        except DBAPIError as e:
+            # Most likely a lock timeout: leave the rest for the next run
+            logger.warning(f"Detaching {name} stopped: {e}")
+            break
+        retired.append(name)
+    return retired
+
+
+async def maintain_partitions(engine: AsyncEngine) -> Optional[Dict[str, List[str]]]:
+    """
+    Create upcoming partitions and detach expired ones, in one worker at a time.
+
+    Returns:
+        Created and retired partitions, or None if another worker is maintaining
+    """
+    async with engine.connect() as lock_conn:
+        locked = (await lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": PARTITION_LOCK_KEY}
+        )).scalar()
+        await lock_conn.commit()
+        if not locked:
+            logger.info("Partition maintenance running elsewhere, skipping")
+            return None
+        try:
+            return {
+                "created": await ensure_partitions(engine),
+                "retired": await retire_post_partitions(engine),
+            }
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": PARTITION_LOCK_KEY})
+            await lock_conn.commit()
+
+
+def start_partition_job(engine: AsyncEngine, interval: int = 24 * 3600) -> asyncio.Task:
+    """Create upcoming partitions and detach expired ones every ``interval`` seconds."""
+
+    async def run():
+        while True:
+            try:
+                await maintain_partitions(engine)
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}")
+            await asyncio.sleep(interval)
+
+    return asyncio.create_task(run(), name="partitions")
+
+
+async def _columns(conn, table: str) -> List[str]:
+    rows = await conn.execute(
+        text("SELECT column_name FROM information_schema.columns WHERE table_name = :table"),
+        {"table": table},
+    )
+    return [row.column_name for row in rows]
+
+
+async def migrate_to_partitioned(engine: AsyncEngine, table: str, keep_legacy: bool = False) -> bool:
+    """
+    Convert an existing plain table into its partitioned definition.
+
+    Runs in one transaction holding an exclusive lock on the table, so it
+    is meant for a maintenance window: the old table and its indexes are
+    renamed with an ``_unpartitioned`` suffix, the partitioned table and its
+    partitions are created from the model metadata, rows are copied (chunks
+    get ``user_id`` from their document) and the old table is dropped
+    unless ``keep_legacy``. Vector and text indexes are then rebuilt by
+    ``ensure_vector_indexes``.
+
+    Returns:
+        False if the table was already partitioned
+    """
+    from app.db.postgres.base import Base
+    import app.db.postgres.models  # noqa: F401  (registers the tables)
+
+    if table not in (CHUNK_TABLE, POST_TABLE):
+        raise ValueError(f"{table} has no partitioned definition")
+    definition = Base.metadata.tables[table]
+    legacy = f"{table}_unpartitioned"
+
+    async with engine.begin() as conn:
+        if await is_partitioned(conn, table):
+            return False
+        logger.info(f"Partitioning {table}")
+        await conn.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+        indexes = await conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": table})
+        for (index,) in indexes.all():
+            await conn.execute(text(f"ALTER INDEX {index} RENAME TO {(index + '_unpartitioned')[:_MAX_IDENTIFIER]}"))
+        await conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+
+        await conn.execute(CreateTable(definition))
+        for index in definition.indexes:
+            await conn.execute(CreateIndex(index))
+
+        legacy_columns = set(await _columns(conn, legacy))
+        columns = [c.name for c in definition.columns if c.computed is None]
+        if table == CHUNK_TABLE:
+            await ensure_chunk_partitions(conn)
+            selected = [c for c in columns if c in legacy_columns and c != "user_id"]
+            await conn.execute(text(
+                f"INSERT INTO {table} ({', '.join(selected)}, user_id) "
+                f"SELECT {', '.join('c.' + c for c in selected)}, d.user_id "
+                f"FROM {legacy} c JOIN documents d ON d.id = c.document_id"
+            ))
+        else:
+            oldest = (await conn.execute(text(f"SELECT min(created_at) FROM {legacy}"))).scalar()
+            await ensure_post_partitions(conn, start=oldest.date() if oldest else None)
+            selected = [c for c in columns if c in legacy_columns]
+            await conn.execute(text(
+                f"INSERT INTO {table} ({', '.join(selected)}) SELECT {', '.join(selected)} FROM {legacy}"
+            ))
+
+        if not keep_legacy:
+            await conn.execute(text(f"DROP TABLE {legacy}"))
+    return True
+
+
+async def _main(args: argparse.Namespace) -> int:
+    """Command line entry point."""
+    from app.db.postgres.session import dispose_engine, get_engine
+    from app.db.postgres.vector_search import ensure_vector_indexes
+
+    engine = get_engine()
+    try:
+        if args.migrate:
+            if await migrate_to_partitioned(engine, args.migrate, keep_legacy=args.keep_legacy):
+                print(f"Partitioned {args.migrate}; rebuilding indexes")
+                await ensure_vector_indexes(engine)
+            else:
+                print(f"{args.migrate} is already partitioned")
+        if args.ensure:
+            created = await ensure_partitions(engine)
+            print(f"Created: {', '.join(created) or 'nothing'}")
+        if args.retire:
+            retired = await retire_post_partitions(engine, drop=args.drop)
+            print(f"{'Dropped' if args.drop else 'Detached'}: {', '.join(retired) or 'nothing'}")
+        if args.list:
+            async with engine.connect() as conn:
+                for table in (CHUNK_TABLE, POST_TABLE):
+                    for partition in await list_partitions(conn, table):
+                        print(f"{partition['name']:<40} {partition['bytes']:>14}  {partition['bound']}")
+        return 0
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partition maintenance")
+    parser.add_argument("--ensure", action="store_true", help="create missing partitions")
+    parser.add_argument("--retire", action="store_true", help="detach post partitions past retention")
+    parser.add_argument("--drop", action="store_true", help="drop retired partitions")
+    parser.add_argument("--migrate", choices=[CHUNK_TABLE, POST_TABLE], help="partition an existing table")
+    parser.add_argument("--keep-legacy", action="store_true", help="keep the unpartitioned table after migrating")
+    parser.add_argument("--list", action="store_true", help="list partitions and sizes")
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
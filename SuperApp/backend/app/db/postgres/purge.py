@@ -0,0 +1,173 @@
+"""
+Purge of expired soft-deleted rows.
+
+Documents and LinkedIn posts are soft deleted (``deleted_at`` set). Rows
+deleted more than SOFT_DELETE_RETENTION_DAYS ago are removed for good in
+small batches: first the chunks (and with them their embeddings and index
+entries) of expired documents, then the documents, then expired posts.
+Each batch is its own short transaction with a lock timeout, so the purge
+never holds locks for long or queues behind application writes, and it
+pauses between batches to leave I/O for the application. Batches are found
+through the partial ``deleted_at`` indexes and ``document_chunks_document_idx``.
+
+A session-level advisory lock keeps the purge to one worker at a time.
+Dead index entries are reclaimed by autovacuum afterwards.
+
+Maintenance::
+
+    python -m app.db.postgres.purge
+    python -m app.db.postgres.purge --retention-days 7 --batch-size 200
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock key so only one worker purges at a time
+PURGE_LOCK_KEY = 741_003
+
+# Longest a batch waits for a row lock before giving up until the next run
+PURGE_LOCK_TIMEOUT = "2s"
+
+# Chunks of expired documents; joining on user_id prunes each lookup to one partition
+_PURGE_CHUNKS = text(
+    "DELETE FROM document_chunks WHERE (id, user_id) IN ("
+    " SELECT c.id, c.user_id FROM documents d"
+    " JOIN document_chunks c ON c.document_id = d.id AND c.user_id = d.user_id"
+    " WHERE d.deleted_at < :cutoff LIMIT :batch)"
+)
+
+# Expired documents whose chunks are gone
+_PURGE_DOCUMENTS = text(
+    "DELETE FROM documents WHERE id IN ("
+    " SELECT d.id FROM documents d WHERE d.deleted_at < :cutoff"
+    " AND NOT EXISTS (SELECT 1 FROM document_chunks c WHERE c.document_id = d.id)"
+    " ORDER BY d.deleted_at LIMIT :batch)"
+)
+
+_PURGE_POSTS = text(
+    "DELETE FROM linkedin_posts WHERE (id, created_at) IN ("
+    " SELECT id, created_at FROM linkedin_posts WHERE deleted_at < :cutoff"
+    " ORDER BY deleted_at LIMIT :batch)"
+)
+
+# In dependency order
+PURGE_STEPS = {
+    "document_chunks": _PURGE_CHUNKS,
+    "documents": _PURGE_DOCUMENTS,
+    "linkedin_posts": _PURGE_POSTS,
+}
+
+
+async def _purge_batch(engine: AsyncEngine, statement, params: Dict) -> int:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"SET LOCAL lock_timeout = '{PURGE_LOCK_TIMEOUT}'"))
+        result = await conn.execute(statement, params)
+        return result.rowcount
+
+
+async def purge_expired(
+    engine: AsyncEngine,
+    retention_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+) -> Optional[Dict[str, int]]:
+    """
+    Hard-delete soft-deleted rows past retention, in throttled batches.
+
+    Args:
+        engine: Engine of the primary
+        retention_days: Days deleted rows are kept (default: setting)
+        batch_size: Rows deleted per transaction (default: setting)
+        pause: Seconds to sleep between batches (default: setting)
+
+    Returns:
+        Rows deleted per table, or None if another worker is purging
+    """
+    retention_days = settings.SOFT_DELETE_RETENTION_DAYS if retention_days is None else retention_days
+    params = {
+        "cutoff": datetime.utcnow() - timedelta(days=retention_days),
+        "batch": batch_size or settings.SOFT_DELETE_PURGE_BATCH_SIZE,
+    }
+    pause = settings.SOFT_DELETE_PURGE_PAUSE_SECONDS if pause is None else pause
+
+    purged = {table: 0 for table in PURGE_STEPS}
+    async with engine.connect() as lock_conn:
+        locked = (await lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": PURGE_LOCK_KEY}
+        )).scalar()
+        await lock_conn.commit()
+        if not locked:
+            logger.info("Soft-delete purge running elsewhere, skipping")
+            return None
+        try:
+            for table, statement in PURGE_STEPS.items():
+                while True:
+                    try:
+                        deleted = await _purge_batch(engine, statement, params)
+                    except DBAPIError as e:
+                        # Most likely a lock timeout: leave the rest for the next run
+                        logger.warning(f"Purge of {table} stopped: {e}")
+                        break
+                    purged[table] += deleted
+                    if deleted < params["batch"]:
+                        break
+                    await asyncio.sleep(pause)
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": PURGE_LOCK_KEY})
+            await lock_conn.commit()
+
+    if any(purged.values()):
+        logger.info(f"Purged soft-deleted rows: {purged}")
+    return purged
+
+
+def start_purge_job(engine: AsyncEngine, interval: Optional[int] = None) -> asyncio.Task:
+    """Purge expired rows every ``interval`` seconds (default: setting)."""
+    interval = interval or settings.SOFT_DELETE_PURGE_INTERVAL_SECONDS
+
+    async def run():
+        while True:
+            try:
+                await purge_expired(engine)
+            except Exception as e:
+                logger.error(f"Soft-delete purge failed: {e}")
+            await asyncio.sleep(interval)
+
+    return asyncio.create_task(run(), name="soft-delete-purge")
+
+
+async def _main(args: argparse.Namespace) -> int:
+    """Command line entry point."""
+    from app.db.postgres.session import dispose_engine, get_engine
+
+    try:
+        purged = await purge_expired(get_engine(), args.retention_days, args.batch_size, args.pause)
+        if purged is None:
+            print("Another worker is purging")
+            return 1
+        for table, count in purged.items():
+            print(f"{table:<20} {count:>10}")
+        return 0
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Purge expired soft-deleted rows")
+    parser.add_argument("--retention-days", type=int, help="days deleted rows are kept")
+    parser.add_argument("--batch-size", type=int, help="rows deleted per transaction")
+    parser.add_argument("--pause", type=float, help="seconds between batches")
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -1,96 +1,410 @@
 """
 PostgreSQL session and engine management.
+
+Each worker process owns exactly one primary engine (and connection pool),
+created on first use by the process-wide ``PostgresEngineManager`` and
+shared by every task, whatever context it runs in.
+
+With POSTGRES_REPLICA_URIS set, the manager also owns one engine per read
+replica. Sessions opened read-only (``get_read_session``,
+``db_transaction(read_only=True)``) send their queries to the healthy
+replica with the least lag, chosen once per session; writes always go to
+the primary. Once a request has written, its later reads are pinned to the
+primary too, so it reads its own writes. Listing the primary URI as a
+replica is enough to exercise the routing locally.
 """
 
+import asyncio
 import logging
-from typing import AsyncGenerator, Optional, Callable, TypeVar, Generic, Any
+import random
+import threading
+import time
+from contextvars import ContextVar, Token
+from datetime import datetime
+from typing import AsyncGenerator, List, Optional, Callable, Any, Dict
 from contextlib import asynccontextmanager
-from contextvars import ContextVar
 from functools import wraps
 
+from sqlalchemy import exc, text
 from sqlalchemy.ext.asyncio import (
-    AsyncEngine, 
-    AsyncSession, 
+    AsyncEngine,
+    AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Context variables to store engine and session factory
-_engine_ctx: ContextVar[Optional[AsyncEngine]] = ContextVar("_engine", default=None)
-_async_session_ctx: ContextVar[Optional[async_sessionmaker[AsyncSession]]] = ContextVar("_async_session", default=None)
-
-T = TypeVar("T")
-
-
-class ContextVarHolder(Generic[T]):
-    """Context variable holder with get/set methods."""
-    
-    def __init__(self, ctx_var: ContextVar[Optional[T]], name: str):
-        self._ctx_var = ctx_var
-        self._name = name
-    
-    def get(self) -> T:
-        """Get value from context variable."""
-        value = self._ctx_var.get()
-        if value is None:
-            raise RuntimeError(f"{self._name} is not initialized")
-        return value
-    
-    def set(self, value: T) -> None:
-        """Set value in context variable."""
-        self._ctx_var.set(value)
-
-
-# Create holders for engine and session factory
-get_db_engine = ContextVarHolder(_engine_ctx, "Database engine")
-get_async_session = ContextVarHolder(_async_session_ctx, "Async session factory")
-
-
-def create_engine() -> AsyncEngine:
-    """Create SQLAlchemy engine."""
-    logger.debug("Creating PostgreSQL engine")
-    engine = create_async_engine(
-        settings.SQLALCHEMY_DATABASE_URI,
-        echo=settings.DEBUG,
-        pool_pre_ping=True,
-    )
-    get_db_engine.set(engine)
-    return engine
-
-
-def create_session_factory(engine: Optional[AsyncEngine] = None) -> async_sessionmaker[AsyncSession]:
-    """Create SQLAlchemy session factory."""
-    logger.debug("Creating PostgreSQL session factory")
-    
-    if engine is None:
+
+class PoolMetrics:
+    """Checkout counters and latencies of one connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def record(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_ms_total / attempts, 3) if attempts else 0.0,
+                "wait_ms_max": round(self.wait_ms_max, 3),
+            }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that measures how long each checkout takes.
+
+    The time covers waiting for a free connection and, when the pool grows
+    into its overflow, opening a new one.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
         try:
-            engine = get_db_engine.get()
-        except RuntimeError:
-            engine = create_engine()
-    
-    session_factory = async_sessionmaker(
-        engine,
-        expire_on_commit=False,
-        autoflush=False,
-    )
-    get_async_session.set(session_factory)
-    return session_factory
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.metrics.record((time.perf_counter() - start) * 1000)
+        return connection
+
+
+class _PrimaryPin:
+    """Mutable flag shared by everything running within one request."""
+
+    __slots__ = ("pinned",)
+
+    def __init__(self):
+        self.pinned = False
+
+
+_primary_pin: ContextVar[Optional[_PrimaryPin]] = ContextVar("postgres_primary_pin", default=None)
+
+
+def begin_request_scope() -> Token:
+    """Start a fresh read-your-writes scope (one per request)."""
+    return _primary_pin.set(_PrimaryPin())
+
+
+def end_request_scope(token: Token) -> None:
+    _primary_pin.reset(token)
+
+
+def pin_to_primary() -> None:
+    """Send the rest of this scope's reads to the primary."""
+    pin = _primary_pin.get()
+    if pin is None:
+        pin = _PrimaryPin()
+        _primary_pin.set(pin)
+    pin.pinned = True
+
+
+def is_pinned_to_primary() -> bool:
+    pin = _primary_pin.get()
+    return pin is not None and pin.pinned
+
+
+class Replica:
+    """One read replica engine and its last health check."""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag_seconds = 0.0
+        self.error: Optional[str] = None
+        self.checked_at: Optional[datetime] = None
+        self.selected = 0
+
+    @property
+    def eligible(self) -> bool:
+        return self.healthy and self.lag_seconds <= settings.POSTGRES_REPLICA_MAX_LAG_SECONDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        pool = self.engine.sync_engine.pool
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": round(self.lag_seconds, 3),
+            "error": self.error,
+            "checked_at": self.checked_at.isoformat() + "Z" if self.checked_at else None,
+            "selected": self.selected,
+            "checked_out": pool.checkedout(),
+        }
+
+
+# Replication lag; 0 on a primary and on a replica that has replayed all it received
+_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+# Leading keywords of textual statements that only read
+_READ_KEYWORDS = ("SELECT", "SHOW", "EXPLAIN", "VALUES", "TABLE", "SET")
+
+
+def _is_write(clause) -> bool:
+    """Whether a statement may write; textual ones count unless they start with a read keyword."""
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        words = clause.text.split(None, 1)
+        return bool(words) and words[0].upper() not in _READ_KEYWORDS
+    return False
+
+
+class RoutingSession(Session):
+    """
+    Session that picks an engine per statement.
+
+    Read-only sessions use one replica, chosen on first use, unless the
+    scope is pinned to the primary; flushes and DML always use the primary
+    and pin the scope, so sessions that only read never pin it.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        writing = self._flushing or _is_write(clause)
+        if self.info.get("read_only") and not writing and not is_pinned_to_primary():
+            if "replica" not in self.info:
+                self.info["replica"] = _manager.choose_replica()
+            replica = self.info["replica"]
+            if replica is not None:
+                return replica.engine.sync_engine
+        if writing:
+            pin_to_primary()
+        return _manager.get_engine().sync_engine
+
+
+class PostgresEngineManager:
+    """
+    Owns the PostgreSQL engines of this worker process.
+
+    Creation is guarded by a lock, so concurrent first uses still produce
+    one primary engine; ``engines_created`` counts them to make duplicates
+    visible.
+    """
+
+    def __init__(self):
+        self._engine: Optional[AsyncEngine] = None
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+        self._lock = threading.Lock()
+        self.engines_created = 0
+        self.replicas: List[Replica] = []
+        self.replica_fallbacks = 0
+
+    @property
+    def initialized(self) -> bool:
+        return self._engine is not None
+
+    def get_engine(self) -> AsyncEngine:
+        """Create the engine if it does not exist yet and return it."""
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = self._create_engine()
+                    self.replicas = [
+                        Replica(f"replica-{number}", self._create_engine(uri, count=False))
+                        for number, uri in enumerate(_replica_uris())
+                    ]
+                    self._session_factory = async_sessionmaker(
+                        sync_session_class=RoutingSession,
+                        expire_on_commit=False,
+                        autoflush=False,
+                    )
+        return self._engine
+
+    def get_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Get the session factory bound to the shared engine."""
+        self.get_engine()
+        return self._session_factory
+
+    def _create_engine(self, uri: Optional[str] = None, count: bool = True) -> AsyncEngine:
+        logger.debug("Creating PostgreSQL engine")
+        if count:
+            self.engines_created += 1
+            if self.engines_created > 1:
+                logger.warning(f"PostgreSQL engine created {self.engines_created} times in this process")
+        return create_async_engine(
+            uri or settings.SQLALCHEMY_DATABASE_URI,
+            echo=settings.DEBUG,
+            poolclass=InstrumentedPool,
+            pool_size=settings.POSTGRES_POOL_SIZE,
+            max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+            pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+            pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+            pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+            connect_args={
+                # asyncpg's own cache and SQLAlchemy's adapter cache
+                "statement_cache_size": settings.POSTGRES_STATEMENT_CACHE_SIZE,
+                "prepared_statement_cache_size": settings.POSTGRES_PREPARED_STATEMENT_CACHE_SIZE,
+                "command_timeout": settings.POSTGRES_COMMAND_TIMEOUT,
+                "server_settings": {"application_name": settings.POSTGRES_APP_NAME},
+            },
+        )
+
+    def choose_replica(self) -> Optional[Replica]:
+        """
+        Healthy replica within the lag limit, preferring the least lagged
+        (ties broken at random); None sends the session to the primary.
+        """
+        self.get_engine()
+        eligible = [replica for replica in self.replicas if replica.eligible]
+        if not eligible:
+            if self.replicas:
+                self.replica_fallbacks += 1
+            return None
+        least = min(replica.lag_seconds for replica in eligible)
+        # Within a second of the best counts as equally fresh
+        replica = random.choice([r for r in eligible if r.lag_seconds <= least + 1.0])
+        replica.selected += 1
+        return replica
+
+    async def check_replicas(self) -> None:
+        """Measure the health and lag of every replica."""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    replica.lag_seconds = float((await conn.execute(_LAG_QUERY)).scalar() or 0)
+                replica.healthy = True
+                replica.error = None
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning(f"PostgreSQL {replica.name} unavailable: {e}")
+                replica.healthy = False
+                replica.error = str(e)
+            replica.checked_at = datetime.utcnow()
+
+    def start_replica_monitor(self) -> Optional[asyncio.Task]:
+        """Check replicas every POSTGRES_REPLICA_CHECK_SECONDS; None without replicas."""
+        self.get_engine()
+        if not self.replicas:
+            return None
+
+        async def run():
+            while True:
+                await self.check_replicas()
+                await asyncio.sleep(settings.POSTGRES_REPLICA_CHECK_SECONDS)
+
+        return asyncio.create_task(run(), name="postgres-replicas")
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Pool settings, occupancy and checkout metrics."""
+        stats: Dict[str, Any] = {
+            "connected": self.initialized,
+            "engines_created": self.engines_created,
+            "pool_size": settings.POSTGRES_POOL_SIZE,
+            "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+        }
+        if self._engine is not None:
+            pool = self._engine.sync_engine.pool
+            stats.update({
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+            if isinstance(pool, InstrumentedPool):
+                stats.update(pool.metrics.snapshot())
+        if self.replicas:
+            stats["replicas"] = {replica.name: replica.to_dict() for replica in self.replicas}
+            stats["replica_fallbacks"] = self.replica_fallbacks
+        return stats
+
+    async def dispose(self) -> None:
+        """Close all pooled connections and forget the engine."""
+        engine, self._engine, self._session_factory = self._engine, None, None
+        replicas, self.replicas = self.replicas, []
+        if engine is not None:
+            logger.debug("Disposing PostgreSQL engine")
+            await engine.dispose()
+        for replica in replicas:
+            await replica.engine.dispose()
+
+
+def _replica_uris() -> List[str]:
+    return [uri.strip() for uri in settings.POSTGRES_REPLICA_URIS.split(",") if uri.strip()]
+
+
+# Process-wide manager instance
+_manager = PostgresEngineManager()
+
+
+def get_engine() -> AsyncEngine:
+    """Get the shared PostgreSQL engine, creating it on first use."""
+    return _manager.get_engine()
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Get the session factory of the shared engine."""
+    return _manager.get_session_factory()
+
+
+def get_postgres_pool_stats() -> Dict[str, Any]:
+    """Get connection pool statistics of the shared engine."""
+    return _manager.pool_stats()
+
+
+def get_engines_created() -> int:
+    """Number of engines this process has created (1 once initialized)."""
+    return _manager.engines_created
+
+
+def is_engine_initialized() -> bool:
+    """Whether the shared engine exists, without creating it."""
+    return _manager.initialized
+
+
+async def dispose_engine() -> None:
+    """Dispose the shared engine."""
+    await _manager.dispose()
+
+
+def start_replica_monitor() -> Optional[asyncio.Task]:
+    """Start the replica health checks, if replicas are configured."""
+    return _manager.start_replica_monitor()
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    """Get database session dependency."""
-    try:
-        session_factory = get_async_session.get()
-    except RuntimeError:
-        create_session_factory()
-        session_factory = get_async_session.get()
-    
-    async with session_factory() as session:
+    """Get database session dependency (primary)."""
+    async with get_session_factory()() as session:
+        try:
+            yield session
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Database error: {e}")
+            raise
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get a read-only session dependency, served by a replica when possible."""
+    async with get_session_factory()(info={"read_only": True}) as session:
         try:
             yield session
         except SQLAlchemyError as e:
@@ -100,15 +414,15 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 @asynccontextmanager
-async def db_transaction() -> AsyncGenerator[AsyncSession, None]:
-    """Database transaction context manager."""
-    try:
-        session_factory = get_async_session.get()
-    except RuntimeError:
-        create_session_factory()
-        session_factory = get_async_session.get()
-    
-    async with session_factory() as session:
+async def db_transaction(read_only: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Database transaction context manager.
+
+    Args:
+        read_only: Route queries to a replica; a transaction that writes
+            pins the rest of the request to the primary
+    """
+    async with get_session_factory()(info={"read_only": read_only}) as session:
         try:
             yield session
             await session.commit()
@@ -125,4 +439,4 @@ def with_db_transaction(func: Callable) -> Callable:
         async with db_transaction() as session:
             kwargs['session'] = session
             return await func(*args, **kwargs)
-    return wrapper 
\ No newline at end of file
+    return wrapper
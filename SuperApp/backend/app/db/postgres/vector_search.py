@@ -0,0 +1,679 @@
+"""
+pgvector similarity search over document chunks and LinkedIn posts.
+
+Embedding columns are indexed with HNSW (cosine distance). Build parameters
+come from the VECTOR_HNSW_* settings; a changed index is rebuilt under a new
+name with ``CREATE INDEX CONCURRENTLY`` and swapped in, so searches keep
+working during the rebuild.
+
+Searches take per-query knobs: ``ef_search`` (HNSW) or ``probes`` (IVFFlat)
+trade recall for latency, and ``exact=True`` bypasses the index entirely.
+
+With VECTOR_QUANTIZATION set to ``halfvec`` or ``bit``, chunk embeddings
+are indexed through a quantized expression (half-precision, or one bit per
+dimension) instead of the full float32 vectors. Searches then take
+``limit * VECTOR_RERANK_FACTOR`` coarse candidates from that much smaller
+index and re-rank them exactly with the stored full vectors. Switching
+modes is a migration run by ``--ensure``: the new index is built
+concurrently before the old one is dropped.
+
+Chunks also carry a generated ``content_tsv`` column with a GIN index.
+``hybrid_search_chunks`` runs the lexical and ANN searches as two CTEs of a
+single statement and fuses their rankings with reciprocal rank fusion, so
+exact terms (names, error codes, skills) are found in the same round trip.
+
+Index maintenance::
+
+    python -m app.db.postgres.vector_search --ensure
+    python -m app.db.postgres.vector_search --rebuild document_chunks_embedding_hnsw
+    python -m app.db.postgres.vector_search --ensure --quantization halfvec
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, cast, func, literal, or_, select, text
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.db.postgres.models import DocumentChunkTable, DocumentTable, LinkedInPostTable
+from app.db.postgres.partitions import create_index, drop_index, relkind, rename_index
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex:
+    """An HNSW index on an embedding column."""
+
+    def __init__(self, name: str, table: str, column: str, ops: str = "vector_cosine_ops"):
+        self.name = name
+        self.table = table
+        self.column = column
+        self.ops = ops
+
+    @property
+    def options(self) -> Dict[str, int]:
+        return {"m": settings.VECTOR_HNSW_M, "ef_construction": settings.VECTOR_HNSW_EF_CONSTRUCTION}
+
+    @property
+    def definition(self) -> str:
+        """Index definition following ``ON <table>``."""
+        options = ", ".join(f"{key} = {value}" for key, value in self.options.items())
+        return f"USING hnsw ({self.column} {self.ops}) WITH ({options})"
+
+    async def create(self, conn, name: Optional[str] = None) -> None:
+        """Build this index concurrently, optionally under another name."""
+        await create_index(conn, name or self.name, self.table, self.definition)
+
+
+# Width of the chunk and post embedding columns
+EMBEDDING_DIMENSIONS = 1536
+
+# Chunk embedding index of each quantization mode; quantized ones index an
+# expression, so the table keeps the full vectors for re-ranking
+CHUNK_INDEXES = {
+    "none": VectorIndex("document_chunks_embedding_hnsw", "document_chunks", "embedding"),
+    "halfvec": VectorIndex(
+        "document_chunks_embedding_halfvec_hnsw",
+        "document_chunks",
+        f"(embedding::halfvec({EMBEDDING_DIMENSIONS}))",
+        "halfvec_cosine_ops",
+    ),
+    "bit": VectorIndex(
+        "document_chunks_embedding_bit_hnsw",
+        "document_chunks",
+        f"(binary_quantize(embedding)::bit({EMBEDDING_DIMENSIONS}))",
+        "bit_hamming_ops",
+    ),
+}
+
+POST_INDEX = VectorIndex("linkedin_posts_embedding_hnsw", "linkedin_posts", "content_embedding")
+
+# Every index this module knows about
+VECTOR_INDEXES = list(CHUNK_INDEXES.values()) + [POST_INDEX]
+
+# Fixed-list IVFFlat indexes from the original schema, replaced by HNSW
+LEGACY_INDEXES = ["document_chunks_embedding_idx", "linkedin_posts_embedding_idx"]
+
+# GIN index on the generated tsvector column of chunks
+TEXT_SEARCH_INDEX = "document_chunks_content_tsv_gin"
+
+# Advisory lock key so only one worker maintains indexes at a time
+MAINTENANCE_LOCK_KEY = 741_001
+
+# Largest hnsw.ef_search pgvector accepts
+MAX_EF_SEARCH = 1000
+
+# First pgvector release with hnsw.iterative_scan
+ITERATIVE_SCAN_VERSION = (0, 8)
+
+# Whether the installed pgvector supports iterative scans (checked once)
+_iterative_scan_supported: Optional[bool] = None
+
+
+async def iterative_scan_supported(session: AsyncSession) -> bool:
+    """Whether the installed pgvector has ``hnsw.iterative_scan``, checked once per process."""
+    global _iterative_scan_supported
+    if _iterative_scan_supported is None:
+        version = (await session.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        )).scalar()
+        try:
+            parsed = tuple(int(part) for part in (version or "").split(".")[:2])
+        except ValueError:
+            parsed = ()
+        _iterative_scan_supported = parsed >= ITERATIVE_SCAN_VERSION
+        if not _iterative_scan_supported and settings.VECTOR_ITERATIVE_SCAN != "off":
+            logger.warning(f"pgvector {version} has no iterative scans; VECTOR_ITERATIVE_SCAN is ignored")
+    return _iterative_scan_supported
+
+
+def _quantization(mode: Optional[str]) -> str:
+    mode = mode or settings.VECTOR_QUANTIZATION
+    if mode not in CHUNK_INDEXES:
+        raise ValueError(f"Unknown vector quantization {mode}, expected one of {list(CHUNK_INDEXES)}")
+    return mode
+
+
+def active_indexes(quantization: Optional[str] = None) -> List[VectorIndex]:
+    """Indexes searches use under a quantization mode (default: the setting)."""
+    return [CHUNK_INDEXES[_quantization(quantization)], POST_INDEX]
+
+
+def _index(name: str) -> VectorIndex:
+    for index in VECTOR_INDEXES:
+        if index.name == name:
+            return index
+    raise ValueError(f"Unknown vector index {name}")
+
+
+async def _autocommit(engine: AsyncEngine):
+    """Connection outside a transaction, as CONCURRENTLY requires."""
+    conn = await engine.connect()
+    return await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+
+async def _prepare_build(conn) -> None:
+    """Give index builds more memory, so the graph is built in RAM."""
+    await conn.execute(
+        text("SELECT set_config('maintenance_work_mem', :memory, false)"),
+        {"memory": settings.VECTOR_INDEX_BUILD_MEMORY},
+    )
+
+
+async def _index_options(conn, name: str) -> Optional[Dict[str, str]]:
+    """Storage options of an existing valid index, or None if it is missing or invalid."""
+    row = (await conn.execute(
+        text(
+            "SELECT c.reloptions, i.indisvalid FROM pg_class c "
+            "JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name"
+        ),
+        {"name": name},
+    )).first()
+    if row is None or not row.indisvalid:
+        return None
+    return dict(option.split("=", 1) for option in (row.reloptions or []))
+
+
+async def _ensure_text_search(conn) -> bool:
+    """Add the chunk tsvector column and its GIN index if missing."""
+    exists = (await conn.execute(
+        text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'document_chunks' AND column_name = 'content_tsv'"
+        )
+    )).first()
+    if exists is None:
+        # Rewrites the table under an exclusive lock, once
+        logger.info("Adding document_chunks.content_tsv")
+        await conn.execute(text(
+            "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{settings.HYBRID_TEXT_SEARCH_CONFIG}', content)) STORED"
+        ))
+    if await _index_options(conn, TEXT_SEARCH_INDEX) is not None:
+        return exists is None
+    await _drop_invalid(conn, TEXT_SEARCH_INDEX)
+    logger.info(f"Creating text search index {TEXT_SEARCH_INDEX}")
+    await create_index(conn, TEXT_SEARCH_INDEX, "document_chunks", "USING gin (content_tsv)")
+    return True
+
+
+async def _drop_invalid(conn, name: str) -> None:
+    """
+    Drop an invalid leftover of an interrupted concurrent build. A partitioned
+    index is kept: building it again attaches the partitions still missing.
+    """
+    if await relkind(conn, name) == "i":
+        await drop_index(conn, name)
+
+
+async def ensure_vector_indexes(
+    engine: AsyncEngine,
+    drop_legacy: bool = True,
+    quantization: Optional[str] = None,
+) -> List[str]:
+    """
+    Create missing HNSW indexes and rebuild those with outdated parameters.
+
+    Also adds the chunk tsvector column and GIN index used by hybrid search.
+
+    Args:
+        engine: Engine to run on
+        drop_legacy: Drop the old IVFFlat indexes, and chunk indexes of other
+            quantization modes, once the active ones exist
+        quantization: Chunk index mode to build (default: VECTOR_QUANTIZATION)
+
+    Returns:
+        Names of the indexes created or rebuilt (empty if another worker
+        holds the maintenance lock)
+    """
+    wanted_indexes = active_indexes(quantization)
+    changed = []
+    conn = await _autocommit(engine)
+    try:
+        locked = (await conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+        )).scalar()
+        if not locked:
+            logger.info("Vector index maintenance already running in another worker")
+            return changed
+        try:
+            await _prepare_build(conn)
+            for index in wanted_indexes:
+                options = await _index_options(conn, index.name)
+                wanted = {key: str(value) for key, value in index.options.items()}
+                if options is None:
+                    await _drop_invalid(conn, index.name)
+                    logger.info(f"Creating vector index {index.name}")
+                    await index.create(conn)
+                    changed.append(index.name)
+                elif options != wanted:
+                    await _rebuild(conn, index)
+                    changed.append(index.name)
+            if await _ensure_text_search(conn):
+                changed.append(TEXT_SEARCH_INDEX)
+            if drop_legacy:
+                obsolete = [i.name for i in CHUNK_INDEXES.values() if i not in wanted_indexes]
+                for name in LEGACY_INDEXES + obsolete:
+                    await drop_index(conn, name)
+        finally:
+            # Session-level lock: release it before the connection returns to the pool
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+    finally:
+        await conn.close()
+    return changed
+
+
+async def _rebuild(conn, index: VectorIndex) -> None:
+    """Build a replacement index concurrently, then swap names."""
+    temporary = f"{index.name}_new"
+    logger.info(f"Rebuilding vector index {index.name} with {index.options}")
+    await drop_index(conn, temporary)
+    await index.create(conn, temporary)
+    await drop_index(conn, index.name)
+    await rename_index(conn, temporary, index.name, index.table)
+
+
+async def rebuild_vector_index(engine: AsyncEngine, name: str) -> None:
+    """Rebuild one vector index without blocking reads or writes."""
+    conn = await _autocommit(engine)
+    try:
+        await _prepare_build(conn)
+        await _rebuild(conn, _index(name))
+    finally:
+        await conn.close()
+
+
+def start_background_ensure(engine: AsyncEngine) -> asyncio.Task:
+    """Run ``ensure_vector_indexes`` in the background, logging failures."""
+
+    async def run():
+        try:
+            changed = await ensure_vector_indexes(engine)
+            if changed:
+                logger.info(f"Vector indexes updated: {changed}")
+        except Exception as e:
+            logger.error(f"Vector index maintenance failed: {e}")
+
+    return asyncio.create_task(run(), name="vector-indexes")
+
+
+def _tsquery(query_text: str):
+    """Parse user input with the text search configuration of ``content_tsv``."""
+    return func.websearch_to_tsquery(
+        literal(settings.HYBRID_TEXT_SEARCH_CONFIG).cast(REGCONFIG), query_text
+    )
+
+
+def _quantized_distance(mode: str, embedding: Sequence[float]):
+    """Distance expression matching the quantized chunk index of ``mode``."""
+    from pgvector.sqlalchemy import BIT, HALFVEC
+
+    query_vector = literal(list(embedding), DocumentChunkTable.embedding.type)
+    if mode == "halfvec":
+        column = cast(DocumentChunkTable.embedding, HALFVEC(EMBEDDING_DIMENSIONS))
+        return column.op("<=>", return_type=Float)(cast(query_vector, HALFVEC(EMBEDDING_DIMENSIONS)))
+    column = cast(func.binary_quantize(DocumentChunkTable.embedding), BIT(EMBEDDING_DIMENSIONS))
+    return column.op("<~>", return_type=Float)(func.binary_quantize(query_vector))
+
+
+def _filter_chunks(query, user_id, document_ids, include_public):
+    """
+    Restrict a chunk query by owner/visibility and documents.
+
+    Filtering on the chunk's own ``user_id`` prunes the search to that
+    user's hash partition; including public documents of other users needs
+    the join and scans every partition. Chunks of soft-deleted documents
+    stay until purged, so only chunks of live documents are kept.
+    """
+    joined = False
+    if user_id:
+        owner = DocumentChunkTable.user_id == user_id
+        if include_public:
+            query = query.join(DocumentTable, DocumentTable.id == DocumentChunkTable.document_id).where(
+                or_(owner, DocumentTable.is_public), DocumentTable.deleted_at.is_(None)
+            )
+            joined = True
+        else:
+            query = query.where(owner)
+    if not joined:
+        live_document = select(DocumentTable.id).where(
+            DocumentTable.id == DocumentChunkTable.document_id, DocumentTable.deleted_at.is_(None)
+        )
+        query = query.where(live_document.exists())
+    if document_ids:
+        query = query.where(DocumentChunkTable.document_id.in_(list(document_ids)))
+    return query
+
+
+class VectorSearchRepository:
+    """Nearest-neighbour queries over the embedding columns."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _configure(
+        self,
+        ef_search: Optional[int],
+        probes: Optional[int],
+        exact: bool,
+        filtered: bool,
+    ) -> None:
+        """
+        Set planner knobs with ``set_config(..., is_local => true)``.
+
+        They last until the end of the session's current transaction, so
+        other requests sharing the pooled connection are not affected.
+        ``ef_search`` is clamped to MAX_EF_SEARCH, which pgvector enforces.
+        """
+        values = {
+            "hnsw.ef_search": min(ef_search or settings.VECTOR_HNSW_EF_SEARCH, MAX_EF_SEARCH),
+            "ivfflat.probes": probes or settings.VECTOR_IVFFLAT_PROBES,
+            "enable_indexscan": "off" if exact else "on",
+        }
+        if filtered and settings.VECTOR_ITERATIVE_SCAN != "off" and await iterative_scan_supported(self.session):
+            values["hnsw.iterative_scan"] = settings.VECTOR_ITERATIVE_SCAN
+        for name, value in values.items():
+            await self.session.execute(
+                text("SELECT set_config(:name, :value, true)"),
+                {"name": name, "value": str(value)},
+            )
+
+    async def search_chunks(
+        self,
+        embedding: Sequence[float],
+        limit: int = 10,
+        user_id: Optional[str] = None,
+        document_ids: Optional[Sequence[str]] = None,
+        include_public: bool = True,
+        max_distance: Optional[float] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        exact: bool = False,
+        quantization: Optional[str] = None,
+        rerank_factor: Optional[int] = None,
+    ) -> List[Tuple[DocumentChunkTable, float]]:
+        """
+        Find the chunks closest to an embedding.
+
+        Under a quantized mode the index returns ``limit * rerank_factor``
+        candidates by approximate distance, which are re-ranked by their
+        exact distance to the full-precision vectors.
+
+        Args:
+            embedding: Query embedding
+            limit: Number of results
+            user_id: Only chunks of this user's documents (and public ones
+                if ``include_public``)
+            document_ids: Only chunks of these documents
+            include_public: Include public documents of other users
+            max_distance: Drop results farther than this cosine distance
+            ef_search: HNSW candidate list size; higher is slower and more accurate
+            probes: IVFFlat lists to scan, if an IVFFlat index is used
+            exact: Scan every row instead of using the index
+            quantization: Index to search: none, halfvec or bit
+                (default: VECTOR_QUANTIZATION)
+            rerank_factor: Coarse candidates per result in quantized modes
+
+        Returns:
+            List of (chunk, cosine distance), nearest first
+        """
+        filtered = bool(user_id or document_ids)
+        mode = _quantization(quantization)
+        if mode != "none" and not exact:
+            return await self._search_chunks_quantized(
+                embedding, mode, limit, rerank_factor, user_id, document_ids, include_public,
+                max_distance, ef_search, filtered,
+            )
+
+        distance = DocumentChunkTable.embedding.cosine_distance(embedding).label("distance")
+        query = select(DocumentChunkTable, distance).where(DocumentChunkTable.embedding.is_not(None))
+        query = _filter_chunks(query, user_id, document_ids, include_public)
+        return await self._run(query, distance, limit, max_distance, ef_search, probes, exact, filtered)
+
+    async def _search_chunks_quantized(
+        self, embedding, mode, limit, rerank_factor, user_id, document_ids, include_public,
+        max_distance, ef_search, filtered,
+    ) -> List[Tuple[DocumentChunkTable, float]]:
+        """Coarse search over a quantized index, exact re-rank by id, in one query."""
+        candidates = limit * (rerank_factor or settings.VECTOR_RERANK_FACTOR)
+        coarse = _filter_chunks(
+            select(DocumentChunkTable.id).where(DocumentChunkTable.embedding.is_not(None)),
+            user_id, document_ids, include_public,
+        ).order_by(_quantized_distance(mode, embedding)).limit(candidates)
+
+        # The function form of <=> matches no index, so the candidates are
+        # always sorted by their exact distance rather than re-searched
+        query_vector = literal(list(embedding), DocumentChunkTable.embedding.type)
+        distance = func.cosine_distance(DocumentChunkTable.embedding, query_vector, type_=Float).label("distance")
+        query = select(DocumentChunkTable, distance).where(DocumentChunkTable.id.in_(coarse.scalar_subquery()))
+
+        ef_search = max(ef_search or settings.VECTOR_HNSW_EF_SEARCH, candidates)
+        return await self._run(query, distance, limit, max_distance, ef_search, None, False, filtered)
+
+    async def search_chunks_lexical(
+        self,
+        query_text: str,
+        limit: int = 10,
+        user_id: Optional[str] = None,
+        document_ids: Optional[Sequence[str]] = None,
+        include_public: bool = True,
+    ) -> List[Tuple[DocumentChunkTable, float]]:
+        """
+        Find the chunks matching a full-text query, best first.
+
+        Args:
+            query_text: Web-search style query ("quoted phrases", -exclusions, or)
+            limit: Number of results
+            user_id: Only chunks of this user's documents (and public ones
+                if ``include_public``)
+            document_ids: Only chunks of these documents
+            include_public: Include public documents of other users
+
+        Returns:
+            List of (chunk, ts_rank_cd score)
+        """
+        tsquery = _tsquery(query_text)
+        score = func.ts_rank_cd(DocumentChunkTable.content_tsv, tsquery).label("score")
+        query = select(DocumentChunkTable, score).where(DocumentChunkTable.content_tsv.op("@@")(tsquery))
+        query = _filter_chunks(query, user_id, document_ids, include_public)
+        result = await self.session.execute(query.order_by(score.desc()).limit(limit))
+        return [(row[0], float(row[1])) for row in result.all()]
+
+    async def hybrid_search_chunks(
+        self,
+        query_text: str,
+        embedding: Sequence[float],
+        limit: int = 10,
+        user_id: Optional[str] = None,
+        document_ids: Optional[Sequence[str]] = None,
+        include_public: bool = True,
+        candidates: Optional[int] = None,
+        rrf_k: Optional[int] = None,
+        vector_weight: float = 1.0,
+        lexical_weight: float = 1.0,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[DocumentChunkTable, float]]:
+        """
+        Find chunks by both meaning and exact terms in one query.
+
+        The top ``candidates`` of the ANN search and of the full-text search
+        are fused with reciprocal rank fusion: each list contributes
+        ``weight / (rrf_k + rank)`` for every chunk it contains.
+
+        Args:
+            query_text: Full-text query, usually the user's question
+            embedding: Embedding of the same question
+            limit: Number of results
+            user_id: Only chunks of this user's documents (and public ones
+                if ``include_public``)
+            document_ids: Only chunks of these documents
+            include_public: Include public documents of other users
+            candidates: Results taken from each list before fusion
+            rrf_k: RRF constant; higher flattens the rank weighting
+            vector_weight: Weight of the vector ranking
+            lexical_weight: Weight of the lexical ranking
+            ef_search: HNSW candidate list size, at least ``candidates``
+
+        Returns:
+            List of (chunk, fused score), best first
+        """
+        candidates = candidates or settings.HYBRID_CANDIDATES
+        rrf_k = rrf_k or settings.HYBRID_RRF_K
+
+        # Only ranks are fused, so a quantized index's order is used as is
+        mode = _quantization(None)
+        if mode == "none":
+            distance = DocumentChunkTable.embedding.cosine_distance(embedding).label("distance")
+        else:
+            distance = _quantized_distance(mode, embedding).label("distance")
+        nearest = _filter_chunks(
+            select(DocumentChunkTable.id, distance).where(DocumentChunkTable.embedding.is_not(None)),
+            user_id, document_ids, include_public,
+        ).order_by(distance).limit(candidates).subquery("nearest")
+        vector_hits = select(
+            nearest.c.id,
+            func.row_number().over(order_by=nearest.c.distance).label("rank"),
+        ).cte("vector_hits")
+
+        tsquery = _tsquery(query_text)
+        score = func.ts_rank_cd(DocumentChunkTable.content_tsv, tsquery).label("score")
+        matching = _filter_chunks(
+            select(DocumentChunkTable.id, score).where(DocumentChunkTable.content_tsv.op("@@")(tsquery)),
+            user_id, document_ids, include_public,
+        ).order_by(score.desc()).limit(candidates).subquery("matching")
+        lexical_hits = select(
+            matching.c.id,
+            func.row_number().over(order_by=matching.c.score.desc()).label("rank"),
+        ).cte("lexical_hits")
+
+        fused_score = (
+            func.coalesce(literal(vector_weight) / (rrf_k + vector_hits.c.rank), 0.0)
+            + func.coalesce(literal(lexical_weight) / (rrf_k + lexical_hits.c.rank), 0.0)
+        ).label("score")
+        fused = (
+            select(func.coalesce(vector_hits.c.id, lexical_hits.c.id).label("id"), fused_score)
+            .select_from(vector_hits.join(lexical_hits, vector_hits.c.id == lexical_hits.c.id, full=True))
+            .order_by(fused_score.desc())
+            .limit(limit)
+            .subquery("fused")
+        )
+        query = (
+            select(DocumentChunkTable, fused.c.score)
+            .join(fused, DocumentChunkTable.id == fused.c.id)
+            .order_by(fused.c.score.desc())
+        )
+
+        filtered = bool(user_id or document_ids)
+        await self._configure(max(ef_search or settings.VECTOR_HNSW_EF_SEARCH, candidates), None, False, filtered)
+        result = await self.session.execute(query)
+        return [(row[0], float(row[1])) for row in result.all()]
+
+    async def search_posts(
+        self,
+        embedding: Sequence[float],
+        limit: int = 10,
+        user_id: Optional[str] = None,
+        is_published: Optional[bool] = None,
+        tags: Optional[Sequence[str]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        max_distance: Optional[float] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[Tuple[LinkedInPostTable, float]]:
+        """
+        Find the LinkedIn posts closest to an embedding.
+
+        Args:
+            embedding: Query embedding
+            limit: Number of results
+            user_id: Only this user's posts
+            is_published: Only published or unpublished posts
+            tags: Only posts having all these tags
+            created_after: Only posts created at or after this time; with
+                ``created_before`` it limits the search to the monthly
+                partitions of that range
+            created_before: Only posts created before this time
+            max_distance: Drop results farther than this cosine distance
+            ef_search: HNSW candidate list size
+            probes: IVFFlat lists to scan
+            exact: Scan every row instead of using the index
+
+        Returns:
+            List of (post, cosine distance), nearest first
+        """
+        distance = LinkedInPostTable.content_embedding.cosine_distance(embedding).label("distance")
+        query = select(LinkedInPostTable, distance).where(LinkedInPostTable.content_embedding.is_not(None))
+
+        if user_id:
+            query = query.where(LinkedInPostTable.user_id == user_id)
+        if is_published is not None:
+            query = query.where(LinkedInPostTable.is_published == is_published)
+        if tags:
+            query = query.where(LinkedInPostTable.tags.contains(list(tags)))
+        if created_after:
+            query = query.where(LinkedInPostTable.created_at >= created_after)
+        if created_before:
+            query = query.where(LinkedInPostTable.created_at < created_before)
+
+        filtered = bool(user_id or is_published is not None or tags or created_after or created_before)
+        return await self._run(query, distance, limit, max_distance, ef_search, probes, exact, filtered)
+
+    async def _run(self, query, distance, limit, max_distance, ef_search, probes, exact, filtered):
+        """Apply knobs, then run a search ordered by distance."""
+        await self._configure(ef_search, probes, exact, filtered)
+        # A distance predicate in SQL would stop the planner from using the
+        # index order, so the threshold is applied to the nearest rows here
+        result = await self.session.execute(query.order_by(distance).limit(limit))
+        rows = [(row[0], float(row[1])) for row in result.all()]
+        if max_distance is not None:
+            rows = [(item, d) for item, d in rows if d <= max_distance]
+        return rows
+
+
+async def index_sizes(engine: AsyncEngine) -> Dict[str, Any]:
+    """Size of each vector index and of the chunk table, for capacity planning."""
+    async with engine.connect() as conn:
+        rows = await conn.execute(
+            text("SELECT relname, pg_relation_size(oid) AS bytes FROM pg_class WHERE relname = ANY(:names)"),
+            {"names": [index.name for index in VECTOR_INDEXES] + [TEXT_SEARCH_INDEX, "document_chunks"]},
+        )
+        return {row.relname: row.bytes for row in rows}
+
+
+async def _main(args: argparse.Namespace) -> int:
+    """Command line entry point."""
+    from app.db.postgres.session import dispose_engine, get_engine
+
+    engine = get_engine()
+    try:
+        if args.rebuild:
+            await rebuild_vector_index(engine, args.rebuild)
+            print(f"Rebuilt {args.rebuild}")
+        if args.ensure:
+            changed = await ensure_vector_indexes(engine, quantization=args.quantization)
+            print(f"Created or rebuilt: {', '.join(changed) or 'nothing'}")
+        print(await index_sizes(engine))
+        return 0
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pgvector index maintenance")
+    parser.add_argument("--ensure", action="store_true", help="create missing or outdated HNSW indexes")
+    parser.add_argument("--rebuild", metavar="INDEX", help="rebuild one index concurrently")
+    parser.add_argument(
+        "--quantization",
+        choices=list(CHUNK_INDEXES),
+        help="chunk index mode to migrate to (default: VECTOR_QUANTIZATION)",
+    )
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,56 @@
+"""
+Redis client module.
+"""
+
+import logging
+from typing import Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisClientManager:
+    """Redis client manager shared by caches, rate limiting and pub/sub."""
+
+    def __init__(self):
+        self._client: Optional[redis.Redis] = None
+
+    def get_client(self, client: Optional[redis.Redis] = None) -> redis.Redis:
+        """Get Redis client, optionally setting a new client."""
+        if client is not None:
+            self._client = client
+            logger.debug("Redis client set")
+
+        if self._client is None:
+            logger.debug("Creating new Redis client")
+            self._client = redis.from_url(
+                settings.REDIS_URI,
+                encoding="utf-8",
+                decode_responses=True,
+            )
+
+        return self._client
+
+    async def close(self):
+        """Close Redis client."""
+        if self._client:
+            logger.debug("Closing Redis client")
+            await self._client.close()
+            self._client = None
+
+
+# Create global manager instance
+_manager = RedisClientManager()
+
+
+def get_redis_client(client: Optional[redis.Redis] = None) -> redis.Redis:
+    """Get the shared Redis client."""
+    return _manager.get_client(client)
+
+
+async def close_redis_client():
+    """Close Redis client."""
+    await _manager.close()
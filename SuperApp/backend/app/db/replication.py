@@ -0,0 +1,387 @@
+"""
+Replication of MongoDB entities to PostgreSQL from the outbox.
+
+``OutboxReplicator`` polls pending ``OutboxEvent`` records, loads the
+current MongoDB documents of the named entities and upserts them into the
+matching PostgreSQL tables (users before documents and posts, so foreign
+keys resolve) in one transaction per batch. Entities no longer in MongoDB
+are deleted, softly for tables with ``deleted_at`` (``app.db.postgres.purge``
+removes them later). Upserts write the latest state, so applying an event twice,
+or replaying old ones, leaves the same result.
+
+Each batch takes a transaction-scoped advisory lock, so one worker at a
+time replicates. A failed batch is retried with exponential backoff.
+
+Maintenance::
+
+    python -m app.db.replication --once
+    python -m app.db.replication --replay --since 2026-10-01T00:00:00
+    python -m app.db.replication --backfill users
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import UpdateOne
+from sqlalchemy import delete, func, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.mongodb.models import Document, LinkedInPost, OutboxEvent, User
+from app.db.mongodb.outbox import REPLICATED_COLLECTIONS, record_outbox
+from app.db.postgres.base import SoftDeleteMixin
+from app.db.postgres.models import DocumentTable, LinkedInPostTable, UserTable
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock key so only one worker replicates at a time
+REPLICATION_LOCK_KEY = 741_002
+
+
+def _uuid(value: Any) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+async def _user_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": _uuid(doc["_id"]),
+        "email": doc["email"],
+        "password_hash": doc["hashed_password"],
+        "name": doc.get("full_name") or doc["username"],
+        "role": "admin" if doc.get("is_superuser") else "user",
+        "is_active": doc.get("is_active", True),
+        "created_at": doc.get("created_at") or datetime.utcnow(),
+        "updated_at": doc.get("updated_at") or datetime.utcnow(),
+    }
+
+
+async def _document_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    document = Document.parse_obj(doc)
+    return {
+        "id": _uuid(document.id),
+        "user_id": _uuid(document.user_id),
+        "title": document.title,
+        # Bodies can be far larger than a row should be: they stay in GridFS,
+        # and their text reaches PostgreSQL as document_chunks
+        "content": "",
+        "metadata_": document.metadata,
+        "is_processed": document.is_processed,
+        "is_public": document.is_public,
+        "created_at": document.created_at,
+        "updated_at": document.updated_at,
+    }
+
+
+async def _post_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": _uuid(doc["_id"]),
+        "user_id": _uuid(doc["user_id"]),
+        "linkedin_post_id": doc.get("linkedin_post_id"),
+        "content": doc["content"],
+        "media_urls": [doc["image_url"]] if doc.get("image_url") else None,
+        "published_at": doc.get("published_at"),
+        "is_published": doc.get("is_published", False),
+        "engagement_data": doc.get("engagement_stats") or {},
+        "ai_generated": doc.get("ai_generated", False),
+        "generation_params": doc.get("generation_params"),
+        "ai_engagement_prediction": doc.get("ai_engagement_prediction"),
+        "tags": doc.get("tags") or [],
+        "created_at": doc.get("created_at") or datetime.utcnow(),
+        "updated_at": doc.get("updated_at") or datetime.utcnow(),
+    }
+
+
+class Mapping:
+    """How one MongoDB collection maps onto one PostgreSQL table."""
+
+    def __init__(self, model, table, to_row: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]):
+        self.model = model
+        self.table = table
+        self.to_row = to_row
+
+
+# In foreign key order
+MAPPINGS = {
+    "users": Mapping(User, UserTable, _user_row),
+    "documents": Mapping(Document, DocumentTable, _document_row),
+    "linkedin_posts": Mapping(LinkedInPost, LinkedInPostTable, _post_row),
+}
+
+
+async def _upsert(conn, mapping: Mapping, rows: List[Dict[str, Any]]) -> None:
+    """Insert rows, or overwrite the existing ones with the same primary key."""
+    table = mapping.table.__table__
+    # Attribute names to column names (metadata_ -> metadata)
+    values = [
+        {mapping.table.__mapper__.attrs[key].columns[0].name: value for key, value in row.items()}
+        for row in rows
+    ]
+    statement = insert(table).values(values)
+    keys = [column.name for column in table.primary_key.columns]
+    statement = statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: statement.excluded[name] for name in values[0] if name not in keys},
+    )
+    await conn.execute(statement)
+
+
+class OutboxReplicator:
+    """Background copier of outbox entities into PostgreSQL, with lag metrics."""
+
+    def __init__(
+        self,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        poll_seconds: float = settings.OUTBOX_POLL_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self._poll_seconds = poll_seconds
+        self._engine: Optional[AsyncEngine] = None
+        self._task: Optional[asyncio.Task] = None
+        self.replicated = 0
+        self.deleted = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_batch_at: Optional[datetime] = None
+        self.pending = 0
+        self.lag_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, engine: AsyncEngine) -> None:
+        """Start replicating in the background."""
+        if not self.running:
+            self._engine = engine
+            self._task = asyncio.create_task(self._run(), name="outbox-replicator")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            processed = 0
+            try:
+                processed = await self.drain_once(self._engine)
+                await self._measure_lag()
+            except Exception as e:
+                logger.error(f"Outbox replication failed: {e}")
+            if processed < self.batch_size:
+                await asyncio.sleep(self._poll_seconds)
+
+    async def _measure_lag(self) -> None:
+        """Pending events and the age of the oldest one."""
+        collection = OutboxEvent.get_motor_collection()
+        self.pending = await collection.count_documents({"pending": True})
+        oldest = await collection.find_one({"pending": True}, sort=[("available_at", 1)], projection={"created_at": 1})
+        self.lag_seconds = (datetime.utcnow() - oldest["created_at"]).total_seconds() if oldest else 0.0
+
+    async def drain_once(self, engine: AsyncEngine) -> int:
+        """
+        Replicate one batch of due events.
+
+        Returns:
+            Number of events handled (0 if another worker holds the lock)
+        """
+        collection = OutboxEvent.get_motor_collection()
+        now = datetime.utcnow()
+        events = await collection.find(
+            {"pending": True, "available_at": {"$lte": now}}
+        ).sort("available_at", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not events:
+            return 0
+
+        ids_by_collection: Dict[str, set] = {}
+        for event in events:
+            ids_by_collection.setdefault(event["collection"], set()).add(event["entity_id"])
+
+        try:
+            async with engine.begin() as conn:
+                locked = (await conn.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REPLICATION_LOCK_KEY}
+                )).scalar()
+                if not locked:
+                    return 0
+                for name, mapping in MAPPINGS.items():
+                    if name in ids_by_collection:
+                        await self._replicate(conn, mapping, ids_by_collection[name])
+        except Exception as e:
+            await self._fail(events, e)
+            raise
+
+        # A coalesced event changed meanwhile stays pending and is replicated again
+        replicated_at = datetime.utcnow()
+        await collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": event["_id"], "revision": event.get("revision")},
+                    {"$set": {"pending": False, "replicated_at": replicated_at}, "$unset": {"last_error": ""}},
+                )
+                for event in events
+            ],
+            ordered=False,
+        )
+        self.batches += 1
+        self.last_batch_at = datetime.utcnow()
+        return len(events)
+
+    async def _replicate(self, conn, mapping: Mapping, entity_ids: set) -> None:
+        """Upsert the entities still in MongoDB and (soft) delete the others."""
+        docs = await mapping.model.get_motor_collection().find({"_id": {"$in": list(entity_ids)}}).to_list(None)
+        soft_delete = issubclass(mapping.table, SoftDeleteMixin)
+        rows = []
+        for doc in docs:
+            row = await mapping.to_row(doc)
+            if row["id"] is None:
+                logger.warning(f"Skipping {mapping.table.__tablename__} entity with non-UUID id {doc['_id']}")
+                continue
+            if soft_delete:
+                # Restored entities become live again
+                row["deleted_at"] = None
+            rows.append(row)
+        if rows:
+            await _upsert(conn, mapping, rows)
+            self.replicated += len(rows)
+
+        missing = [_uuid(i) for i in entity_ids - {doc["_id"] for doc in docs}]
+        missing = [i for i in missing if i is not None]
+        if missing:
+            if soft_delete:
+                await conn.execute(
+                    update(mapping.table)
+                    .where(mapping.table.id.in_(missing), mapping.table.deleted_at.is_(None))
+                    .values(deleted_at=func.now())
+                )
+            else:
+                await conn.execute(delete(mapping.table).where(mapping.table.id.in_(missing)))
+            self.deleted += len(missing)
+
+    async def _fail(self, events: List[Dict[str, Any]], error: Exception) -> None:
+        """Schedule a retry of a failed batch with exponential backoff."""
+        self.failures += 1
+        self.last_error = str(error)
+        attempts = max(event.get("attempts", 0) for event in events) + 1
+        delay = min(2 ** attempts, settings.OUTBOX_MAX_BACKOFF_SECONDS)
+        await OutboxEvent.get_motor_collection().update_many(
+            {"_id": {"$in": [event["_id"] for event in events]}},
+            {
+                "$inc": {"attempts": 1},
+                "$set": {"last_error": str(error)[:500], "available_at": datetime.utcnow() + timedelta(seconds=delay)},
+            },
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pending": self.pending,
+            "lag_seconds": round(self.lag_seconds, 3),
+            "replicated": self.replicated,
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_batch_at": self.last_batch_at.isoformat() + "Z" if self.last_batch_at else None,
+        }
+
+
+async def replay(collection: Optional[str] = None, since: Optional[datetime] = None) -> int:
+    """
+    Mark retained, already replicated events pending again.
+
+    Args:
+        collection: Only events of this collection
+        since: Only events created at or after this time
+
+    Returns:
+        Number of events queued again
+    """
+    query: Dict[str, Any] = {"pending": False}
+    if collection:
+        query["collection"] = collection
+    if since:
+        query["created_at"] = {"$gte": since}
+    result = await OutboxEvent.get_motor_collection().update_many(
+        query,
+        # Replayed events are plain ones, so they never collide with a pending coalesced event
+        {
+            "$set": {"pending": True, "available_at": datetime.utcnow(), "attempts": 0, "coalesced": False},
+            "$unset": {"replicated_at": ""},
+        },
+    )
+    return result.modified_count
+
+
+async def backfill(collection: str, batch_size: int = settings.OUTBOX_BATCH_SIZE) -> int:
+    """Queue every entity of a collection, e.g. ones written before the outbox existed."""
+    if collection not in REPLICATED_COLLECTIONS:
+        raise ValueError(f"{collection} is not replicated")
+    cursor = MAPPINGS[collection].model.get_motor_collection().find({}, projection={"_id": 1}).batch_size(batch_size)
+    queued = 0
+    ids: List[str] = []
+    async for doc in cursor:
+        ids.append(doc["_id"])
+        if len(ids) >= batch_size:
+            queued += await record_outbox(collection, ids)
+            ids = []
+    queued += await record_outbox(collection, ids)
+    return queued
+
+
+# Global replicator started by the application lifespan
+outbox_replicator = OutboxReplicator()
+
+
+async def _main(args: argparse.Namespace) -> int:
+    """Command line entry point."""
+    from app.db.mongodb.client import close_mongodb_client
+    from app.db.mongodb.init_db import init_mongodb
+    from app.db.postgres.session import dispose_engine, get_engine
+
+    await init_mongodb()
+    try:
+        if args.backfill:
+            print(f"Queued {await backfill(args.backfill)} {args.backfill}")
+        if args.replay:
+            since = datetime.fromisoformat(args.since) if args.since else None
+            print(f"Queued {await replay(args.collection, since)} events again")
+        if args.once or args.replay or args.backfill:
+            total = 0
+            while True:
+                processed = await outbox_replicator.drain_once(get_engine())
+                total += processed
+                if processed < outbox_replicator.batch_size:
+                    break
+            print(f"Replicated {total} events")
+        await outbox_replicator._measure_lag()
+        print(outbox_replicator.stats())
+        return 0
+    finally:
+        await dispose_engine()
+        await close_mongodb_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MongoDB to PostgreSQL outbox replication")
+    parser.add_argument("--once", action="store_true", help="replicate all due events, then exit")
+    parser.add_argument("--replay", action="store_true", help="replicate retained events again")
+    parser.add_argument("--since", help="with --replay: only events created since this ISO time")
+    parser.add_argument("--collection", choices=REPLICATED_COLLECTIONS, help="with --replay: only this collection")
+    parser.add_argument("--backfill", choices=REPLICATED_COLLECTIONS, help="queue every entity of a collection")
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -5,13 +5,36 @@ Main FastAPI application module.
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
+from fastapi.responses import JSONResponse
 
 from app.api.api import api_router
+from app.api.middleware.rate_limit import RateLimitMiddleware, rate_limit_registry
+from app.api.middleware.read_your_writes import ReadYourWritesMiddleware
 from app.core.config import settings
-from app.db.mongodb.init_db import init_mongodb
+from app.core.key_vault import key_vault, start_key_cache_sweep
+from app.db.health import dependency_health
+from app.db.init_db import close_db_connections, init_db
+from app.db.mongodb.change_events import change_listener
+from app.db.mongodb.client import connect_mongodb, get_mongodb_pool_stats
+from app.db.mongodb.indexes import index_registry
+from app.db.mongodb.writer import deferred_writer
+from app.db.replication import outbox_replicator
+from app.db.postgres.partitions import start_partition_job
+from app.db.postgres.purge import start_purge_job
+from app.db.postgres.session import (
+    get_engine,
+    get_postgres_pool_stats,
+    is_engine_initialized,
+    start_replica_monitor,
+)
+from app.db.postgres.vector_search import start_background_ensure
+from app.services.analytics.content import start_content_analytics_job
+from app.services.rag.ingestion import ingestion_pipeline
+from app.services.analytics.engagement import start_rollup_job
+from app.services.security.key_rotation import start_reencryption_job
 
 # Configure logging
 logging.basicConfig(
@@ -31,8 +54,57 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting application...")
     
-    # Initialize MongoDB connection
-    await init_mongodb()
+    # Initialize databases concurrently (MongoDB required, others optional)
+    await init_db()
+    dependency_health.start_monitor()
+    
+    # Build missing indexes without delaying startup
+    index_task = None
+    if settings.MONGODB_RECONCILE_INDEXES:
+        database = connect_mongodb()[settings.MONGODB_DB_NAME]
+        index_task = index_registry.start_background_reconcile(database)
+    
+    vector_index_task = None
+    if settings.VECTOR_ENSURE_INDEXES and settings.VECTOR_DB_TYPE == "postgres" and is_engine_initialized():
+        vector_index_task = start_background_ensure(get_engine())
+    
+    # Keep monthly post partitions created ahead and expired ones detached
+    partition_task = start_partition_job(get_engine()) if is_engine_initialized() else None
+    
+    # Hard-delete soft-deleted rows past retention
+    purge_task = start_purge_job(get_engine()) if is_engine_initialized() else None
+    
+    # Track health and lag of read replicas
+    replica_task = start_replica_monitor() if is_engine_initialized() else None
+    
+    # Cross-worker cache invalidation (caches of shared data stay off without it)
+    try:
+        await change_listener.start()
+    except Exception as e:
+        logger.warning(f"Cache invalidation unavailable: {e}")
+    
+    # Background persistence for deferred writes
+    deferred_writer.start()
+    
+    # Staged RAG document ingestion (resumes unfinished documents)
+    if settings.VECTOR_DB_TYPE == "postgres" and is_engine_initialized():
+        ingestion_pipeline.start()
+    
+    # Mirror outbox entities to PostgreSQL
+    if settings.OUTBOX_ENABLED and is_engine_initialized():
+        outbox_replicator.start(get_engine())
+    
+    # Migrate API keys still encrypted with a retired key
+    reencryption_task = start_reencryption_job()
+    
+    # Wipe decrypted API keys once their cache TTL has passed
+    key_sweep_task = start_key_cache_sweep()
+    
+    # Keep engagement rollups current for analytics
+    rollup_task = start_rollup_job()
+    
+    # Keep content analytics aggregates current
+    content_task = start_content_analytics_job(get_engine()) if is_engine_initialized() else None
     
     logger.info("Application startup complete")
     
@@ -40,6 +112,17 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down application...")
+    await deferred_writer.stop()
+    await ingestion_pipeline.stop()
+    await outbox_replicator.stop()
+    await change_listener.stop()
+    await dependency_health.stop_monitor()
+    for task in (index_task, vector_index_task, partition_task, purge_task, replica_task, reencryption_task, key_sweep_task, rollup_task, content_task):
+        if task is not None and not task.done():
+            task.cancel()
+    if key_vault is not None:
+        key_vault.clear()
+    await close_db_connections()
     logger.info("Application shutdown complete")
 
 
@@ -56,6 +139,16 @@ def create_application() -> FastAPI:
         lifespan=lifespan,
     )
     
+    # Per-request read-your-writes scope for replica routing
+    application.add_middleware(ReadYourWritesMiddleware)
+    
+    # Rate limiting (added before CORS so 429 responses carry CORS headers)
+    application.add_middleware(
+        RateLimitMiddleware,
+        registry=rate_limit_registry,
+        prefix=settings.API_V1_STR,
+    )
+    
     # Set CORS middleware
     if settings.BACKEND_CORS_ORIGINS:
         application.add_middleware(
@@ -87,6 +180,54 @@ def create_application() -> FastAPI:
         """
         return {"status": "ok"}
     
+    @application.get("/health/live", tags=["Health"])
+    async def liveness():
+        """
+        Liveness probe: the worker is running and serving requests.
+        """
+        return {"status": "ok"}
+    
+    @application.get("/health/ready", tags=["Health"])
+    async def readiness():
+        """
+        Readiness probe based on cached dependency status.
+        
+        Returns 503 while a required dependency is unhealthy. Optional
+        dependencies are reported but do not affect readiness.
+        """
+        ready = dependency_health.ready
+        return JSONResponse(
+            status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "status": "ready" if ready else "not ready",
+                "dependencies": dependency_health.snapshot(),
+            },
+        )
+    
+    @application.get("/health/pools", tags=["Health"])
+    async def pool_stats():
+        """
+        Connection pool statistics of this worker.
+        """
+        return {
+            "mongodb": get_mongodb_pool_stats(),
+            "postgres": get_postgres_pool_stats(),
+        }
+    
+    @application.get("/health/cache", tags=["Health"])
+    async def cache_stats():
+        """
+        Cache invalidation listener status, lag and cache statistics of this worker.
+        """
+        return change_listener.stats()
+    
+    @application.get("/health/outbox", tags=["Health"])
+    async def outbox_stats():
+        """
+        Outbox replication backlog, lag and counters of this worker.
+        """
+        return outbox_replicator.stats()
+    
     return application
 
 
@@ -2,6 +2,7 @@
 Gemini API service for AI-powered content generation.
 """
 
+import asyncio
 import logging
 import time
 from typing import List, Dict, Any, Optional, Tuple
@@ -100,6 +101,42 @@ class GeminiService:
             logger.error(f"Gemini API error: {str(e)}")
             raise
     
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(Exception),
+    )
+    async def embed_texts(
+        self,
+        texts: List[str],
+        task_type: str = "retrieval_document",
+    ) -> List[List[float]]:
+        """
+        Embed texts with the Gemini embedding model.
+        
+        The client call blocks, so it runs in a thread; concurrent calls
+        then overlap instead of stalling the event loop.
+        
+        Args:
+            texts: Texts to embed (one request)
+            task_type: retrieval_document for stored chunks, retrieval_query for queries
+            
+        Returns:
+            One embedding of GEMINI_EMBEDDING_DIMENSIONS values per text
+        """
+        try:
+            result = await asyncio.to_thread(
+                genai.embed_content,
+                model=settings.GEMINI_EMBEDDING_MODEL,
+                content=texts,
+                task_type=task_type,
+                output_dimensionality=settings.GEMINI_EMBEDDING_DIMENSIONS,
+            )
+            return result["embedding"]
+        except Exception as e:
+            logger.error(f"Gemini embedding error: {str(e)}")
+            raise
+    
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -0,0 +1,273 @@
+"""
+Content analytics: posts per period, AI versus manual share, engagement by tag.
+
+Aggregates of live ``linkedin_posts`` rows are kept in ``content_stats_daily``
+(per user and UTC day) and ``content_tag_stats`` (per user and tag), so
+dashboards read a bounded number of precomputed rows whatever the number
+of posts. A refresh job maintains them incrementally: it reads the posts
+changed since the watermark in ``analytics_watermarks`` (through
+``linkedin_posts_updated_idx``) and recomputes only the days and users
+those posts touch. Posts are re-read CONTENT_ANALYTICS_OVERLAP_SECONDS
+before the watermark, so transactions that committed late are not missed;
+recomputing a group twice gives the same result.
+
+Rebuild everything with::
+
+    python -m app.services.analytics.content --full
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import BigInteger, cast, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.db.postgres.models import AnalyticsWatermarkTable, ContentStatsDailyTable, ContentTagStatsTable
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = "content_stats"
+PERIODS = ("day", "week", "month")
+METRICS = ("likes", "comments", "shares", "impressions", "clicks")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_METRIC_SUMS = ", ".join(
+    f"sum(COALESCE((p.engagement_data->>'{name}')::bigint, 0))" for name in METRICS
+)
+
+# Posts changed in (since, through]
+_CHANGED = "SELECT {columns} FROM linkedin_posts WHERE updated_at > :since AND updated_at <= :through"
+
+_DELETE_DAYS = text(
+    "DELETE FROM content_stats_daily WHERE (user_id, day) IN ("
+    + _CHANGED.format(columns="user_id, created_at::date") + ")"
+)
+
+_INSERT_DAYS = text(
+    "INSERT INTO content_stats_daily"
+    f" (user_id, day, posts, ai_generated, published, {', '.join(METRICS)})"
+    " SELECT p.user_id, c.day, count(*),"
+    " count(*) FILTER (WHERE p.ai_generated), count(*) FILTER (WHERE p.is_published),"
+    f" {_METRIC_SUMS}"
+    " FROM (" + _CHANGED.format(columns="DISTINCT user_id, created_at::date AS day") + ") c"
+    " JOIN linkedin_posts p ON p.user_id = c.user_id"
+    " AND p.created_at >= c.day AND p.created_at < c.day + 1"
+    " WHERE p.deleted_at IS NULL"
+    " GROUP BY p.user_id, c.day"
+)
+
+_DELETE_TAGS = text(
+    "DELETE FROM content_tag_stats WHERE user_id IN (" + _CHANGED.format(columns="user_id") + ")"
+)
+
+_INSERT_TAGS = text(
+    f"INSERT INTO content_tag_stats (user_id, tag, posts, {', '.join(METRICS)})"
+    f" SELECT p.user_id, t.tag, count(*), {_METRIC_SUMS}"
+    " FROM linkedin_posts p CROSS JOIN LATERAL (SELECT DISTINCT unnest(p.tags) AS tag) t"
+    " WHERE p.deleted_at IS NULL"
+    " AND p.user_id IN (" + _CHANGED.format(columns="user_id") + ")"
+    " GROUP BY p.user_id, t.tag"
+)
+
+
+async def refresh_content_stats(engine: AsyncEngine, full: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Fold posts changed since the watermark into the aggregates.
+
+    Runs in one transaction holding the watermark row, so concurrent
+    refreshes of other workers skip instead of repeating the work.
+
+    Args:
+        engine: Engine of the primary
+        full: Recompute from all posts instead of the changed ones
+
+    Returns:
+        Processed range and refreshed groups, or None if another worker is refreshing
+    """
+    async with engine.begin() as conn:
+        # Days of created_at are UTC days
+        await conn.execute(text("SET LOCAL timezone = 'UTC'"))
+        await conn.execute(
+            text(
+                "INSERT INTO analytics_watermarks (name, processed_through) VALUES (:name, :epoch) "
+                "ON CONFLICT (name) DO NOTHING"
+            ),
+            {"name": WATERMARK, "epoch": _EPOCH},
+        )
+        watermark = (await conn.execute(
+            text("SELECT processed_through FROM analytics_watermarks WHERE name = :name FOR UPDATE SKIP LOCKED"),
+            {"name": WATERMARK},
+        )).scalar()
+        if watermark is None:
+            return None
+
+        since = _EPOCH if full else watermark - timedelta(seconds=settings.CONTENT_ANALYTICS_OVERLAP_SECONDS)
+        through = (await conn.execute(
+            text("SELECT max(updated_at) FROM linkedin_posts WHERE updated_at > :since"),
+            {"since": since},
+        )).scalar()
+
+        refreshed = {"days": 0, "tags": 0}
+        if through is not None:
+            params = {"since": since, "through": through}
+            await conn.execute(_DELETE_DAYS, params)
+            refreshed["days"] = (await conn.execute(_INSERT_DAYS, params)).rowcount
+            await conn.execute(_DELETE_TAGS, params)
+            refreshed["tags"] = (await conn.execute(_INSERT_TAGS, params)).rowcount
+
+        watermark = (await conn.execute(
+            text(
+                "UPDATE analytics_watermarks "
+                "SET processed_through = GREATEST(processed_through, COALESCE(:through, processed_through)), "
+                "refreshed_at = now() WHERE name = :name RETURNING processed_through"
+            ),
+            {"name": WATERMARK, "through": through},
+        )).scalar()
+
+    if refreshed["days"] or refreshed["tags"]:
+        logger.info(f"Content analytics refreshed through {watermark}: {refreshed}")
+    return {"since": since, "through": watermark, **refreshed}
+
+
+def start_content_analytics_job(
+    engine: AsyncEngine,
+    interval: int = settings.CONTENT_ANALYTICS_INTERVAL_SECONDS,
+) -> asyncio.Task:
+    """Refresh content analytics in the background every ``interval`` seconds."""
+
+    async def run():
+        while True:
+            try:
+                await refresh_content_stats(engine)
+            except Exception as e:
+                logger.error(f"Content analytics refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+    return asyncio.create_task(run(), name="content-analytics")
+
+
+def _user_uuid(user_id: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(user_id))
+    except ValueError:
+        return None
+
+
+async def get_refreshed_through(session: AsyncSession) -> Optional[datetime]:
+    """Time up to which post changes are reflected in the aggregates."""
+    return (await session.execute(
+        select(AnalyticsWatermarkTable.processed_through).where(AnalyticsWatermarkTable.name == WATERMARK)
+    )).scalar()
+
+
+async def get_content_stats(
+    session: AsyncSession,
+    user_id: str,
+    period: str,
+    start: date,
+    end: date,
+) -> Dict[str, Any]:
+    """
+    Posts, AI-generated share and engagement of a user per period.
+
+    Args:
+        session: Database session (read replicas are fine)
+        user_id: User ID
+        period: day, week or month
+        start: First day (inclusive)
+        end: Last day (exclusive)
+
+    Returns:
+        Buckets in time order and totals over the range
+    """
+    user = _user_uuid(user_id)
+    if user is None:
+        return {"data": [], "totals": _with_share({key: 0 for key in ("posts", "ai_generated", "published") + METRICS})}
+
+    stats = ContentStatsDailyTable
+    bucket = func.date_trunc(period, stats.day).label("bucket_start")
+    # sum() of bigint is numeric in PostgreSQL; keep integers
+    sums = [
+        cast(func.sum(getattr(stats, name)), BigInteger).label(name)
+        for name in ("posts", "ai_generated", "published") + METRICS
+    ]
+    rows = (await session.execute(
+        select(bucket, *sums)
+        .where(stats.user_id == user, stats.day >= start, stats.day < end)
+        .group_by(bucket)
+        .order_by(bucket)
+    )).mappings().all()
+
+    data = [_with_share({key: value for key, value in row.items()}) for row in rows]
+    totals = {
+        key: sum(point[key] or 0 for point in data)
+        for key in ("posts", "ai_generated", "published") + METRICS
+    }
+    return {"data": data, "totals": _with_share(totals)}
+
+
+def _with_share(point: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the AI-generated share of posts to an aggregate."""
+    posts = point.get("posts") or 0
+    point["ai_share"] = round((point.get("ai_generated") or 0) / posts, 4) if posts else 0.0
+    return point
+
+
+async def get_tag_stats(
+    session: AsyncSession,
+    user_id: str,
+    sort: str = "impressions",
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Engagement of a user's posts per tag.
+
+    Args:
+        session: Database session (read replicas are fine)
+        user_id: User ID
+        sort: posts or an engagement metric, in descending order
+        limit: Number of tags
+
+    Returns:
+        Tags with their post counts and summed engagement
+    """
+    user = _user_uuid(user_id)
+    if user is None:
+        return []
+    tags = ContentTagStatsTable
+    rows = (await session.execute(
+        select(tags.tag, tags.posts, *[getattr(tags, name) for name in METRICS])
+        .where(tags.user_id == user)
+        .order_by(getattr(tags, sort).desc(), tags.tag)
+        .limit(limit)
+    )).mappings().all()
+    return [dict(row) for row in rows]
+
+
+async def _main(args: argparse.Namespace) -> int:
+    """Command line entry point."""
+    from app.db.postgres.session import dispose_engine, get_engine
+
+    try:
+        result = await refresh_content_stats(get_engine(), full=args.full)
+        if result is None:
+            print("Another worker is refreshing")
+            return 1
+        print(f"Refreshed {result['days']} day and {result['tags']} tag aggregates through {result['through']}")
+        return 0
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Content analytics refresh")
+    parser.add_argument("--full", action="store_true", help="recompute from all posts")
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
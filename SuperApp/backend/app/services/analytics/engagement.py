@@ -0,0 +1,329 @@
+"""
+Engagement history: snapshot ingestion, rollups and analytics queries.
+
+Snapshots of post engagement totals go to the ``engagement_snapshots``
+time-series collection. Aggregation pipelines fold them into hourly, then
+daily ``engagement_rollups`` with ``$merge``, and analytics read only the
+rollups. Recent buckets are recomputed on a schedule, by one worker at a
+time holding a lease in ``job_leases``, so late snapshots are picked up; older ones can be rebuilt with::
+
+    python -m app.services.analytics.engagement --backfill-days 30
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.db.mongodb.atomic import AtomicBatch, add_engagement_totals, sync_engagement
+from app.db.mongodb.models import EngagementMetrics, EngagementRollup, EngagementSnapshot
+
+logger = logging.getLogger(__name__)
+
+METRICS = list(EngagementMetrics.__fields__)
+PERIODS = ("hour", "day")
+
+ROLLUP_LEASE = "engagement_rollups"
+
+# Identifies this process as a lease holder
+_LEASE_OWNER = uuid.uuid4().hex
+
+
+def naive_utc(moment: datetime) -> datetime:
+    """Convert a timezone-aware datetime to naive UTC, as stored and compared everywhere."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _truncate(moment: datetime, period: str) -> datetime:
+    """Start of the hour or day containing ``moment``."""
+    if period == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+async def ingest_snapshots(snapshots: Sequence[EngagementSnapshot]) -> int:
+    """
+    Store engagement snapshots and update the posts' current totals.
+
+    Snapshots are written with unordered ``insert_many`` in batches of
+    ENGAGEMENT_INGEST_BATCH_SIZE; each post's ``engagement_stats`` is
+    raised to its latest totals with one bulk ``$max`` per batch.
+
+    Args:
+        snapshots: Snapshots to store
+
+    Returns:
+        Number of snapshots stored
+    """
+    collection = EngagementSnapshot.get_motor_collection()
+    batch_size = settings.ENGAGEMENT_INGEST_BATCH_SIZE
+    stored = 0
+
+    for start in range(0, len(snapshots), batch_size):
+        batch = snapshots[start:start + batch_size]
+        for snapshot in batch:
+            snapshot.timestamp = naive_utc(snapshot.timestamp)
+        result = await collection.insert_many(
+            [s.dict(exclude={"id", "revision_id"}) for s in batch],
+            ordered=False,
+        )
+        stored += len(result.inserted_ids)
+
+        latest: Dict[str, EngagementSnapshot] = {}
+        for snapshot in batch:
+            current = latest.get(snapshot.meta.post_id)
+            if current is None or snapshot.timestamp >= current.timestamp:
+                latest[snapshot.meta.post_id] = snapshot
+        totals = AtomicBatch()
+        for post_id, snapshot in latest.items():
+            add_engagement_totals(totals, post_id, **snapshot.metrics.dict())
+        results = await totals.execute()
+        matched = sum(m for m, _ in results.values())
+        if matched < len(latest):
+            # Some posts still store null stats; $max is idempotent, so
+            # repeating it for every post of the batch is safe
+            for post_id, snapshot in latest.items():
+                await sync_engagement(post_id, **snapshot.metrics.dict())
+
+    return stored
+
+
+def _metric_accumulators(source: str, op: str) -> Dict[str, Dict[str, str]]:
+    return {name: {op: f"${source}.{name}"} for name in METRICS}
+
+
+def _rollup_stages(period: str) -> List[Dict[str, Any]]:
+    """Stages writing grouped buckets into the rollup collection."""
+    return [
+        {"$project": {
+            "_id": {"$concat": [
+                "$_id.post_id",
+                f":{period}:",
+                {"$dateToString": {"date": "$_id.bucket_start", "format": "%Y-%m-%dT%H:%M:%SZ"}},
+            ]},
+            "post_id": "$_id.post_id",
+            "user_id": "$_id.user_id",
+            "period": {"$literal": period},
+            "bucket_start": "$_id.bucket_start",
+            "metrics": {name: f"${name}" for name in METRICS},
+            "samples": "$samples",
+            "updated_at": "$$NOW",
+        }},
+        {"$merge": {
+            "into": EngagementRollup.get_motor_collection().name,
+            "on": "_id",
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+
+async def rollup_hours(start: datetime, end: datetime) -> None:
+    """Recompute hourly rollups of snapshots taken in [start, end)."""
+    pipeline = [
+        {"$match": {"timestamp": {"$gte": _truncate(start, "hour"), "$lt": end}}},
+        {"$group": {
+            "_id": {
+                "post_id": "$meta.post_id",
+                "user_id": "$meta.user_id",
+                "bucket_start": {"$dateTrunc": {"date": "$timestamp", "unit": "hour"}},
+            },
+            **_metric_accumulators("metrics", "$max"),
+            "samples": {"$sum": 1},
+        }},
+        *_rollup_stages("hour"),
+    ]
+    await EngagementSnapshot.get_motor_collection().aggregate(pipeline).to_list(None)
+
+
+async def rollup_days(start: datetime, end: datetime) -> None:
+    """Recompute daily rollups from the hourly rollups in [start, end)."""
+    pipeline = [
+        {"$match": {
+            "period": "hour",
+            "bucket_start": {"$gte": _truncate(start, "day"), "$lt": end},
+        }},
+        {"$group": {
+            "_id": {
+                "post_id": "$post_id",
+                "user_id": "$user_id",
+                "bucket_start": {"$dateTrunc": {"date": "$bucket_start", "unit": "day"}},
+            },
+            **_metric_accumulators("metrics", "$max"),
+            "samples": {"$sum": "$samples"},
+        }},
+        *_rollup_stages("day"),
+    ]
+    await EngagementRollup.get_motor_collection().aggregate(pipeline).to_list(None)
+
+
+async def refresh_rollups(lookback: timedelta = timedelta(hours=2), now: Optional[datetime] = None) -> None:
+    """
+    Recompute the rollups that recent snapshots can still change.
+
+    Args:
+        lookback: How far back late snapshots are expected
+        now: Current time (defaults to utcnow)
+    """
+    now = now or datetime.utcnow()
+    start = now - lookback
+    await rollup_hours(start, now)
+    await rollup_days(start, now)
+
+
+async def acquire_lease(name: str, seconds: int, owner: str = _LEASE_OWNER) -> bool:
+    """
+    Take or renew a lease on a background job.
+
+    The holder renews the lease on every run; another worker takes it
+    over only once it has expired, i.e. the holder stopped running.
+
+    Args:
+        name: Job name
+        seconds: Lease duration
+        owner: Lease holder (default: this process)
+
+    Returns:
+        Whether ``owner`` holds the lease
+    """
+    now = datetime.utcnow()
+    leases = EngagementRollup.get_motor_collection().database["job_leases"]
+    try:
+        await leases.update_one(
+            {"_id": name, "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=seconds)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Held by a live worker: the filter missed and the upsert collided with it
+        return False
+    return True
+
+
+def start_rollup_job(interval: int = settings.ENGAGEMENT_ROLLUP_INTERVAL_SECONDS) -> asyncio.Task:
+    """Refresh rollups in the background every ``interval`` seconds, in one worker at a time."""
+
+    async def run():
+        while True:
+            try:
+                if await acquire_lease(ROLLUP_LEASE, seconds=interval * 3):
+                    await refresh_rollups()
+            except Exception as e:
+                logger.error(f"Engagement rollup failed: {e}")
+            await asyncio.sleep(interval)
+
+    return asyncio.create_task(run(), name="engagement-rollups")
+
+
+def _gains(series: List[Dict[str, Any]], previous: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add per-bucket gains, relative to the previous bucket, to a series."""
+    result = []
+    for point in series:
+        base = previous["metrics"] if previous else {}
+        result.append({
+            "bucket_start": point["bucket_start"],
+            "metrics": point["metrics"],
+            "gained": {name: point["metrics"].get(name, 0) - base.get(name, 0) for name in METRICS},
+            "samples": point.get("samples", 0),
+        })
+        previous = point
+    return result
+
+
+async def get_post_engagement(
+    post_id: str,
+    period: str,
+    start: datetime,
+    end: datetime,
+) -> List[Dict[str, Any]]:
+    """
+    Engagement series of one post from its rollups.
+
+    Args:
+        post_id: LinkedIn post ID
+        period: hour or day
+        start: First bucket (inclusive)
+        end: Last bucket (exclusive)
+
+    Returns:
+        Buckets in time order with totals and gains since the previous bucket
+    """
+    collection = EngagementRollup.get_motor_collection()
+    projection = {"_id": 0, "bucket_start": 1, "metrics": 1, "samples": 1}
+    series = await collection.find(
+        {"post_id": post_id, "period": period, "bucket_start": {"$gte": start, "$lt": end}},
+        projection,
+    ).sort("bucket_start", ASCENDING).to_list(None)
+    previous = await collection.find_one(
+        {"post_id": post_id, "period": period, "bucket_start": {"$lt": start}},
+        projection,
+        sort=[("bucket_start", DESCENDING)],
+    )
+    return _gains(series, previous)
+
+
+async def get_user_engagement(
+    user_id: str,
+    period: str,
+    start: datetime,
+    end: datetime,
+) -> List[Dict[str, Any]]:
+    """
+    Engagement of all of a user's posts per bucket, from rollups.
+
+    Args:
+        user_id: User ID
+        period: hour or day
+        start: First bucket (inclusive)
+        end: Last bucket (exclusive)
+
+    Returns:
+        Buckets in time order with summed totals of the posts reported in
+        each bucket and the number of those posts
+    """
+    pipeline = [
+        {"$match": {"user_id": user_id, "period": period, "bucket_start": {"$gte": start, "$lt": end}}},
+        {"$group": {
+            "_id": "$bucket_start",
+            **_metric_accumulators("metrics", "$sum"),
+            "posts": {"$sum": 1},
+        }},
+        {"$sort": {"_id": 1}},
+        {"$project": {
+            "_id": 0,
+            "bucket_start": "$_id",
+            "metrics": {name: f"${name}" for name in METRICS},
+            "posts": 1,
+        }},
+    ]
+    return await EngagementRollup.get_motor_collection().aggregate(pipeline).to_list(None)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    """Command line entry point."""
+    from app.db.mongodb.client import close_mongodb_client
+    from app.db.mongodb.init_db import init_mongodb
+
+    await init_mongodb()
+    try:
+        await refresh_rollups(lookback=timedelta(days=args.backfill_days))
+        print(f"Rebuilt engagement rollups for the last {args.backfill_days} days")
+        return 0
+    finally:
+        await close_mongodb_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Engagement rollup maintenance")
+    parser.add_argument("--backfill-days", type=int, default=1)
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,579 @@
+"""
+Staged ingestion of RAG documents: parse -> chunk -> embed -> store.
+
+Each document runs through four concurrent stages connected by queues of
+RAG_STAGE_QUEUE_SIZE items:
+
+- parse decodes the GridFS body piece by piece (UTF-8 text)
+- chunk splits the text stream into overlapping chunks and batches them
+- embed calls the embedding model with RAG_EMBED_CONCURRENCY requests in flight
+- store writes chunks to MongoDB and chunks with embeddings to PostgreSQL
+  (binary COPY, see ``ChunkIngestor.write_chunks``)
+
+A full queue blocks the stage feeding it, so a slow embedding API or
+database slows parsing down instead of letting text pile up: neither the
+whole body nor all embeddings of a large document are ever in memory.
+Every stage counts items, busy time and time blocked on its output queue
+(backpressure); ``IngestionPipeline.stats`` reports them.
+
+Progress is saved on the document (``Document.ingestion``) after every
+store batch as the number of chunks stored without gaps. Chunking is
+deterministic and chunk ids derive from the document id and chunk index,
+so an interrupted ingestion resumes where it stopped: earlier chunks are
+re-chunked but not embedded or stored again. Documents still pending or
+running are picked up again when the pipeline starts; ``is_processed`` is
+set once every chunk is stored. A running ingestion refreshes its
+heartbeat with every batch; a document is claimed atomically, so another
+worker only takes it over once the heartbeat is LEASE_SECONDS old.
+
+A failed run leaves the document pending and retries it after
+RAG_INGEST_RETRY_SECONDS (doubling per attempt); after
+RAG_INGEST_MAX_ATTEMPTS failed runs it is marked failed.
+"""
+
+import asyncio
+import codecs
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.db.mongodb.document_store import delete_chunks, save_chunk_batch, stream_content
+from app.db.mongodb.models import Document, IngestionProgress, User
+from app.db.mongodb.outbox import write_with_outbox
+from app.db.postgres.bulk_ingest import ChunkIngestor
+from app.db.postgres.session import get_engine
+from app.services.ai.gemini_service import GeminiService
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("parse", "chunk", "embed", "store")
+
+# Chunk ids are uuid5(CHUNK_NAMESPACE, "<document_id>:<index>"), stable across runs
+CHUNK_NAMESPACE = uuid.UUID("9f1c6f5e-4b8a-4d3e-a7c2-5e0b9d8f7a61")
+
+# A running ingestion without progress for this long is taken over
+LEASE_SECONDS = 600
+
+# End of a stage's output
+_DONE = None
+
+
+def chunk_id(document_id: str, index: int) -> uuid.UUID:
+    """PostgreSQL id of a document's chunk."""
+    return uuid.uuid5(CHUNK_NAMESPACE, f"{document_id}:{index}")
+
+
+class TextChunker:
+    """
+    Splits streamed text into chunks of at most ``size`` characters.
+
+    Consecutive chunks overlap by ``overlap`` characters and end on
+    whitespace where possible. Only a chunk's worth of text is buffered
+    beyond what has been fed, and the result does not depend on how the
+    text was split into pieces.
+    """
+
+    def __init__(self, size: int, overlap: int):
+        if not 0 <= overlap < size:
+            raise ValueError(f"Chunk overlap {overlap} must be smaller than chunk size {size}")
+        self.size = size
+        self.overlap = overlap
+        self._buffer = ""
+        self._offset = 0  # Position of the buffer in the whole text
+        self._emitted_to = 0  # End of the last chunk in the whole text
+
+    def _boundary(self, pos: int) -> int:
+        """End of the chunk starting at ``pos``: the last whitespace in its second half."""
+        window_end = pos + self.size
+        space = max(self._buffer.rfind(c, pos + self.size // 2, window_end) for c in (" ", "\n"))
+        return space + 1 if space >= 0 else window_end
+
+    def feed(self, text: str) -> List[Tuple[int, int, str]]:
+        """Add text; returns the chunks it completes as (start, end, content)."""
+        self._buffer += text
+        chunks = []
+        pos = 0
+        # A chunk is final once text beyond its largest possible end has arrived
+        while len(self._buffer) - pos > self.size:
+            end = self._boundary(pos)
+            chunks.append((self._offset + pos, self._offset + end, self._buffer[pos:end]))
+            self._emitted_to = self._offset + end
+            pos = max(end - self.overlap, pos + 1)
+        self._buffer = self._buffer[pos:]
+        self._offset += pos
+        return chunks
+
+    def finish(self) -> List[Tuple[int, int, str]]:
+        """Chunk of the text left after the last full chunk, if any."""
+        end = self._offset + len(self._buffer)
+        if end <= self._emitted_to or not self._buffer:
+            return []
+        self._emitted_to = end
+        return [(self._offset, end, self._buffer)]
+
+
+class StageMetrics:
+    """Counters of one pipeline stage, across documents."""
+
+    def __init__(self, name: str, concurrency: int = 1):
+        self.name = name
+        self.concurrency = concurrency
+        self.items = 0
+        self.errors = 0
+        self.active = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.inputs: Set[asyncio.Queue] = set()
+
+    @contextmanager
+    def busy(self) -> Iterator[None]:
+        """Time work done by the stage."""
+        start = time.perf_counter()
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.busy_seconds += time.perf_counter() - start
+
+    async def put(self, queue: asyncio.Queue, item: Any) -> None:
+        """Hand an item downstream, timing how long backpressure blocks it."""
+        start = time.perf_counter()
+        await queue.put(item)
+        self.blocked_seconds += time.perf_counter() - start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "queued": sum(queue.qsize() for queue in self.inputs),
+            "items": self.items,
+            "errors": self.errors,
+            "busy_sec": round(self.busy_seconds, 3),
+            "blocked_sec": round(self.blocked_seconds, 3),
+            "items_per_busy_sec": round(self.items / self.busy_seconds, 1) if self.busy_seconds else 0.0,
+        }
+
+
+class _Run:
+    """State of one document's ingestion."""
+
+    def __init__(self, document: Document, progress: IngestionProgress, embedder: GeminiService):
+        self.document = document
+        self.progress = progress
+        self.embedder = embedder
+        self.resume_from = progress.chunks_stored
+        self.total = 0
+        self.stored: Set[int] = set()
+        self.row = {
+            "id": uuid.UUID(document.id),
+            "user_id": uuid.UUID(document.user_id),
+            "title": document.title,
+            "is_public": document.is_public,
+        }
+
+
+async def _run_stages(stages: List[Awaitable[None]]) -> None:
+    """Run stages concurrently; the first failure cancels the others and is raised."""
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _save_progress(document: Document, progress: IngestionProgress) -> None:
+    """Persist progress without a full document save (progress is not replicated)."""
+    progress.heartbeat_at = datetime.utcnow()
+    await Document.get_motor_collection().update_one(
+        {"_id": document.id}, {"$set": {"ingestion": progress.dict()}}
+    )
+
+
+async def _claim(document: Document, progress: IngestionProgress) -> bool:
+    """Mark a document running unless another live ingestion holds it."""
+    progress.heartbeat_at = datetime.utcnow()
+    stale = progress.heartbeat_at - timedelta(seconds=LEASE_SECONDS)
+    result = await Document.get_motor_collection().update_one(
+        {
+            "_id": document.id,
+            "$or": [{"ingestion.status": {"$ne": "running"}}, {"ingestion.heartbeat_at": {"$lt": stale}}],
+        },
+        {"$set": {"ingestion": progress.dict()}},
+    )
+    return result.modified_count == 1
+
+
+class IngestionPipeline:
+    """
+    Background ingestion of RAG documents through the staged pipeline.
+
+    Up to RAG_INGEST_CONCURRENCY documents are ingested at once; submitted
+    documents wait in a bounded queue. ``ingest`` runs one document inline.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = settings.RAG_INGEST_CONCURRENCY,
+        queue_size: int = settings.RAG_STAGE_QUEUE_SIZE,
+        embed_concurrency: int = settings.RAG_EMBED_CONCURRENCY,
+    ):
+        self._concurrency = concurrency
+        self._queue_size = queue_size
+        self._embed_concurrency = embed_concurrency
+        self._documents: "asyncio.Queue[Tuple[str, Optional[GeminiService], bool]]" = asyncio.Queue(
+            maxsize=concurrency * 8
+        )
+        self._workers: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+        self.metrics = {
+            "parse": StageMetrics("parse"),
+            "chunk": StageMetrics("chunk"),
+            "embed": StageMetrics("embed", embed_concurrency),
+            "store": StageMetrics("store"),
+        }
+        self.active_documents = 0
+        self.documents_done = 0
+        self.documents_failed = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the background workers are running."""
+        return any(not worker.done() for worker in self._workers)
+
+    def start(self) -> None:
+        """Start the workers and queue documents left pending or running."""
+        if self.running:
+            return
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"rag-ingestion-{number}")
+            for number in range(self._concurrency)
+        ]
+        self._workers.append(asyncio.create_task(self.resume_pending(), name="rag-ingestion-resume"))
+
+    async def stop(self) -> None:
+        """Stop the workers; interrupted documents resume on the next start."""
+        tasks = self._workers + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._retries.clear()
+
+    async def submit(
+        self,
+        document_id: str,
+        embedder: Optional[GeminiService] = None,
+        restart: bool = False,
+        inline: bool = True,
+    ) -> bool:
+        """
+        Queue a document for ingestion (waits while the queue is full).
+
+        When the workers are not running, ingests inline (e.g. in scripts)
+        or, without ``inline``, leaves the document for the next start.
+
+        Returns:
+            Whether the document was queued or ingested
+        """
+        if not self.running:
+            if not inline:
+                return False
+            await self.ingest(document_id, embedder, restart)
+            return True
+        await self._documents.put((document_id, embedder, restart))
+        return True
+
+    def _retry_later(self, document_id: str, embedder: Optional[GeminiService], attempts: int) -> None:
+        """Queue a document again after a backoff, while the workers run."""
+        async def retry():
+            await asyncio.sleep(settings.RAG_INGEST_RETRY_SECONDS * 2 ** (attempts - 1))
+            await self.submit(document_id, embedder, inline=False)
+
+        task = asyncio.create_task(retry(), name=f"rag-ingestion-retry-{document_id}")
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def resume_pending(self) -> int:
+        """Queue documents whose ingestion has not finished; returns how many."""
+        stale = datetime.utcnow() - timedelta(seconds=LEASE_SECONDS)
+        cursor = Document.get_motor_collection().find(
+            {
+                "is_processed": False,
+                "$or": [
+                    {"ingestion.status": "pending"},
+                    {"ingestion.status": "running", "ingestion.heartbeat_at": {"$lt": stale}},
+                ],
+            },
+            {"_id": 1},
+        )
+        resumed = 0
+        async for raw in cursor:
+            await self.submit(raw["_id"])
+            resumed += 1
+        if resumed:
+            logger.info(f"Resuming ingestion of {resumed} documents")
+        return resumed
+
+    async def _work(self) -> None:
+        while True:
+            document_id, embedder, restart = await self._documents.get()
+            try:
+                await self.ingest(document_id, embedder, restart)
+            except Exception as e:
+                logger.error(f"Ingestion of document {document_id} failed: {e}")
+            finally:
+                self._documents.task_done()
+
+    async def _embedder_for(self, document: Document) -> GeminiService:
+        """Embedding client with the owner's API key, or the default one."""
+        user = await User.get(document.user_id)
+        api_key = getattr(user.settings, "gemini_api_key", None) if user and user.settings else None
+        return GeminiService(api_key=api_key or settings.GEMINI_API_KEY)
+
+    async def ingest(
+        self,
+        document_id: str,
+        embedder: Optional[GeminiService] = None,
+        restart: bool = False,
+    ) -> IngestionProgress:
+        """
+        Ingest one document, resuming an interrupted run.
+
+        Args:
+            document_id: Document to ingest
+            embedder: Embedding client (default: one with the owner's key)
+            restart: Start over even if earlier progress could be reused
+
+        Returns:
+            Final progress of the document (its current progress if
+            another worker is ingesting it)
+
+        Raises:
+            ValueError: If the document does not exist
+        """
+        if settings.VECTOR_DB_TYPE != "postgres":
+            raise RuntimeError(f"RAG ingestion stores embeddings in PostgreSQL, not {settings.VECTOR_DB_TYPE}")
+        document = await Document.get(document_id)
+        if document is None:
+            raise ValueError(f"Document {document_id} not found")
+
+        progress = document.ingestion or IngestionProgress()
+        resumable = (
+            not restart
+            and progress.status != "done"
+            and progress.chunk_size == settings.RAG_CHUNK_SIZE
+            and progress.chunk_overlap == settings.RAG_CHUNK_OVERLAP
+        )
+        if not resumable:
+            progress = IngestionProgress(chunk_size=settings.RAG_CHUNK_SIZE, chunk_overlap=settings.RAG_CHUNK_OVERLAP)
+        progress.status = "running"
+        progress.error = None
+        progress.started_at = datetime.utcnow()
+        progress.finished_at = None
+        if not await _claim(document, progress):
+            logger.info(f"Document {document.id} is being ingested elsewhere")
+            return document.ingestion
+
+        self.active_documents += 1
+        try:
+            run = _Run(document, progress, embedder or await self._embedder_for(document))
+            async with ChunkIngestor(get_engine()) as ingestor:
+                if run.resume_from == 0:
+                    await delete_chunks(document.id)
+                    await ingestor.delete_chunks(run.row["id"], run.row["user_id"])
+                await self._run_document(run, ingestor)
+            await delete_chunks(document.id, from_index=run.total)
+        except asyncio.CancelledError:
+            # Shutdown: let the next start resume it right away
+            progress.status = "pending"
+            await asyncio.shield(_save_progress(document, progress))
+            raise
+        except Exception as e:
+            progress.attempts += 1
+            progress.error = str(e)
+            progress.finished_at = datetime.utcnow()
+            if progress.attempts < settings.RAG_INGEST_MAX_ATTEMPTS:
+                # Most failures are transient (embedding API, database): try again later
+                progress.status = "pending"
+                if self.running:
+                    self._retry_later(document.id, embedder, progress.attempts)
+            else:
+                self.documents_failed += 1
+                progress.status = "failed"
+            await _save_progress(document, progress)
+            raise
+        finally:
+            self.active_documents -= 1
+
+        progress.status = "done"
+        progress.finished_at = datetime.utcnow()
+        document.ingestion = progress
+        document.chunk_count = run.total
+        document.is_processed = True
+        document.updated_at = datetime.utcnow()
+        await write_with_outbox(lambda session: document.save(session=session), "documents", [document.id])
+        self.documents_done += 1
+        logger.info(f"Ingested document {document.id}: {run.total} chunks ({run.resume_from} from a previous run)")
+        return progress
+
+    async def _run_document(self, run: _Run, ingestor: ChunkIngestor) -> None:
+        """Connect the stages with bounded queues and run them to completion."""
+        parsed: asyncio.Queue = asyncio.Queue(self._queue_size)
+        chunked: asyncio.Queue = asyncio.Queue(self._queue_size)
+        embedded: asyncio.Queue = asyncio.Queue(self._queue_size)
+        inputs = {"chunk": parsed, "embed": chunked, "store": embedded}
+        for stage, queue in inputs.items():
+            self.metrics[stage].inputs.add(queue)
+        try:
+            await _run_stages([
+                self._stage("parse", self._parse(run, parsed)),
+                self._stage("chunk", self._chunk(run, parsed, chunked)),
+                self._stage("embed", self._embed(run, chunked, embedded)),
+                self._stage("store", self._store(run, embedded, ingestor)),
+            ])
+        finally:
+            for stage, queue in inputs.items():
+                self.metrics[stage].inputs.discard(queue)
+
+    async def _stage(self, name: str, stage: Awaitable[None]) -> None:
+        """Run a stage, counting its failures."""
+        try:
+            await stage
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.metrics[name].errors += 1
+            raise
+
+    async def _parse(self, run: _Run, out: asyncio.Queue) -> None:
+        """Stream the body and decode it into text pieces."""
+        metrics = self.metrics["parse"]
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pieces = stream_content(run.document).__aiter__()
+        while True:
+            with metrics.busy():
+                try:
+                    piece = await pieces.__anext__()
+                except StopAsyncIteration:
+                    piece = None
+                text = decoder.decode(piece or b"", final=piece is None)
+            if text:
+                metrics.items += 1
+                await metrics.put(out, text)
+            if piece is None:
+                break
+        await out.put(_DONE)
+
+    async def _chunk(self, run: _Run, source: asyncio.Queue, out: asyncio.Queue) -> None:
+        """Split text into chunks, skip those already stored and batch the rest."""
+        metrics = self.metrics["chunk"]
+        chunker = TextChunker(run.progress.chunk_size, run.progress.chunk_overlap)
+        batch: List[Dict[str, Any]] = []
+        while True:
+            text = await source.get()
+            with metrics.busy():
+                pieces = chunker.feed(text) if text is not _DONE else chunker.finish()
+            for start, end, content in pieces:
+                if not content.strip():
+                    continue
+                index = run.total
+                run.total += 1
+                metrics.items += 1
+                if index < run.resume_from:
+                    continue
+                batch.append({
+                    "index": index,
+                    "id": chunk_id(run.document.id, index),
+                    "content": content,
+                    "start_idx": start,
+                    "end_idx": end,
+                })
+                if len(batch) >= settings.RAG_EMBED_BATCH_SIZE:
+                    await metrics.put(out, batch)
+                    batch = []
+            if text is _DONE:
+                break
+        if batch:
+            await metrics.put(out, batch)
+        await out.put(_DONE)
+
+    async def _embed(self, run: _Run, source: asyncio.Queue, out: asyncio.Queue) -> None:
+        """Embed chunk batches with several requests in flight."""
+        metrics = self.metrics["embed"]
+
+        async def worker():
+            while True:
+                batch = await source.get()
+                if batch is _DONE:
+                    # Let the other workers see the end too
+                    await source.put(_DONE)
+                    return
+                with metrics.busy():
+                    vectors = await run.embedder.embed_texts([chunk["content"] for chunk in batch])
+                for chunk, vector in zip(batch, vectors):
+                    chunk["embedding"] = vector
+                metrics.items += len(batch)
+                await metrics.put(out, batch)
+
+        await asyncio.gather(*(worker() for _ in range(self._embed_concurrency)))
+        await out.put(_DONE)
+
+    async def _store(self, run: _Run, source: asyncio.Queue, ingestor: ChunkIngestor) -> None:
+        """Write embedded chunks in batches and advance the saved progress."""
+        metrics = self.metrics["store"]
+        pending: List[Dict[str, Any]] = []
+        while True:
+            batch = await source.get()
+            if batch is not _DONE:
+                pending.extend(batch)
+            if pending and (batch is _DONE or len(pending) >= settings.RAG_STORE_BATCH_SIZE):
+                with metrics.busy():
+                    await self._write(run, pending, ingestor)
+                metrics.items += len(pending)
+                pending = []
+            if batch is _DONE:
+                return
+
+    async def _write(self, run: _Run, chunks: List[Dict[str, Any]], ingestor: ChunkIngestor) -> None:
+        await ingestor.write_chunks(run.row, chunks)
+        await save_chunk_batch(run.document, [
+            (chunk["index"], {
+                "content": chunk["content"],
+                "metadata": {"start_idx": chunk["start_idx"], "end_idx": chunk["end_idx"]},
+                "vector_id": str(chunk["id"]),
+                "vector_provider": "postgres",
+            })
+            for chunk in chunks
+        ])
+        # Batches arrive out of order; progress only covers chunks stored without gaps
+        run.stored.update(chunk["index"] for chunk in chunks)
+        stored_through = run.progress.chunks_stored
+        while stored_through in run.stored:
+            run.stored.discard(stored_through)
+            stored_through += 1
+        run.progress.chunks_stored = stored_through
+        await _save_progress(run.document, run.progress)
+
+    def stats(self) -> Dict[str, Any]:
+        """Document counters and per-stage metrics."""
+        return {
+            "running": self.running,
+            "queued_documents": self._documents.qsize(),
+            "active_documents": self.active_documents,
+            "documents_done": self.documents_done,
+            "documents_failed": self.documents_failed,
+            "stages": {name: metrics.to_dict() for name, metrics in self.metrics.items()},
+        }
+
+
+ingestion_pipeline = IngestionPipeline()
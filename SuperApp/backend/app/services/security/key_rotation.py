@@ -0,0 +1,96 @@
+"""
+Background re-encryption of stored API keys after a key rotation.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from cryptography.fernet import InvalidToken
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.key_vault import KeyVault, key_vault
+from app.db.mongodb.models import ApiKey
+
+logger = logging.getLogger(__name__)
+
+
+async def reencrypt_api_keys(
+    vault: Optional[KeyVault] = None,
+    batch_size: int = settings.API_KEY_REENCRYPT_BATCH_SIZE,
+    pause_seconds: float = 0.1,
+) -> int:
+    """
+    Re-encrypt every stored ``ApiKey.key`` that still uses a retired key.
+
+    Keys are scanned in ``_id`` order in batches and written back with one
+    unordered bulk write per batch. Each update matches on the old ciphertext,
+    so a key changed concurrently by a user is left alone.
+
+    Args:
+        vault: Key vault to rotate with (defaults to the global vault)
+        batch_size: Number of keys read per batch
+        pause_seconds: Pause between batches to limit load
+
+    Returns:
+        Number of keys re-encrypted
+    """
+    vault = vault or key_vault
+    if vault is None:
+        logger.warning("API key re-encryption skipped: encryption is not configured")
+        return 0
+
+    collection = ApiKey.get_motor_collection()
+    last_id = None
+    migrated = 0
+
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = await collection.find(query, {"key": 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        operations = []
+        for doc in batch:
+            try:
+                rotated = vault.rotate(doc["key"])
+            except InvalidToken:
+                logger.warning(f"API key {doc['_id']} cannot be decrypted with any configured key")
+                continue
+            if rotated is not None:
+                operations.append(UpdateOne(
+                    {"_id": doc["_id"], "key": doc["key"]},
+                    {"$set": {"key": rotated, "updated_at": datetime.utcnow()}},
+                ))
+
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            migrated += result.modified_count
+            logger.info(f"Re-encrypted {result.modified_count} API keys (total {migrated})")
+
+        await asyncio.sleep(pause_seconds)
+
+    logger.info(f"API key re-encryption finished: {migrated} keys migrated")
+    return migrated
+
+
+def start_reencryption_job() -> Optional[asyncio.Task]:
+    """
+    Start the re-encryption job in the background if old keys are configured.
+
+    Returns:
+        The running task, or None if there is nothing to migrate
+    """
+    if key_vault is None or not settings.API_KEY_ENCRYPTION_PREVIOUS_SECRETS.strip():
+        return None
+
+    async def run():
+        try:
+            await reencrypt_api_keys()
+        except Exception as e:
+            logger.error(f"API key re-encryption failed: {e}")
+
+    return asyncio.create_task(run(), name="api-key-reencryption")
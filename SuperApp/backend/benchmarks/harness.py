@@ -0,0 +1,159 @@
+"""
+Shared helpers for the microbenchmark suites.
+
+Each suite measures a set of named operations and writes a JSON report with
+ops/sec and latency percentiles. Reports from two releases can be compared
+with ``python -m benchmarks.harness baseline.json current.json``.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+def summarize(name: str, samples_ns: List[int], **extra: Any) -> Dict[str, Any]:
+    """
+    Summarize latency samples.
+
+    Args:
+        name: Operation name
+        samples_ns: Per-call latencies in nanoseconds
+        extra: Additional fields to include in the result
+
+    Returns:
+        Result with ops/sec and latency percentiles in microseconds
+    """
+    ordered = sorted(samples_ns)
+    count = len(ordered)
+    total = sum(ordered)
+
+    def percentile(p: float) -> float:
+        index = min(count - 1, max(0, int(round(p / 100 * count)) - 1))
+        return ordered[index] / 1000
+
+    result = {
+        "name": name,
+        "iterations": count,
+        "ops_per_sec": count / (total / 1e9) if total else 0.0,
+        "mean_us": total / count / 1000,
+        "p50_us": percentile(50),
+        "p90_us": percentile(90),
+        "p99_us": percentile(99),
+        "max_us": ordered[-1] / 1000,
+    }
+    result.update(extra)
+    return result
+
+
+def bench(name: str, func: Callable[[], Any], iterations: int, warmup: int = 10) -> Dict[str, Any]:
+    """Time a synchronous callable."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    return summarize(name, samples)
+
+
+async def bench_async(
+    name: str, func: Callable[[], Awaitable[Any]], iterations: int, warmup: int = 10
+) -> Dict[str, Any]:
+    """Time a coroutine function."""
+    for _ in range(warmup):
+        await func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        await func()
+        samples.append(time.perf_counter_ns() - start)
+    return summarize(name, samples)
+
+
+def _git_revision() -> Optional[str]:
+    """Get the current git revision, if available."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def write_results(path: str, suite: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Write a machine-readable benchmark report.
+
+    Args:
+        path: Output JSON file
+        suite: Suite name
+        results: Results from ``bench``/``bench_async``/``summarize``
+
+    Returns:
+        The written report
+    """
+    report = {
+        "suite": suite,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """Print results as a table."""
+    print(f"{'operation':<40} {'ops/sec':>12} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10}")
+    for r in results:
+        print(f"{r['name']:<40} {r['ops_per_sec']:>12.1f} {r['p50_us']:>10.1f} {r['p90_us']:>10.1f} {r['p99_us']:>10.1f}")
+
+
+def compare(baseline_path: str, current_path: str, threshold: float = 0.1) -> List[str]:
+    """
+    Compare two reports and list operations whose p50 latency regressed.
+
+    Args:
+        baseline_path: Report from the previous release
+        current_path: Report from the current build
+        threshold: Allowed relative slowdown (0.1 = 10%)
+
+    Returns:
+        Human-readable regression descriptions
+    """
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    with open(current_path) as f:
+        current = {r["name"]: r for r in json.load(f)["results"]}
+
+    regressions = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before or not before["p50_us"]:
+            continue
+        change = result["p50_us"] / before["p50_us"] - 1
+        if change > threshold:
+            regressions.append(f"{name}: p50 {before['p50_us']:.1f}us -> {result['p50_us']:.1f}us (+{change:.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    found = compare(args.baseline, args.current, args.threshold)
+    for line in found:
+        print(line)
+    sys.exit(1 if found else 0)
@@ -0,0 +1,120 @@
+"""
+Benchmark of the LinkedIn post list response path.
+
+Compares, for one page of synthetic posts:
+- the previous path: full ``LinkedInPost`` documents built from complete raw
+  documents, then ``jsonable_encoder`` and stdlib ``json`` as FastAPI does;
+- the lean path: projected raw documents serialized with ``orjson``.
+
+Reports throughput (pages/sec with latency percentiles) and allocations per
+request measured with ``tracemalloc``. No database is needed; projection is
+simulated by dropping the fields MongoDB would not return.
+
+Usage (from the backend directory):
+    python -m benchmarks.list_serialization_bench --output list_bench.json
+"""
+
+import argparse
+import json
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.db.mongodb.models import LinkedInPost
+from app.db.mongodb.read_models import LinkedInPostListItem, projection_for
+from benchmarks.harness import bench, print_results, write_results
+
+
+def make_raw_posts(count: int):
+    """Build raw documents shaped like the linkedin_posts collection."""
+    now = datetime.utcnow()
+    posts = []
+    for i in range(count):
+        posts.append({
+            "_id": str(uuid.uuid4()),
+            "user_id": str(uuid.uuid4()),
+            "content": "Lessons from shipping AI features to production. " * 20,
+            "title": f"Post {i}",
+            "image_url": None,
+            "ai_generated": True,
+            "ai_engagement_prediction": {"likes": "high", "comments": "medium", "shares": "low"},
+            "generation_params": {
+                "topic": "AI in production",
+                "tone": "professional",
+                "length": "medium",
+                "keywords": ["ai", "mlops", "production", "llm"],
+                "audience": "engineering managers",
+            },
+            "is_published": False,
+            "published_at": None,
+            "linkedin_post_id": None,
+            "engagement_stats": {"likes": 120, "comments": 14, "shares": 3, "impressions": 5400, "clicks": 88},
+            "tags": ["ai", "mlops", "production", "llm"],
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+            "revision_id": None,
+        })
+    return posts
+
+
+def full_document_path(raw_posts):
+    """Previous behaviour: Beanie documents, FastAPI encoder, stdlib json."""
+    posts = [LinkedInPost.parse_obj(raw) for raw in raw_posts]
+    content = jsonable_encoder({"data": posts, "total": len(posts), "limit": len(posts), "skip": 0})
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def projected_path(projected_posts):
+    """Lean behaviour: raw projected documents straight to orjson."""
+    return orjson.dumps({"data": projected_posts, "limit": len(projected_posts), "next_cursor": None})
+
+
+def allocations(func, repeats: int = 50):
+    """Average peak of memory allocated while handling one request."""
+    tracemalloc.start()
+    func()
+    peaks = []
+    for _ in range(repeats):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    tracemalloc.stop()
+    return {"alloc_peak_kb": sum(peaks) / len(peaks) / 1024}
+
+
+def run(page_size: int, iterations: int):
+    """Run both paths and collect results."""
+    raw_posts = make_raw_posts(page_size)
+    fields = set(projection_for(LinkedInPostListItem))
+    projected_posts = [{k: v for k, v in raw.items() if k in fields} for raw in raw_posts]
+
+    results = []
+    for name, func in (
+        (f"full documents + json (page={page_size})", lambda: full_document_path(raw_posts)),
+        (f"projection + orjson (page={page_size})", lambda: projected_path(projected_posts)),
+    ):
+        result = bench(name, func, iterations)
+        result.update(allocations(func))
+        result["response_bytes"] = len(func())
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List endpoint serialization benchmark")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", default="list_bench.json")
+    args = parser.parse_args()
+
+    results = run(args.page_size, args.iterations)
+    print_results(results)
+    for r in results:
+        print(f"{r['name']:<40} peak {r['alloc_peak_kb']:.1f} KiB, {r['response_bytes']} bytes")
+    write_results(args.output, "list_serialization", results)
+    print(f"Results written to {args.output}")
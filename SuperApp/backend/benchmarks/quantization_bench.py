@@ -0,0 +1,110 @@
+"""
+Memory footprint versus recall@k of quantized embedding search.
+
+Runs in memory with numpy, mirroring what pgvector does for each
+VECTOR_QUANTIZATION mode: a coarse top-(k * rerank factor) over float32,
+half-precision or binary-quantized vectors, then an exact cosine re-rank
+of those candidates with the full vectors. Reports bytes per stored vector
+(the dominant part of an HNSW index), an estimated index size for the
+corpus, query latency and recall@k against exact search. No database is
+needed; index sizes of a real deployment are printed by
+``python -m app.db.postgres.vector_search``.
+
+Usage (from the backend directory):
+    python -m benchmarks.quantization_bench --rows 50000 --output quantization_bench.json
+"""
+
+import argparse
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.core.config import settings
+from benchmarks.harness import bench, print_results, write_results
+from benchmarks.vector_search_bench import synthetic_embeddings
+
+
+def vector_bytes(mode: str, dims: int) -> int:
+    """On-disk size of one indexed vector (pgvector: 8-byte header plus data)."""
+    data = {"none": 4 * dims, "halfvec": 2 * dims, "bit": (dims + 7) // 8}[mode]
+    return 8 + data
+
+
+def index_bytes(mode: str, dims: int, rows: int, m: int) -> int:
+    """Rough HNSW size: vectors plus about 2 * m neighbour pointers per row on layer 0."""
+    return rows * (vector_bytes(mode, dims) + 2 * m * 6)
+
+
+def coarse_search(mode: str, corpus: Dict[str, np.ndarray], query: np.ndarray, candidates: int) -> np.ndarray:
+    """Candidate ids by approximate distance in the given mode."""
+    if mode == "none":
+        scores = corpus["none"] @ query
+    elif mode == "halfvec":
+        scores = (corpus["halfvec"] @ query.astype(np.float16)).astype(np.float32)
+    else:
+        # Hamming distance between sign bits; fewer differing bits ranks higher
+        query_bits = np.packbits(query > 0)
+        scores = -np.unpackbits(np.bitwise_xor(corpus["bit"], query_bits), axis=1).sum(axis=1)
+    top = np.argpartition(-scores, min(candidates, len(scores) - 1))[:candidates]
+    return top[np.argsort(-scores[top])]
+
+
+def rerank(full: np.ndarray, ids: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    """Exact cosine order of candidate ids, using the full vectors."""
+    return ids[np.argsort(-(full[ids] @ query))][:k]
+
+
+def run(rows: int, dims: int, queries: int, k: int, factors: List[int]) -> List[Dict]:
+    full = synthetic_embeddings(rows, dims)
+    corpus = {
+        "none": full,
+        "halfvec": full.astype(np.float16),
+        "bit": np.packbits(full > 0, axis=1),
+    }
+    query_vectors = synthetic_embeddings(queries, dims, seed=11)
+    truth = [set(np.argsort(-(full @ q))[:k]) for q in query_vectors]
+
+    results = []
+    for mode in ("none", "halfvec", "bit"):
+        for factor in factors if mode != "none" else [1]:
+            candidates = k * factor
+
+            def search(q: np.ndarray) -> np.ndarray:
+                ids = coarse_search(mode, corpus, q, candidates)
+                return rerank(full, ids, q, k) if mode != "none" else ids[:k]
+
+            found = [search(q) for q in query_vectors]
+            recall = float(np.mean([len(set(f) & t) / k for f, t in zip(found, truth)]))
+
+            position = iter(range(10 ** 9))
+            step: Callable[[], np.ndarray] = lambda: search(query_vectors[next(position) % queries])
+            label = f"{mode} rerank x{factor}" if mode != "none" else "float32 exact"
+            result = bench(label, step, queries, warmup=3)
+            result.update({
+                "recall": recall,
+                "vector_bytes": vector_bytes(mode, dims),
+                "index_mb": round(index_bytes(mode, dims, rows, settings.VECTOR_HNSW_M) / 2 ** 20, 1),
+            })
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantized embedding footprint/recall benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--output", default="quantization_bench.json")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.dims, args.queries, args.k, args.factors)
+    print_results(results)
+    for r in results:
+        print(
+            f"{r['name']:<24} recall@{args.k} {r['recall']:.3f}  "
+            f"{r['vector_bytes']:>6} B/vector  ~{r['index_mb']} MB index"
+        )
+    write_results(args.output, "quantization", results)
+    print(f"Results written to {args.output}")
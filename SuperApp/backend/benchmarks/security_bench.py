@@ -0,0 +1,113 @@
+"""
+Microbenchmarks for the security hot path.
+
+Measures token creation/verification, password verification, API key
+encryption and the full ``get_current_active_user`` dependency chain
+against an in-memory user store, so no database is needed.
+
+Usage (from the backend directory):
+    python -m benchmarks.security_bench --output security_bench.json
+"""
+
+import argparse
+import asyncio
+import os
+import uuid
+
+from cryptography.fernet import Fernet
+
+# Fixed secrets must be in place before the app modules read settings
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("API_KEY_ENCRYPTION_SECRET", Fernet.generate_key().decode())
+
+from app.api.deps import get_current_active_user, get_current_user  # noqa: E402
+from app.core.key_vault import key_vault  # noqa: E402
+from app.core.security import (  # noqa: E402
+    create_access_token,
+    decrypt_api_key,
+    encrypt_api_key,
+    get_password_hash,
+    verify_password,
+    verify_token,
+)
+from app.db.mongodb.models import User  # noqa: E402
+from benchmarks.harness import bench, bench_async, print_results, write_results  # noqa: E402
+
+
+class InMemoryUserStore:
+    """Stand-in for ``User.find_one`` backed by a dict."""
+
+    def __init__(self):
+        self._users = {}
+
+    def add(self, user: User) -> None:
+        self._users[user.id] = user
+
+    async def find_one(self, query, *args, **kwargs):
+        return self._users.get(query.get("_id"))
+
+
+async def run(iterations: int, bcrypt_iterations: int):
+    """Run all security benchmarks."""
+    results = []
+
+    payload = {"sub": str(uuid.uuid4())}
+    token = create_access_token(payload)
+    results.append(bench("create_access_token", lambda: create_access_token(payload), iterations))
+    results.append(bench("verify_token", lambda: verify_token(token), iterations))
+
+    hashed = get_password_hash("benchmark-password")
+    results.append(bench(
+        "verify_password",
+        lambda: verify_password("benchmark-password", hashed),
+        bcrypt_iterations,
+        warmup=1,
+    ))
+
+    api_key = "sk-" + uuid.uuid4().hex
+    encrypted = encrypt_api_key(api_key)
+    results.append(bench("encrypt_api_key", lambda: encrypt_api_key(api_key), iterations))
+
+    def decrypt_uncached():
+        key_vault.invalidate(encrypted)
+        return decrypt_api_key(encrypted)
+
+    results.append(bench("decrypt_api_key (uncached)", decrypt_uncached, iterations))
+    results.append(bench("decrypt_api_key (cached)", lambda: decrypt_api_key(encrypted), iterations))
+
+    # Full auth dependency chain with the database lookup served from memory
+    store = InMemoryUserStore()
+    user = User.construct(
+        id=payload["sub"],
+        email="bench@example.com",
+        username="bench",
+        hashed_password=hashed,
+        is_active=True,
+        is_superuser=False,
+    )
+    store.add(user)
+    original_find_one = User.find_one
+    User.find_one = store.find_one
+    try:
+        async def auth_chain():
+            current = await get_current_user(token)
+            return await get_current_active_user(current)
+
+        results.append(await bench_async("get_current_active_user (chain)", auth_chain, iterations))
+    finally:
+        User.find_one = original_find_one
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Security hot-path microbenchmarks")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--bcrypt-iterations", type=int, default=20)
+    parser.add_argument("--output", default="security_bench.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.iterations, args.bcrypt_iterations))
+    print_results(results)
+    write_results(args.output, "security", results)
+    print(f"Results written to {args.output}")
@@ -0,0 +1,152 @@
+"""
+Recall/latency benchmark of pgvector HNSW search against exact search.
+
+Loads synthetic clustered embeddings into a scratch table, builds an HNSW
+index with the VECTOR_HNSW_* settings and, for each ``ef_search`` value,
+measures latency percentiles and recall@k relative to an exact scan, with
+and without a selective filter. Needs a PostgreSQL server with pgvector
+(configured through the POSTGRES_* settings); the scratch table is dropped
+afterwards.
+
+Usage (from the backend directory):
+    python -m benchmarks.vector_search_bench --rows 50000 --output vector_bench.json
+"""
+
+import argparse
+import asyncio
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.postgres.session import dispose_engine, get_engine
+from benchmarks.harness import bench_async, print_results, write_results
+
+TABLE = "vector_search_bench"
+CATEGORIES = 20
+
+
+def synthetic_embeddings(rows: int, dims: int, clusters: int = 50, seed: int = 7) -> np.ndarray:
+    """Unit vectors scattered around random centroids, like real embeddings."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(clusters, dims))
+    points = centroids[rng.integers(0, clusters, rows)] + rng.normal(scale=0.6, size=(rows, dims))
+    return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _literal(vector: Sequence[float]) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
+
+
+async def load(engine, vectors: np.ndarray, batch: int = 1000) -> None:
+    """Create the scratch table, load vectors and build the HNSW index."""
+    dims = vectors.shape[1]
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await conn.execute(text(
+            f"CREATE TABLE {TABLE} (id integer PRIMARY KEY, category integer, embedding vector({dims}))"
+        ))
+        for start in range(0, len(vectors), batch):
+            await conn.execute(
+                text(f"INSERT INTO {TABLE} VALUES (:id, :category, CAST(:embedding AS vector))"),
+                [
+                    {"id": i, "category": i % CATEGORIES, "embedding": _literal(vectors[i])}
+                    for i in range(start, min(start + batch, len(vectors)))
+                ],
+            )
+        await conn.execute(text(
+            "SELECT set_config('maintenance_work_mem', :memory, true)"
+        ), {"memory": settings.VECTOR_INDEX_BUILD_MEMORY})
+        await conn.execute(text(
+            f"CREATE INDEX ON {TABLE} USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {settings.VECTOR_HNSW_M}, ef_construction = {settings.VECTOR_HNSW_EF_CONSTRUCTION})"
+        ))
+        await conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+async def search(
+    engine,
+    query: str,
+    k: int,
+    ef_search: Optional[int],
+    category: Optional[int],
+) -> List[int]:
+    """Top-k ids; ``ef_search=None`` runs an exact scan."""
+    where = "WHERE category = :category" if category is not None else ""
+    async with engine.begin() as conn:
+        if ef_search is None:
+            await conn.execute(text("SELECT set_config('enable_indexscan', 'off', true)"))
+        else:
+            await conn.execute(text("SELECT set_config('hnsw.ef_search', :v, true)"), {"v": str(ef_search)})
+            if category is not None and settings.VECTOR_ITERATIVE_SCAN != "off":
+                await conn.execute(
+                    text("SELECT set_config('hnsw.iterative_scan', :v, true)"),
+                    {"v": settings.VECTOR_ITERATIVE_SCAN},
+                )
+        rows = await conn.execute(
+            text(
+                f"SELECT id FROM {TABLE} {where} "
+                f"ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k"
+            ),
+            {"q": query, "k": k, "category": category},
+        )
+        return [row.id for row in rows]
+
+
+async def run(rows: int, dims: int, queries: int, k: int, ef_values: List[int]) -> List[Dict]:
+    engine = get_engine()
+    vectors = synthetic_embeddings(rows, dims)
+    query_vectors = [_literal(v) for v in synthetic_embeddings(queries, dims, seed=11)]
+    results = []
+    try:
+        await load(engine, vectors)
+        for category in (None, 3):
+            label = "filtered" if category is not None else "unfiltered"
+            truth = [await search(engine, q, k, None, category) for q in query_vectors]
+
+            position = iter(range(10 ** 9))
+            exact = await bench_async(
+                f"exact {label}",
+                lambda: search(engine, query_vectors[next(position) % queries], k, None, category),
+                queries,
+                warmup=3,
+            )
+            exact["recall"] = 1.0
+            results.append(exact)
+
+            for ef in ef_values:
+                found = [await search(engine, q, k, ef, category) for q in query_vectors]
+                recall = float(np.mean([len(set(f) & set(t)) / max(len(t), 1) for f, t in zip(found, truth)]))
+                position = iter(range(10 ** 9))
+                result = await bench_async(
+                    f"hnsw ef_search={ef} {label}",
+                    lambda: search(engine, query_vectors[next(position) % queries], k, ef, category),
+                    queries,
+                    warmup=3,
+                )
+                result["recall"] = recall
+                results.append(result)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await dispose_engine()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pgvector recall/latency benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef", type=int, nargs="+", default=[10, 20, 40, 80, 160, 320])
+    parser.add_argument("--output", default="vector_bench.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows, args.dims, args.queries, args.k, args.ef))
+    print_results(results)
+    for r in results:
+        print(f"{r['name']:<40} recall@{args.k} {r['recall']:.3f}")
+    write_results(args.output, "vector_search", results)
+    print(f"Results written to {args.output}")
@@ -0,0 +1,63 @@
+"""
+The shared PostgreSQL engine is created once per process, however many
+tasks and threads ask for it first. Engines connect lazily, so no server
+is needed.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.db.postgres import session
+
+CALLERS = 32
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """A fresh engine manager in place of the process-wide one."""
+    fresh = session.PostgresEngineManager()
+    monkeypatch.setattr(session, "_manager", fresh)
+    yield fresh
+    asyncio.run(fresh.dispose())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tasks_share_one_engine(manager):
+    async def first_use(index: int):
+        await asyncio.sleep(0)
+        return session.get_engine() if index % 2 else session.get_session_factory()
+
+    results = await asyncio.gather(*(first_use(index) for index in range(CALLERS)))
+
+    assert session.get_engines_created() == 1
+    engines = {id(result) for result in results[1::2]}
+    factories = {id(result) for result in results[0::2]}
+    assert engines == {id(session.get_engine())}
+    assert factories == {id(session.get_session_factory())}
+
+
+def test_concurrent_threads_share_one_engine(manager):
+    barrier = threading.Barrier(CALLERS)
+
+    def first_use(index: int):
+        barrier.wait()
+        return session.get_engine() if index % 2 else session.get_session_factory()
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        results = list(pool.map(first_use, range(CALLERS)))
+
+    assert session.get_engines_created() == 1
+    assert len({id(result) for result in results[1::2]}) == 1
+    assert len({id(result) for result in results[0::2]}) == 1
+
+
+def test_dispose_allows_a_new_engine(manager):
+    first = session.get_engine()
+    asyncio.run(session.dispose_engine())
+
+    assert not session.is_engine_initialized()
+    assert session.get_engine() is not first
+    assert session.get_engines_created() == 2
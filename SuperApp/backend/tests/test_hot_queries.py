@@ -0,0 +1,56 @@
+"""
+Every registered hot query must be served by an index, checked with
+explain against a scratch database set up like production: Beanie creates
+the collections and its ``Indexed`` field indexes, then the declared
+indexes are reconciled. Skipped when MongoDB is not reachable.
+"""
+
+import pytest
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.db.mongodb.indexes import _index_differences, index_registry
+from app.db.mongodb.init_db import DOCUMENT_MODELS
+
+TEST_DATABASE = f"{settings.MONGODB_DB_NAME}_index_test"
+
+
+@pytest.mark.asyncio
+async def test_hot_queries_use_an_index():
+    client = AsyncIOMotorClient(settings.MONGODB_URI, serverSelectionTimeoutMS=2000)
+    try:
+        await client.admin.command("ping")
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f"MongoDB unavailable: {e}")
+
+    try:
+        await client.drop_database(TEST_DATABASE)
+        database = client[TEST_DATABASE]
+        await init_beanie(database=database, document_models=DOCUMENT_MODELS)
+        report = await index_registry.reconcile(database)
+        assert not report.conflicts
+
+        # An EOF plan means the collection does not exist and nothing was checked
+        plans = await index_registry.explain_hot_queries(database)
+        assert not [name for name, stages in plans.items() if "EOF" in stages]
+        await index_registry.assert_no_collscan(database)
+    finally:
+        await client.drop_database(TEST_DATABASE)
+        client.close()
+
+
+def test_option_changes_are_conflicts():
+    declared = IndexModel(
+        [("user_id", ASCENDING)], name="user_live", unique=True,
+        partialFilterExpression={"deleted_at": None},
+    ).document
+    existing = {"key": [("user_id", 1)], "unique": True, "partialFilterExpression": {"deleted_at": None}}
+
+    assert _index_differences(existing, declared) == []
+    assert _index_differences({"key": [("user_id", 1)]}, declared) == ["unique", "partialFilterExpression"]
+    assert _index_differences({**existing, "expireAfterSeconds": 60}, declared) == ["expireAfterSeconds"]
+    assert _index_differences({**existing, "key": [("user_id", -1)]}, declared) == ["key"]
@@ -90,8 +90,10 @@ CREATE TABLE IF NOT EXISTS linkedin_skills (
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Range partitioned by month of created_at; monthly partitions are created
+-- ahead and retired by `python -m app.db.postgres.partitions`.
 CREATE TABLE IF NOT EXISTS linkedin_posts (
-  id SERIAL PRIMARY KEY,
+  id SERIAL,
   user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
   linkedin_post_id VARCHAR(100),
   content TEXT NOT NULL,
@@ -104,44 +106,118 @@ CREATE TABLE IF NOT EXISTS linkedin_posts (
   generation_params JSONB,
   ai_engagement_prediction JSONB,
   tags TEXT[],
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-  updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-);
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  deleted_at TIMESTAMP WITH TIME ZONE, -- Soft delete; purged after SOFT_DELETE_RETENTION_DAYS
+  PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS linkedin_posts_default PARTITION OF linkedin_posts DEFAULT;
+
+-- Partial indexes: live rows for queries, soft-deleted rows for the purger
+CREATE INDEX IF NOT EXISTS linkedin_posts_user_created_live_idx ON linkedin_posts (user_id, created_at)
+WHERE deleted_at IS NULL;
+CREATE INDEX IF NOT EXISTS linkedin_posts_deleted_at_idx ON linkedin_posts (deleted_at)
+WHERE deleted_at IS NOT NULL;
 
--- Create vector index on linkedin_posts (using cosine distance)
-CREATE INDEX IF NOT EXISTS linkedin_posts_embedding_idx ON linkedin_posts 
-USING ivfflat (content_embedding vector_cosine_ops)
-WITH (lists = 100);
+-- Changed posts, for the incremental analytics refresh
+CREATE INDEX IF NOT EXISTS linkedin_posts_updated_idx ON linkedin_posts (updated_at);
+
+-- Create vector index on linkedin_posts (HNSW, cosine distance). Unlike
+-- IVFFlat it needs no training data and keeps its recall as rows are added.
+-- Parameters are managed by `python -m app.db.postgres.vector_search --ensure`.
+CREATE INDEX IF NOT EXISTS linkedin_posts_embedding_hnsw ON linkedin_posts
+USING hnsw (content_embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
 
 -- RAG System Tables
 CREATE TABLE IF NOT EXISTS documents (
   id SERIAL PRIMARY KEY,
   user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
   title VARCHAR(255) NOT NULL,
-  content TEXT NOT NULL,
+  content TEXT NOT NULL, -- Empty for replicated documents: bodies stay in MongoDB GridFS
   metadata JSONB,
   is_processed BOOLEAN DEFAULT FALSE,
   is_public BOOLEAN DEFAULT FALSE,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-  updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  deleted_at TIMESTAMP WITH TIME ZONE -- Soft delete; purged after SOFT_DELETE_RETENTION_DAYS
 );
 
+CREATE INDEX IF NOT EXISTS documents_user_live_idx ON documents (user_id) WHERE deleted_at IS NULL;
+CREATE INDEX IF NOT EXISTS documents_deleted_at_idx ON documents (deleted_at) WHERE deleted_at IS NOT NULL;
+
+-- Hash partitioned by user_id so per-user searches touch one partition
 CREATE TABLE IF NOT EXISTS document_chunks (
-  id SERIAL PRIMARY KEY,
+  id SERIAL,
   document_id INTEGER REFERENCES documents(id) ON DELETE CASCADE,
+  user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
   content TEXT NOT NULL,
   start_idx INTEGER,
   end_idx INTEGER,
   page_number INTEGER,
   section_title VARCHAR(255),
   embedding vector(1536), -- Using OpenAI embedding dimension
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+  content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED, -- Lexical half of hybrid search
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (id, user_id)
+) PARTITION BY HASH (user_id);
+
+-- DOCUMENT_CHUNK_PARTITIONS (16) hash partitions
+DO $$
+BEGIN
+  FOR i IN 0..15 LOOP
+    EXECUTE format(
+      'CREATE TABLE IF NOT EXISTS document_chunks_p%s PARTITION OF document_chunks '
+      'FOR VALUES WITH (MODULUS 16, REMAINDER %s)', i, i);
+  END LOOP;
+END $$;
+
+-- Chunks of a document, for cascades and the soft-delete purger
+CREATE INDEX IF NOT EXISTS document_chunks_document_idx ON document_chunks (document_id);
+
+-- Create vector index on document_chunks (HNSW, cosine distance)
+CREATE INDEX IF NOT EXISTS document_chunks_embedding_hnsw ON document_chunks
+USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- Full-text index for the lexical half of hybrid search
+CREATE INDEX IF NOT EXISTS document_chunks_content_tsv_gin ON document_chunks
+USING gin (content_tsv);
+
+-- Content analytics, refreshed incrementally from linkedin_posts by
+-- app.services.analytics.content (changed posts since the watermark)
+CREATE TABLE IF NOT EXISTS content_stats_daily (
+  user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+  day DATE NOT NULL,
+  posts INTEGER NOT NULL DEFAULT 0,
+  ai_generated INTEGER NOT NULL DEFAULT 0,
+  published INTEGER NOT NULL DEFAULT 0,
+  likes BIGINT NOT NULL DEFAULT 0,
+  comments BIGINT NOT NULL DEFAULT 0,
+  shares BIGINT NOT NULL DEFAULT 0,
+  impressions BIGINT NOT NULL DEFAULT 0,
+  clicks BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, day)
+);
+
+CREATE TABLE IF NOT EXISTS content_tag_stats (
+  user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+  tag VARCHAR(100) NOT NULL,
+  posts INTEGER NOT NULL DEFAULT 0,
+  likes BIGINT NOT NULL DEFAULT 0,
+  comments BIGINT NOT NULL DEFAULT 0,
+  shares BIGINT NOT NULL DEFAULT 0,
+  impressions BIGINT NOT NULL DEFAULT 0,
+  clicks BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, tag)
 );
 
--- Create vector index on document_chunks
-CREATE INDEX IF NOT EXISTS document_chunks_embedding_idx ON document_chunks 
-USING ivfflat (embedding vector_cosine_ops)
-WITH (lists = 100);
+CREATE TABLE IF NOT EXISTS analytics_watermarks (
+  name VARCHAR(100) PRIMARY KEY,
+  processed_through TIMESTAMP WITH TIME ZONE NOT NULL,
+  refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
 
 -- Tokens table to store refresh tokens
 CREATE TABLE IF NOT EXISTS refresh_tokens (
@@ -186,8 +262,10 @@ CREATE TRIGGER update_linkedin_skills_updated_at
 BEFORE UPDATE ON linkedin_skills
 FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Inserts too, so replicated posts carry the time they changed here,
+-- which the analytics watermark relies on
 CREATE TRIGGER update_linkedin_posts_updated_at
-BEFORE UPDATE ON linkedin_posts
+BEFORE INSERT OR UPDATE ON linkedin_posts
 FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
 CREATE TRIGGER update_documents_updated_at